@@ -6,14 +6,16 @@ from app.api.deps import get_db_conn, get_current_user
 from app.repositories.answer_repo import answer_repo
 from app.repositories.session_repo import session_repo
 from app.services.analysis_service import analysis_service
+from app.services.session_analysis_service import session_analysis_service
+from app.services.analysis_job_service import analysis_job_service
 
 router = APIRouter()
 
 def _run_session_analysis_pipeline(session_id: int, answers: list):
     """
     [백그라운드 파이프라인]
-    1. 세션 내 모든 답변 순차 분석
-    2. 모든 분석 완료 후 종합 리포트 생성
+    1. 세션 내 모든 답변 분석 (ANALYSIS_SESSION_WORKERS > 1 이면 프로세스 풀로 병렬 실행)
+    2. 모든 답변이 종료 상태(DONE/FAILED)가 되면 종합 리포트 생성
     3. 세션 상태 완료 처리
     """
     conn = None
@@ -30,19 +32,34 @@ def _run_session_analysis_pipeline(session_id: int, answers: list):
         print(f"🚀 [Pipeline Start] Session {session_id} 분석 파이프라인 시작")
 
         # -------------------------------------------------------
-        # Step 1: 개별 답변 분석 (순차 실행)
+        # Step 1: 개별 답변 분석 (워커 수 설정에 따라 순차/병렬 실행)
+        # - eager 모드: 분석 중(PROCESSING)이거나 예약된 답변만 기다린 뒤,
+        #   아직 PENDING 인 답변(예약 실패 / 서버 재시작 등)만 여기서 분석
+        #   (PENDING -> PROCESSING 을 원자적으로 가져가므로 eager 분석과 겹쳐 두 번 돌지 않음)
         # -------------------------------------------------------
-        for ans in answers:
-            if ans['video_path']:
-                # 기존 run_full_analysis -> run_answer_analysis로 변경
-                analysis_service.run_answer_analysis(conn, ans['answer_id'], ans['video_path'])
-                
-                # 하나 끝날 때마다 커밋 (중간에 실패해도 앞부분은 저장되도록)
-                conn.commit()
+        if settings.ANALYSIS_EAGER:
+            running = session_analysis_service.wait_for_terminal(
+                conn, session_id, timeout_sec=settings.ANALYSIS_EAGER_WAIT_SEC
+            )
+            if running:
+                print(f"⏳ [Pipeline] Session {session_id}: 대기 시간 안에 끝나지 않은 답변 {len(running)}개 (다시 실행하지 않음)")
+            answers = [
+                a for a in answer_repo.get_all_by_session_id(conn, session_id)
+                if a.get("analysis_status") == "PENDING"
+            ]
+            if answers:
+                print(f"⏳ [Pipeline] Session {session_id}: 분석이 시작되지 않은 답변 {len(answers)}개를 직접 분석합니다.")
+            session_analysis_service.analyze_answers(conn, answers, claim_from=("PENDING",))
+        else:
+            session_analysis_service.analyze_answers(conn, answers)
 
         # -------------------------------------------------------
-        # Step 2: 종합 리포트 생성
+        # Step 2: 종합 리포트 생성 (모든 답변이 DONE/FAILED 상태일 때만)
         # -------------------------------------------------------
+        if not session_analysis_service.all_terminal(conn, session_id):
+            print(f"⚠️ [Pipeline] Session {session_id}: 분석이 끝나지 않은 답변이 있어 리포트를 생성하지 않습니다.")
+            return
+
         print(f"📊 [Pipeline Step 2] 종합 리포트 생성 중...")
         analysis_service.generate_session_report(conn, session_id)
         conn.commit()
@@ -73,6 +90,7 @@ def analyze_session_answers(
     """
     [세션 일괄 분석 요청]
     해당 세션의 모든 답변을 분석하고, 마지막에 종합 리포트를 생성합니다.
+    (ANALYSIS_DISPATCH="queue" 이면 analysis_jobs 에 등록만 하고, 분석은 워커가 수행)
     """
     # 1. 답변 목록 조회
     answers = answer_repo.get_all_by_session_id(conn, session_id)
@@ -83,7 +101,23 @@ def analyze_session_answers(
     session_repo.update_status(conn, session_id, "ANALYZING")
     conn.commit()
 
-    # 3. 백그라운드 파이프라인 시작 (단 하나의 태스크만 등록)
+    # ANALYZING 커밋 이후의 상태로 다시 조회 (그 사이 끝난 eager 분석을 다시 등록하지 않도록)
+    answers = answer_repo.get_all_by_session_id(conn, session_id)
+
+    # 3-A. 큐 모드: 작업만 등록하고 바로 반환 (분석은 워커 프로세스가 수행)
+    if settings.ANALYSIS_DISPATCH == "queue":
+        queued = analysis_job_service.enqueue_session(
+            conn, session_id, answers, skip_finished=settings.ANALYSIS_EAGER
+        )
+        conn.commit()
+        return {
+            "message": f"Session {session_id} analysis jobs queued.",
+            "target_answers_count": len(answers),
+            "queued_jobs": queued,
+            "status": "ANALYZING"
+        }
+
+    # 3-B. 백그라운드 모드: 파이프라인 시작 (단 하나의 태스크만 등록)
     # 리스트(answers)를 통째로 넘겨서 스레드 안에서 for문을 돌립니다.
     background_tasks.add_task(_run_session_analysis_pipeline, session_id, answers)
             
@@ -1,21 +1,42 @@
 import os
-import shutil
-# import uuid  <-- 제거됨
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, BackgroundTasks, Request, Query
+from fastapi.concurrency import run_in_threadpool
 from psycopg2.extensions import connection
 
 from app.api.deps import get_db_conn, get_current_user
+from app.core.config import settings
 from app.repositories.answer_repo import answer_repo
-from app.schemas.answer import AnswerResponse
+from app.schemas.answer import AnswerResponse, UploadInitRequest, UploadStatusResponse, UploadCompleteRequest
+from app.services.answer_upload_service import answer_upload_service, UploadError
+from app.services.analysis_job_service import analysis_job_service
+from app.services.session_analysis_service import register_eager_analysis, run_eager_answer_analysis
+from app.utils.media_store import media_store, MediaStoreLimitError
 
 router = APIRouter()
 
-# 영상 저장 경로
-UPLOAD_DIR = "uploads/videos"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+def _schedule_eager_analysis(conn: connection, background_tasks: BackgroundTasks, answer: dict) -> None:
+    """
+    [eager 모드] 업로드 직후 해당 답변의 전처리 + 엔진 분석을 바로 예약합니다.
+    - queue 모드: analysis_jobs 에 ANSWER 작업 등록 (워커가 처리)
+    - background 모드: 응답 후 API 프로세스의 백그라운드 작업으로 실행
+    예약 실패는 업로드 자체를 실패시키지 않습니다. (세션 종료 시 다시 분석됨)
+    """
+    try:
+        if settings.ANALYSIS_DISPATCH == "queue":
+            analysis_job_service.enqueue_answer(conn, answer["answer_id"])
+            conn.commit()
+        else:
+            # 세션 파이프라인이 시작 전(PENDING) 예약분도 기다리도록 등록
+            register_eager_analysis(answer["answer_id"])
+            background_tasks.add_task(run_eager_answer_analysis, answer["answer_id"], answer["video_path"])
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️ [Eager Analysis] Answer ID {answer['answer_id']} 분석 예약 실패: {e}")
+
 
 @router.post("/upload", response_model=AnswerResponse)
 def upload_answer_video(
+    background_tasks: BackgroundTasks,
     question_id: int = Form(..., description="어떤 질문에 대한 답변인지 ID"),
     file: UploadFile = File(..., description="영상 파일 (mp4, webm 등)"),
     conn: connection = Depends(get_db_conn),
@@ -24,20 +45,24 @@ def upload_answer_video(
     """
     [답변 영상 업로드]
     특정 질문(question_id)에 대한 답변 영상을 업로드합니다.
+    ANALYSIS_EAGER 이면 업로드 직후 이 답변의 분석을 바로 시작합니다.
     """
     
-    # 1. 파일명 생성 (UUID 제거 -> 유저ID + 원본파일명 사용)
-    # 예: answer_q15_u1_interview_video.mp4
-    # (user_id를 넣어주면 다른 유저와 파일명이 겹치지 않습니다)
-    safe_filename = f"answer_q{question_id}_u{current_user['user_id']}_{file.filename}"
-    file_path = os.path.join(UPLOAD_DIR, safe_filename)
-
-    # 2. 서버 로컬에 저장
+    # 1. 서버 로컬에 저장 (content-addressed)
+    # - 쓰면서 xxh3 해시를 계산해 uploads/objects/ab/cd/<hash>.<ext> 에 저장
+    # - 같은 영상이 다시 올라오면 새로 쓰지 않고 기존 파일(과 파생 파일)을 재사용
+    ext = os.path.splitext(file.filename or "")[1].lower() or ".mp4"
+    if file.size is not None and file.size > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"파일이 너무 큽니다. (최대 {settings.UPLOAD_MAX_BYTES} bytes)")
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        stored = media_store.put_stream(file.file, ext, max_bytes=settings.UPLOAD_MAX_BYTES)
+    except MediaStoreLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"영상 저장 실패: {e}")
+    file_path = stored.path
+    if stored.deduplicated:
+        print(f"♻️ [Upload] 동일한 영상이 이미 저장되어 있음 -> 재사용 ({stored.digest})")
 
     # 3. DB 저장 (Answers 테이블)
     try:
@@ -47,11 +72,151 @@ def upload_answer_video(
             video_path=file_path
         )
         conn.commit()
-        return new_answer
-        
+    
     except Exception as e:
         conn.rollback()
-        # 저장된 파일 삭제 (DB 실패 시 고아 파일 방지)
-        if os.path.exists(file_path):
+        # 이번 요청에서 새로 저장한 파일만 삭제 (DB 실패 시 고아 파일 방지)
+        if not stored.deduplicated and os.path.exists(file_path):
             os.remove(file_path)
-        raise HTTPException(status_code=500, detail=f"DB 저장 실패: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"DB 저장 실패: {e}")
+
+    # 4. 분석 바로 시작 (eager 모드)
+    if settings.ANALYSIS_EAGER:
+        _schedule_eager_analysis(conn, background_tasks, new_answer)
+
+    return new_answer
+
+
+# =========================================================
+# 이어받기 가능한 청크 업로드
+# 1) POST   /uploads                    -> upload_id 발급
+# 2) PUT    /uploads/{id}?offset=N      -> 바이트 이어 쓰기 (본문: application/octet-stream)
+#    (409 응답 시 GET 으로 received_bytes 확인 후 그 지점부터 재전송)
+# 3) POST   /uploads/{id}/complete      -> answers 생성 (+ 분석 시작)
+# =========================================================
+def _upload_status(row: dict) -> UploadStatusResponse:
+    return UploadStatusResponse(
+        upload_id=row["upload_id"],
+        question_id=row["question_id"],
+        status=row["status"],
+        received_bytes=row["received_bytes"],
+        total_bytes=row.get("total_bytes"),
+        chunk_bytes=settings.UPLOAD_CHUNK_BYTES,
+        answer_id=row.get("answer_id"),
+    )
+
+
+@router.post("/uploads", response_model=UploadStatusResponse)
+def init_answer_upload(
+    body: UploadInitRequest,
+    conn: connection = Depends(get_db_conn),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    [청크 업로드 시작]
+    total_bytes / duration_sec 를 알려주면 바이트를 보내기 전에 크기/길이 제한을 검사합니다.
+    """
+    try:
+        row = answer_upload_service.init_upload(
+            conn,
+            current_user["user_id"],
+            body.question_id,
+            filename=body.filename,
+            total_bytes=body.total_bytes,
+            duration_sec=body.duration_sec,
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return _upload_status(row)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatusResponse)
+def get_answer_upload(
+    upload_id: str,
+    conn: connection = Depends(get_db_conn),
+    current_user: dict = Depends(get_current_user)
+):
+    """[청크 업로드 상태] 끊긴 뒤 received_bytes 부터 이어서 보내면 됩니다."""
+    try:
+        row = answer_upload_service.get_owned(conn, upload_id, current_user["user_id"])
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return _upload_status(row)
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadStatusResponse)
+async def put_answer_upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="이 청크의 시작 위치 (= 서버의 received_bytes)"),
+    conn: connection = Depends(get_db_conn),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    [청크 업로드]
+    본문을 스트리밍으로 읽으면서 UPLOAD_CHUNK_BYTES 를 넘으면 바로 413 으로 끊습니다.
+    """
+    max_chunk = settings.UPLOAD_CHUNK_BYTES
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_chunk:
+        raise HTTPException(status_code=413, detail=f"청크가 너무 큽니다. (최대 {max_chunk} bytes)")
+
+    data = bytearray()
+    async for piece in request.stream():
+        data.extend(piece)
+        if len(data) > max_chunk:
+            raise HTTPException(status_code=413, detail=f"청크가 너무 큽니다. (최대 {max_chunk} bytes)")
+
+    try:
+        # DB / 파일 I/O 는 이벤트 루프를 막지 않도록 스레드풀에서
+        row = await run_in_threadpool(
+            answer_upload_service.write_chunk,
+            conn, current_user["user_id"], upload_id, offset, bytes(data),
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return _upload_status(row)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=AnswerResponse)
+def complete_answer_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    body: UploadCompleteRequest = UploadCompleteRequest(),
+    conn: connection = Depends(get_db_conn),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    [청크 업로드 완료]
+    원본 저장소로 옮기고 답변(answers)을 생성합니다. 이미 완료된 업로드면 같은 답변을 반환합니다.
+    analyze=true 이면 (기본: ANALYSIS_EAGER) 바로 이 답변의 분석을 시작합니다.
+    """
+    try:
+        answer, created = answer_upload_service.complete(
+            conn, current_user["user_id"], upload_id,
+            live_visual=body.live_visual, live_voice=body.live_voice,
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"업로드 완료 처리 실패: {e}")
+
+    analyze = settings.ANALYSIS_EAGER if body.analyze is None else body.analyze
+    if created and analyze:
+        _schedule_eager_analysis(conn, background_tasks, answer)
+
+    return answer
+
+
+@router.delete("/uploads/{upload_id}", response_model=UploadStatusResponse)
+def abort_answer_upload(
+    upload_id: str,
+    conn: connection = Depends(get_db_conn),
+    current_user: dict = Depends(get_current_user)
+):
+    """[청크 업로드 취소] 임시 파일을 지웁니다."""
+    try:
+        row = answer_upload_service.abort(conn, current_user["user_id"], upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return _upload_status(row)
@@ -0,0 +1,79 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+# =========================================================
+# 엔진 동시 실행 슬롯
+# - MediaPipe / Whisper는 인스턴스 하나가 CPU 코어와 메모리를 크게 점유하므로
+#   동시에 돌아가는 개수를 제한합니다.
+# - 기본값은 프로세스 내부 세마포어(스레드 간 공유)
+# - 멀티프로세스 파이프라인에서는 부모가 만든 multiprocessing 세마포어를
+#   install_engine_slots()로 주입해 프로세스 전체 합계를 제한합니다.
+# =========================================================
+ENGINE_VISUAL = "visual"
+ENGINE_STT = "stt"
+
+_engine_slots: Dict[str, Any] = {
+    ENGINE_VISUAL: threading.BoundedSemaphore(max(1, settings.ANALYSIS_MAX_VISUAL_JOBS)),
+    ENGINE_STT: threading.BoundedSemaphore(max(1, settings.ANALYSIS_MAX_STT_JOBS)),
+}
+
+
+def install_engine_slots(slots: Dict[str, Any]) -> None:
+    """엔진별 세마포어 교체 (ProcessPool initializer에서 호출)"""
+    _engine_slots.update(slots)
+
+
+def get_engine_slot(name: str) -> Optional[Any]:
+    return _engine_slots.get(name)
+
+
+@contextmanager
+def engine_slot(name: str):
+    """
+    with engine_slot(ENGINE_VISUAL):
+        run_visual(...)
+    등록되지 않은 엔진 이름이면 제한 없이 통과합니다.
+    """
+    sem = _engine_slots.get(name)
+    if sem is None:
+        yield
+        return
+    sem.acquire()
+    try:
+        yield
+    finally:
+        sem.release()
+
+
+# =========================================================
+# 엔진 내부 프로세스 풀 (Visual 구간 병렬 / Voice 청크 병렬) 워커 수 제한
+# - 세션 워커 프로세스 안에서 엔진이 다시 프로세스 풀을 만들면
+#   ANALYSIS_SESSION_WORKERS x (VISUAL + VOICE 워커) 만큼 프로세스가 늘어나므로
+#   세션 워커 프로세스에서는 disable_inner_pools()로 엔진 내부 풀을 끕니다. (답변 단위 병렬만 사용)
+# - 그 외 프로세스에서도 엔진 내부 풀 하나의 워커 수는 cpu_budget()을 넘지 않습니다.
+# =========================================================
+_inner_pools_enabled = True
+
+
+def cpu_budget() -> int:
+    """분석에 쓸 CPU 프로세스 총 개수 (ANALYSIS_MAX_CPU_WORKERS, 0이면 CPU 코어 수)"""
+    if settings.ANALYSIS_MAX_CPU_WORKERS > 0:
+        return settings.ANALYSIS_MAX_CPU_WORKERS
+    return max(1, os.cpu_count() or 1)
+
+
+def disable_inner_pools() -> None:
+    """이 프로세스에서 엔진 내부 프로세스 풀 사용 금지 (세션 워커 initializer에서 호출)"""
+    global _inner_pools_enabled
+    _inner_pools_enabled = False
+
+
+def inner_pool_workers(requested: int) -> int:
+    """엔진 내부 풀에 실제로 쓸 워커 수 (1이면 순차 실행)"""
+    if not _inner_pools_enabled:
+        return 1
+    return max(1, min(int(requested), cpu_budget()))
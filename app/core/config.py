@@ -1,4 +1,6 @@
 import os
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -34,6 +36,135 @@ class Settings(BaseSettings):
     # =========================================================
     OPENAI_API_KEY: str = "" # .env에서 자동으로 읽어옴
 
+    # =========================================================
+    # 5. 분석 파이프라인 설정
+    # =========================================================
+    # 답변 1개 안에서 Visual 브랜치와 Audio 브랜치(STT -> Voice -> Content)를 동시에 실행
+    ANALYSIS_CONCURRENT_BRANCHES: bool = True
+
+    # 세션 분석 시 답변을 나눠 처리할 워커 프로세스 수 (1이면 기존처럼 순차 실행)
+    ANALYSIS_SESSION_WORKERS: int = 1
+    # 전체 워커를 통틀어 동시에 실행할 수 있는 MediaPipe / Whisper 인스턴스 수
+    ANALYSIS_MAX_VISUAL_JOBS: int = 2
+    ANALYSIS_MAX_STT_JOBS: int = 1
+    # 분석에 쓸 CPU 프로세스 총 개수 상한 (0 = CPU 코어 수)
+    # 세션 워커 수와 엔진 내부 풀(VISUAL_/VOICE_PARALLEL_WORKERS) 워커 수가 이 값을 넘지 않음
+    # 세션 워커 프로세스 안에서는 엔진 내부 풀을 쓰지 않음 (프로세스 수가 곱으로 늘어나지 않도록)
+    ANALYSIS_MAX_CPU_WORKERS: int = 0
+
+    # 세션 분석 요청 처리 방식
+    # - "queue": analysis_jobs 테이블에 작업만 등록 (python -m app.workers.analysis 워커가 처리)
+    # - "background": API 프로세스의 BackgroundTasks 에서 직접 실행 (워커 없이 로컬 개발용)
+    ANALYSIS_DISPATCH: str = "queue"
+    ANALYSIS_JOB_LEASE_SEC: int = 120       # 워커가 작업을 점유하는 시간 (heartbeat로 연장)
+    ANALYSIS_JOB_MAX_ATTEMPTS: int = 3      # 워커 사망/예외 시 재시도 포함 최대 실행 횟수
+    ANALYSIS_WORKER_POLL_SEC: float = 2.0   # 큐가 비었을 때 재조회 간격
+
+    # 답변 업로드 직후 해당 답변 분석을 바로 시작 (세션 종료 시에는 남은 답변만 기다렸다가 리포트 생성)
+    ANALYSIS_EAGER: bool = True
+    # background 모드에서 세션 파이프라인이 eager 분석 완료를 기다리는 최대 시간
+    ANALYSIS_EAGER_WAIT_SEC: float = 900.0
+
+    # =========================================================
+    # 6. 미디어 전처리 설정
+    # =========================================================
+    # 원본 영상을 한 번만 demux/decode 해서 프레임은 Visual, 16kHz PCM은 STT/Voice 로 바로 전달
+    # (False 이면 기존처럼 libx264 압축본 + WAV 파일을 만들어 엔진이 각자 디코드)
+    MEDIA_SINGLE_PASS_DECODE: bool = True
+    # 단일 패스 모드에서 재생용 압축본(.compressed.mp4)도 부가적으로 생성할지 여부
+    MEDIA_PLAYBACK_TRANSCODE: bool = False
+    # 업로드 원본(objects/) + 파생 파일(derived/) 저장소 루트 (원본 내용 해시 기준으로 저장/재사용)
+    MEDIA_STORE_ROOT: str = "uploads"
+    # Visual 엔진은 재생용 파일 대신 분석 전용 저해상도 proxy 사용
+    # (파일 모드: ffmpeg 로 proxy 파일 생성 / 단일 패스: 디코드 시 proxy 해상도로 바로 축소)
+    # V3 점수가 바뀌므로 scripts/ANALYSIS_PROXY_BENCHMARK.md 의 측정값이 채워지기 전까지 기본은 끔 (720p 원래 fps 로 분석)
+    MEDIA_ANALYSIS_PROXY: bool = False
+    MEDIA_ANALYSIS_PROXY_MAX_WIDTH: int = 640
+    MEDIA_ANALYSIS_PROXY_MAX_HEIGHT: int = 360
+    MEDIA_ANALYSIS_PROXY_FPS: float = 15.0
+    # Visual 엔진 추론 fps (고개/시선 기준, 깜빡임 후보 구간은 원본 fps). 0 이면 모든 프레임 추론
+    # V3 점수가 바뀌므로 scripts/compare_visual_sampling.py 로 점수 차이를 기록하기 전까지 기본은 0 (권장값 10)
+    VISUAL_SAMPLE_FPS: float = 0.0
+    # 프로세스당 FaceLandmarker 수 (동시에 분석할 수 있는 영상 수, 부족하면 대기). 영상마다 새 인스턴스로 교체해 추적 상태를 넘기지 않음
+    VISUAL_LANDMARKER_POOL_SIZE: int = 2
+    # 디코드 스레드가 추론보다 앞서 준비해 둘 프레임 수 (RGB ring 버퍼 개수). 0 이면 디코드/추론을 한 스레드에서 순차 실행
+    VISUAL_PIPELINE_DEPTH: int = 4
+    # 샘플링(VISUAL_SAMPLE_FPS > 0) 중에도 파이프라인 사용 여부
+    # 끄면 (기본) 디코더가 건너뛸 프레임을 grab() 만 하고 넘어감 / 켜면 디코드와 추론이 겹치지만 모든 프레임을 RGB 변환
+    VISUAL_PIPELINE_WITH_SAMPLING: bool = False
+    # 얼굴을 찾은 뒤에는 얼굴 주변 crop 으로만 추론 (놓치면 전체 프레임 재탐지, 얼굴 없는 구간은 0.5초 간격으로만 탐지)
+    # crop 은 별도 IMAGE 모드 landmarker 로 추론 (VIDEO 모드 추적 상태에는 전체 프레임만 들어감)
+    VISUAL_FACE_ROI_TRACKING: bool = False
+    VISUAL_FACE_ROI_PADDING: float = 0.5     # 얼굴 박스 긴 변 대비 사방 여백 비율
+    # 녹화 중 실시간 Visual 분석 (Streamlit WebRTC 프로세서에서 샘플링 프레임으로 V3 누적, 업로드 시 함께 전송)
+    VISUAL_LIVE_ANALYSIS: bool = False
+    # 실시간 결과가 있는 답변의 업로드 후 Visual 분석 방식
+    # - "off": 실시간 결과 무시 (항상 전체 분석)
+    # - "skip": 실시간 세부 점수를 검증 없이 사용 (Visual 분석 생략, 총점은 서버에서 재계산)
+    # - "verify": 저fps 로 빠르게 다시 분석해 세부 점수(고개/미소/깜빡임/시선)가 모두 허용 범위 안이면
+    #             실시간 세부 점수로 총점 재계산, 아니면 검증 분석 결과 사용 (원본 재디코드 없음)
+    VISUAL_LIVE_MODE: str = "verify"
+    VISUAL_LIVE_VERIFY_FPS: float = 2.0
+    VISUAL_LIVE_VERIFY_TOLERANCE: float = 0.2   # 세부 점수 허용 차이 (각 세부 점수 만점 대비 비율)
+    # 실시간 결과를 쓰기 위한 최소 분석 구간 비율 (녹화 길이 중 분석 프레임이 있는 0.5초 칸의 비율, 미만이면 결과를 버림)
+    VISUAL_LIVE_MIN_COVERAGE: float = 0.8
+    # 긴 영상을 시간 구간으로 나눠 프로세스별로 분석할 워커 수 (1이면 한 프로세스에서 순차 분석)
+    VISUAL_PARALLEL_WORKERS: int = 1
+    VISUAL_PARALLEL_MIN_WINDOW_SEC: float = 60.0   # 구간 하나의 최소 길이 (이보다 짧은 영상은 나누지 않음)
+    VISUAL_PARALLEL_OVERLAP_SEC: float = 2.0       # 구간 앞에서 추적/샘플러만 미리 돌리는 시간
+
+    # =========================================================
+    # 7. 답변 영상 업로드 제한
+    # =========================================================
+    UPLOAD_MAX_BYTES: int = 300 * 1024 * 1024     # 답변 영상 1개 최대 크기
+    UPLOAD_MAX_DURATION_SEC: float = 600.0        # 답변 영상 1개 최대 길이
+    UPLOAD_CHUNK_BYTES: int = 8 * 1024 * 1024     # 청크 업로드 1회 최대 크기
+
+    # =========================================================
+    # 8. 카메라 얼굴 가이드 (Streamlit WebRTC)
+    # =========================================================
+    FACE_GUIDE_DETECT_WIDTH: int = 320      # 얼굴 탐지용으로 줄인 프레임 너비
+    FACE_GUIDE_DETECT_EVERY: int = 5        # N 프레임마다 한 번 탐지 (사이 프레임은 마지막 박스 재사용)
+    FACE_GUIDE_TRACKING: bool = False       # 탐지 사이 프레임에서 템플릿 매칭으로 박스 이동 추적
+    FACE_GUIDE_CPU_BUDGET: float = 0.05     # 세션당 탐지/추적에 쓸 CPU 비율 (코어 1개 기준), 넘으면 탐지 간격을 늘림
+
+    # =========================================================
+    # 9. Voice 엔진
+    # =========================================================
+    # F0 추정 백엔드: "pyin" (librosa.pyin, 기존) / "yin" (벡터화 YIN, 말소리 범위만 탐색 - 빠름)
+    # 기본값 변경 전 scripts/bench_voice_pitch.py 로 답변 영상 기준 차이를 확인할 것
+    VOICE_PITCH_BACKEND: str = "pyin"
+    # 침묵 구간(silence_top_db 기준, 침묵 카운트와 같은 구간)은 F0 추정을 건너뛰고 무성으로 처리
+    # None = 백엔드에 따라 (yin: 켬 - 결과가 허용 오차 안, pyin: 끔 - voiced_ratio / avg_pitch 가 바뀜)
+    # 켜기 전 scripts/bench_voice_pitch.py --compare-skip 으로 허용 오차 확인 (scripts/VOICE_PITCH_BENCHMARK.md)
+    VOICE_PITCH_SKIP_SILENCE: Optional[bool] = None
+    # 긴 답변의 F0 추정을 침묵 지점에서 청크로 나눠 프로세스별로 실행할 워커 수 (1이면 순차)
+    # yin 이거나 침묵 건너뛰기가 켜진 pyin 일 때만 사용 (순차 실행과 결과가 같은 경우)
+    VOICE_PARALLEL_WORKERS: int = 1
+    VOICE_PARALLEL_MIN_CHUNK_SEC: float = 30.0   # 청크 하나의 최소 길이 (이보다 짧은 답변은 나누지 않음)
+    # 녹화 중 실시간 Voice 지표 (Streamlit WebRTC 오디오 프로세서에서 침묵/pitch 누적, 업로드 시 함께 전송)
+    # 꺼져 있으면 업로드 요청에 live_voice 가 있어도 저장하지 않음
+    VOICE_LIVE_ANALYSIS: bool = False
+    # 실시간 결과가 있는 답변의 업로드 후 Voice 분석 방식 (VOICE_LIVE_ANALYSIS 가 켜져 있을 때만)
+    # - "off": 실시간 결과 무시 (항상 전체 분석)
+    # - "skip": 실시간 침묵/pitch 지표를 그대로 쓰고 STT 기반 속도 지표만 계산
+    VOICE_LIVE_MODE: str = "off"
+    # 실시간 지표의 duration_sec 와 서버에서 잰 영상/오디오 길이 허용 차이 (넘으면 실시간 지표를 버림)
+    # max(VOICE_LIVE_DURATION_TOLERANCE_SEC, 길이 * VOICE_LIVE_DURATION_TOLERANCE_RATIO)
+    VOICE_LIVE_DURATION_TOLERANCE_SEC: float = 1.0
+    VOICE_LIVE_DURATION_TOLERANCE_RATIO: float = 0.05
+
+    # =========================================================
+    # 10. STT 엔진 (Whisper)
+    # =========================================================
+    # Whisper 에 발화 구간만 이어 붙여서 넘기고 세그먼트 시각은 원본 시간축으로 되돌림 (앞뒤/중간 긴 침묵 디코드 생략)
+    STT_VAD_TRIM: bool = False
+    STT_VAD_TOP_DB: float = 35.0        # 발화 판정 기준 (Voice 침묵 기준과 같은 값)
+    STT_VAD_PAD_SEC: float = 0.25       # 발화 구간 앞뒤로 남길 여유
+    STT_VAD_MIN_GAP_SEC: float = 1.0    # 이보다 짧은 쉼은 자르지 않음
+    STT_VAD_SPACER_SEC: float = 0.3     # 이어 붙인 구간 사이에 넣을 무음 (단어가 붙어 인식되지 않도록)
+    STT_VAD_MIN_SAVING: float = 0.1     # 잘라낼 길이가 전체의 이 비율보다 작으면 원본 그대로 전사
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
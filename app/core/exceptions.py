@@ -9,3 +9,7 @@ class DatabaseException(AppException):
 
 class ValidationException(AppException):
     pass
+
+class AnalysisCancelled(AppException):
+    """분석 작업 lease 를 잃어 결과를 버리고 중단 (다른 워커가 같은 작업을 가져감)"""
+    pass
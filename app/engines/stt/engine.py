@@ -1,10 +1,15 @@
 import os
 import math
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import whisper  # openai-whisper (pip package)
 
+from app.core.config import settings
 from app.engines.common.result import ok_result, error_result
+from app.engines.stt.vad import TimelineMap, pack_regions, speech_regions
+from app.utils.audio_io import load_pcm
+from app.utils.media_decode import ANALYSIS_SAMPLE_RATE
 
 MODULE_NAME = "stt"
 
@@ -61,10 +66,33 @@ def _confidence_proxy_from_segments(segments: List[Dict[str, Any]]) -> float:
     return float(sum(vals) / len(vals)) if vals else 0.0
 
 
+def _vad_trim(audio: np.ndarray) -> Optional[Tuple[np.ndarray, TimelineMap]]:
+    """
+    발화 구간만 이어 붙인 버퍼 + 시간축 변환표
+    - 발화가 없거나 잘라낼 길이가 STT_VAD_MIN_SAVING 비율보다 작으면 None (원본 그대로 전사)
+    """
+    sr = ANALYSIS_SAMPLE_RATE
+    regions = speech_regions(
+        audio, sr,
+        top_db=settings.STT_VAD_TOP_DB,
+        pad_sec=settings.STT_VAD_PAD_SEC,
+        min_gap_sec=settings.STT_VAD_MIN_GAP_SEC,
+    )
+    if not regions:
+        return None
+    packed, timeline = pack_regions(audio, regions, sr, spacer_sec=settings.STT_VAD_SPACER_SEC)
+    if len(packed) > len(audio) * (1.0 - settings.STT_VAD_MIN_SAVING):
+        return None
+    return packed, timeline
+
+
 def run_stt(
-    audio_path: str,
+    audio_path: Optional[str],
     model_name: str = "small",
     language: Optional[str] = "ko",   # 예: "ko"
+    *,
+    audio: Optional[np.ndarray] = None,
+    vad: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """
     STT 엔진 (Whisper) - v0 규격 반환
@@ -77,22 +105,54 @@ def run_stt(
     - model_name: 사용한 whisper 모델
     - language: 지정 언어(예: ko). None이면 whisper가 자동 감지할 수도 있음
 
+    ✅ audio(16kHz mono float32 ndarray)를 주면 audio_path 대신 사용
+    - Whisper가 ffmpeg로 파일을 다시 디코드하지 않음
+    - audio_path 만 주면 load_pcm 으로 한 번 읽어서 넘김 (경로 호출 호환)
+
+    ✅ vad(기본 settings.STT_VAD_TRIM)가 켜져 있으면 발화 구간만 이어 붙여 전사
+    - 앞뒤/중간의 긴 침묵을 디코드하지 않음 (CPU 시간 절약 + 침묵 구간 환각 세그먼트 감소)
+    - segments 의 start/end 는 원본 녹음 시간축으로 되돌려서 반환 (Voice 엔진 속도/불안정 지표 그대로 사용)
+
     ✅ v0 contract 준수:
     - 성공: ok_result("stt", metrics=..., events=[])
     - 실패: error_result("stt", ..., ...)  (예외 터뜨리지 않음)
     """
     try:
         # ----------------------------------------------------
-        # 1) 입력 검증: audio_path 유효성 및 파일 존재/크기 체크
-        # ----------------------------------------------------
-        if not audio_path:
-            return error_result(MODULE_NAME, "STT_ERROR", "audio_path is required")
-
-        if not os.path.exists(audio_path):
-            return error_result(MODULE_NAME, "STT_ERROR", f"audio file not found: {audio_path}")
-
-        if os.path.getsize(audio_path) <= 0:
-            return error_result(MODULE_NAME, "STT_ERROR", f"audio file is empty: {audio_path}")
+        # 1) 입력 검증: audio 버퍼 또는 audio_path 유효성 및 파일 존재/크기 체크
+        # ----------------------------------------------------
+        if audio is not None:
+            if len(audio) == 0:
+                return error_result(MODULE_NAME, "STT_ERROR", "audio buffer is empty")
+            audio_input: Any = np.asarray(audio, dtype=np.float32)
+        else:
+            if not audio_path:
+                return error_result(MODULE_NAME, "STT_ERROR", "audio_path is required")
+
+            if not os.path.exists(audio_path):
+                return error_result(MODULE_NAME, "STT_ERROR", f"audio file not found: {audio_path}")
+
+            if os.path.getsize(audio_path) <= 0:
+                return error_result(MODULE_NAME, "STT_ERROR", f"audio file is empty: {audio_path}")
+            # Whisper 가 ffmpeg 를 따로 띄우지 않도록 직접 읽어서 넘김 (whisper.load_audio 와 같은 스케일)
+            audio_input = load_pcm(audio_path)
+
+        # 발화 구간만 이어 붙이기 (선택)
+        if vad is None:
+            vad = settings.STT_VAD_TRIM
+        timeline: Optional[TimelineMap] = None
+        vad_info: Optional[Dict[str, Any]] = None
+        if vad:
+            total_sec = len(audio_input) / float(ANALYSIS_SAMPLE_RATE)
+            trimmed = _vad_trim(audio_input)
+            if trimmed is not None:
+                audio_input, timeline = trimmed
+            vad_info = {
+                "applied": timeline is not None,
+                "total_sec": round(total_sec, 3),
+                "speech_sec": round(timeline.speech_sec if timeline else total_sec, 3),
+                "regions": len(timeline.regions) if timeline else None,
+            }
 
         # ----------------------------------------------------
         # 2) Whisper 모델 로드 (전역 캐시)
@@ -112,7 +172,7 @@ def run_stt(
         # 4) STT 수행
         # - stt_result는 dict 형태로 text/segments 등을 포함
         # ----------------------------------------------------
-        stt_result = model.transcribe(audio_path, **transcribe_kwargs)
+        stt_result = model.transcribe(audio_input, **transcribe_kwargs)
 
         # 전체 텍스트 추출
         full_text = (stt_result.get("text") or "").strip()
@@ -124,14 +184,20 @@ def run_stt(
         # 5) segments를 "슬림 버전"으로 정리
         # - Whisper segments에는 다양한 키가 들어있고 용량이 커질 수 있음
         # - MVP/플랫폼 연동 목적에 필요한 필드만 남김
+        # - VAD 로 자른 경우 start/end 를 원본 시간축으로 변환
         # ----------------------------------------------------
         slim_segments: List[Dict[str, Any]] = []
         for s in segments:
+            start = float(s.get("start", 0.0))
+            end = float(s.get("end", 0.0))
+            if timeline is not None:
+                start = timeline.to_original(start, side="start")
+                end = max(start, timeline.to_original(end, side="end"))
             slim_segments.append(
                 {
                     "id": s.get("id"),
-                    "start": float(s.get("start", 0.0)),
-                    "end": float(s.get("end", 0.0)),
+                    "start": start,
+                    "end": end,
                     "text": (s.get("text") or "").strip(),
                     # confidence proxy 계산에 활용 가능
                     "avg_logprob": s.get("avg_logprob"),
@@ -156,6 +222,8 @@ def run_stt(
             "model_name": model_name,
             "language": language,
         }
+        if vad_info is not None:
+            metrics["vad"] = vad_info
 
         # ----------------------------------------------------
         # 8) v0 contract 성공 반환
@@ -0,0 +1,99 @@
+"""
+Whisper 입력용 VAD 전처리 (STT_VAD_TRIM)
+
+- 발화 구간: Voice 엔진과 같은 에너지 기준(VoiceFeatureFrame.non_silent)으로 찾고 앞뒤 여유(pad)를 붙임
+  가까운 구간(min_gap 미만 쉼)은 합쳐서 문장 중간의 짧은 쉼은 그대로 둠
+- 발화 구간만 이어 붙인 짧은 버퍼를 Whisper 에 넘기고 (구간 사이에는 짧은 무음 spacer)
+- 결과 세그먼트의 start / end 를 원래 녹음 시간축으로 되돌림
+  => calculate_cps_flow / _compute_instability_from_segments 는 그대로 원본 시간 기준 세그먼트를 받음
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from app.engines.voice.features import VoiceFeatureFrame
+
+
+@dataclass(frozen=True)
+class SpeechRegion:
+    start: int          # 원본 샘플 위치 [start, end)
+    end: int
+    packed_start: int   # 이어 붙인 버퍼에서의 시작 샘플
+
+
+def speech_regions(
+    audio: np.ndarray,
+    sr: int,
+    *,
+    top_db: float,
+    pad_sec: float,
+    min_gap_sec: float,
+) -> List[Tuple[int, int]]:
+    """발화 구간 [(start, end), ...] (샘플, pad 포함 / 가까운 구간 병합)"""
+    n = len(audio)
+    pad = int(pad_sec * sr)
+    min_gap = int(min_gap_sec * sr)
+    regions: List[Tuple[int, int]] = []
+    for start, end in VoiceFeatureFrame(audio, sr).non_silent(top_db):
+        start, end = max(0, int(start) - pad), min(n, int(end) + pad)
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def pack_regions(
+    audio: np.ndarray,
+    regions: List[Tuple[int, int]],
+    sr: int,
+    *,
+    spacer_sec: float,
+) -> Tuple[np.ndarray, "TimelineMap"]:
+    """발화 구간만 이어 붙인 버퍼 + 시간축 변환표"""
+    spacer = int(spacer_sec * sr)
+    total = sum(e - s for s, e in regions) + spacer * max(0, len(regions) - 1)
+    packed = np.zeros(total, dtype=np.float32)
+    placed: List[SpeechRegion] = []
+    pos = 0
+    for s, e in regions:
+        packed[pos:pos + (e - s)] = audio[s:e]
+        placed.append(SpeechRegion(s, e, pos))
+        pos += (e - s) + spacer
+    return packed, TimelineMap(placed, sr)
+
+
+class TimelineMap:
+    """이어 붙인 버퍼의 시각(초) -> 원본 녹음 시각(초)"""
+
+    def __init__(self, regions: List[SpeechRegion], sr: int):
+        self.regions = regions
+        self.sr = sr
+        self._starts = [r.packed_start for r in regions]
+
+    def to_original(self, t_sec: float, *, side: str = "start") -> float:
+        """
+        구간 안의 시각은 그대로 평행 이동
+        spacer(구간 사이 무음)에 떨어지면 start 는 다음 구간 시작, end 는 이전 구간 끝으로 붙임
+        """
+        if not self.regions:
+            return float(t_sec)
+        pos = t_sec * self.sr
+        i = max(0, bisect_right(self._starts, pos) - 1)
+        r = self.regions[i]
+        length = r.end - r.start
+        offset = pos - r.packed_start
+        if offset <= length:
+            return (r.start + max(0.0, offset)) / self.sr
+        # spacer 또는 마지막 구간 뒤
+        if side == "start" and i + 1 < len(self.regions):
+            return self.regions[i + 1].start / self.sr
+        return r.end / self.sr
+
+    @property
+    def speech_sec(self) -> float:
+        return sum(r.end - r.start for r in self.regions) / float(self.sr)
@@ -3,37 +3,27 @@ import cv2
 import math
 import numpy as np
 import mediapipe as mp
-from typing import Dict, Any, List
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
+import time
+from typing import Dict, Any, Iterable, Optional, Tuple
 
 from app.engines.common.result import ok_result, error_result
+from app.engines.visual.sampling import (
+    BASE_SAMPLE_FPS,
+    FrameSampler,
+    make_frame_sampler,
+    pipeline_depth,
+    pipeline_details,
+    source_filter,
+)
+from app.engines.visual.scoring import HistoryLike, score_history
+from app.engines.visual.landmarks import LandmarkBuffer
+from app.engines.visual.landmarker_pool import LandmarkerPool
+from app.engines.visual.pipeline import FramePipeline
+from app.engines.visual.roi import FaceRoiTracker, make_roi_tracker
 
 # 프로젝트 설정 (필요 시 사용)
 from app.core.config import settings
 
-# =========================================================
-# ⚙️ V3 채점 기준 상수 설정
-# =========================================================
-# [1] Head (고개 각도)
-HEAD_NORMAL_THRESHOLD = 2.5   # 정상 범위 (±2.5도)
-HEAD_MINOR_THRESHOLD = 10.0   # 경미/심각 경계 (10도)
-HEAD_MINOR_TIME_LIMIT = 3.0   # 경미한 이탈 허용 시간 (3초)
-HEAD_MINOR_ALLOW_COUNT = 3    # 경미한 이탈 허용 횟수
-HEAD_MAJOR_ALLOW_COUNT = 1    # 심각한 이탈 허용 횟수
-
-# [2] Smile (미소)
-SMILE_THRESHOLD = 0.5         # 미소 감지 임계값 (Blendshape)
-
-# [3] Blink (눈 깜빡임)
-BLINK_THRESHOLD = 0.5         # 눈 감음 임계값
-BLINK_RPM_MIN = 10            # 정상 최소 RPM
-BLINK_RPM_MAX = 30            # 정상 최대 RPM
-
-# [4] Gaze (시선)
-GAZE_OFF_RATIO_LIMIT = 0.10   # 전체 시간 대비 허용 이탈 비율 (10%)
-GAZE_LONG_DURATION = 2.0      # 장기 이탈 기준 시간 (2초)
-
 # MediaPipe 모델 경로
 MODEL_PATH = os.path.join(os.getcwd(), "app", "engines", "visual", "models", "face_landmarker.task")
 
@@ -44,6 +34,7 @@ class VisualAnalysisEngine:
 
     # ---------------------------------------------------------
     # 📐 수학/기하학 유틸리티 함수
+    # (프레임 1개 기준 참조 구현. 분석 경로는 landmarks.py 의 벡터 계산 사용)
     # ---------------------------------------------------------
     def _calculate_head_angle(self, p_nose, p_head) -> float:
         """코(Nose)와 정수리(HeadTop) 좌표를 이용해 고개 기울기(Roll) 계산"""
@@ -95,301 +86,273 @@ class VisualAnalysisEngine:
     # ---------------------------------------------------------
     # 🚀 메인 분석 로직
     # ---------------------------------------------------------
-    def analyze(self, video_path: str) -> Dict[str, Any]:
+    def analyze(self, video_path: str, sampler: Optional[FrameSampler] = None) -> Dict[str, Any]:
+        """
+        sampler 가 있으면 필요 없는 프레임은 추론 생략
+        (파이프라인이 없으면 cap.grab() 만 하고 넘어감, 파이프라인에서는 추론 스레드에서만 거름 - pipeline_depth 참고)
+        """
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             return {"error": "Failed to open video file"}
-        base_options = python.BaseOptions(model_asset_path=MODEL_PATH)
-        options = vision.FaceLandmarkerOptions(
-            base_options=base_options,
-            running_mode=vision.RunningMode.VIDEO, # 비디오 모드
-            num_faces=1,
-            output_face_blendshapes=True,
-            output_facial_transformation_matrixes=True
-        )
-        landmarker = vision.FaceLandmarker.create_from_options(options)
         fps = cap.get(cv2.CAP_PROP_FPS) or 30
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         duration_sec = frame_count / fps if fps > 0 else 0
 
-        # 시계열 데이터 저장소
-        history = {
-            "timestamps": [],
-            "head_angles": [],
-            "gaze_shifts": [],
-            "blink_scores": [],
-            "smile_scores": []
-        }
-        try :
+        want = source_filter(sampler)
+
+        def _frames(convert: bool):
+            bgr = None
+            try:
+                while cap.grab():
+                    timestamp_ms = int(cap.get(cv2.CAP_PROP_POS_MSEC))
+                    if want is not None and not want(timestamp_ms):
+                        continue
+                    ret, bgr = cap.retrieve(bgr)  # 디코드 버퍼 재사용
+                    if not ret:
+                        break
+                    yield timestamp_ms, (cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB) if convert else bgr)
+            finally:
+                # 🟢 [수정 3] 사용 후 반드시 리소스 해제
+                cap.release()
+
+        depth = pipeline_depth(sampler)
+        if depth <= 0:
+            return self.analyze_frames(_frames(True), duration_sec, sampler)
+        # decoder 스레드에서 grab/retrieve + BGR->RGB 변환을 미리 할당한 ring 버퍼에 바로 기록
+        frames = FramePipeline(_frames(False), depth=depth, convert=_bgr_to_rgb)
+        return self.analyze_frames(frames, duration_sec, sampler)
+
+    def analyze_frames(
+        self,
+        frames: Iterable[Tuple[int, np.ndarray]],
+        duration_sec: float,
+        sampler: Optional[FrameSampler] = None,
+    ) -> Dict[str, Any]:
+        """
+        이미 디코드된 프레임 스트림을 분석합니다.
+        - frames: (timestamp_ms, RGB ndarray) 순서대로
+          (예: SinglePassMedia.iter_frames(want=source_filter(sampler)) - 파일을 다시 디코드하지 않음)
+        - sampler: 추론할 프레임 선택 (프레임 소스에서 미리 거르지 않았어도 여기서 한 번 더 거름)
+        """
+        # 디코드(프레임 소스)와 추론을 다른 스레드에서 겹쳐 실행 (샘플링 중이면 기본은 순차 - pipeline_depth)
+        depth = pipeline_depth(sampler)
+        if depth > 0 and not isinstance(frames, FramePipeline):
+            frames = FramePipeline(frames, depth=depth)
+
+        # 프레임별 랜드마크 저장소 (미리 잡아둔 structured 배열, 부족하면 자동 확장)
+        landmarks = LandmarkBuffer(capacity=int(max(duration_sec, 1.0) * 32))
+        tracker = make_roi_tracker()
+        try:
             # 1️⃣ 프레임 단위 데이터 추출
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                timestamp_ms = int(cap.get(cv2.CAP_PROP_POS_MSEC))
-                h, w, _ = frame.shape
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                mp_img = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
-
-                result = landmarker.detect_for_video(mp_img, timestamp_ms)
-
-                # 기본값 (감지 안될 경우)
-                angle = 0.0
-                gaze_shift = 0.0
-                blink_sc = 0.0
-                smile_sc = 0.0
-
-                if result.face_landmarks:
-                    landmarks = result.face_landmarks[0]
-                    blendshapes = result.face_blendshapes[0]
-
-                    # (1) Head Angle
-                    nose = landmarks[1]
-                    head_top = landmarks[10]
-                    angle = self._calculate_head_angle(nose, head_top)
-
-                    # (2) Gaze Shift
-                    gaze_shift = self._get_iris_shift(landmarks, w, h)
-
-                    # (3) Blendshapes (Blink & Smile)
-                    # MediaPipe Blendshape 이름 매핑
-                    bs_dict = {b.category_name: b.score for b in blendshapes}
-                    blink_sc = (bs_dict.get('eyeBlinkLeft', 0) + bs_dict.get('eyeBlinkRight', 0)) / 2.0
-                    smile_sc = (bs_dict.get('mouthSmileLeft', 0) + bs_dict.get('mouthSmileRight', 0)) / 2.0
-
-                history["timestamps"].append(timestamp_ms / 1000.0) # sec
-                history["head_angles"].append(angle)
-                history["gaze_shifts"].append(gaze_shift)
-                history["blink_scores"].append(blink_sc)
-                history["smile_scores"].append(smile_sc)
-
+            self.extract_landmarks(frames, sampler, landmarks, tracker)
         except Exception as e:
             print(f"MediaPipe Process Error: {e}")
             return {"error": str(e)}
-        
-        finally:
-            # 🟢 [수정 3] 사용 후 반드시 리소스 해제
-            cap.release()
-            landmarker.close()
-
-        # 2️⃣ V3 채점 로직 적용
-        return self._calculate_v3_score(history, duration_sec)
-
-    def _calculate_v3_score(self, h: Dict[str, List[float]], duration: float) -> Dict[str, Any]:
-        if duration <= 0:
-            return {"score": 0, "feedback": "영상 길이가 너무 짧습니다."}
-
-        # --- 점수판 초기화 ---
-        scores = {
-            "head": 50,
-            "smile": 0,  # 기본 0, 감지시 +5
-            "blink": 10,
-            "gaze": 20,
-            "base": 15
-        }
-        deductions = [] # 감점 사유 기록
-
-        # =========================================================
-        # [1] Head Logic (50점 만점)
-        # =========================================================
-        # 2.5도 ~ 10도 (Minor), 10도 이상 (Major)
-        minor_events = [] # duration list
-        major_events = [] # duration list
-        
-        curr_state = "NORMAL" # NORMAL, MINOR, MAJOR
-        start_time = 0
-        
-        times = h["timestamps"]
-        angles = h["head_angles"]
-
-        for i, t in enumerate(times):
-            abs_ang = abs(angles[i])
-            
-            # 상태 판단
-            if abs_ang >= HEAD_MINOR_THRESHOLD:
-                new_state = "MAJOR"
-            elif abs_ang >= HEAD_NORMAL_THRESHOLD:
-                new_state = "MINOR"
-            else:
-                new_state = "NORMAL"
-
-            # 상태 변화 처리 (이벤트 종료 및 기록)
-            if new_state != curr_state:
-                if curr_state != "NORMAL":
-                    dur = t - start_time
-                    if curr_state == "MINOR": minor_events.append(dur)
-                    if curr_state == "MAJOR": major_events.append(dur)
-                
-                start_time = t
-                curr_state = new_state
-        
-        # 마지막 상태 처리
-        if curr_state != "NORMAL":
-            dur = times[-1] - start_time
-            if curr_state == "MINOR": minor_events.append(dur)
-            if curr_state == "MAJOR": major_events.append(dur)
-
-        # -- Head 점수 계산 --
-        head_deduction = 0
-        
-        # Minor Logic: 3초 초과 -> 즉시 -10 (불안정). 3초 이하 -> 3회 허용 후 -5/회
-        minor_short_count = 0
-        for dur in minor_events:
-            if dur > HEAD_MINOR_TIME_LIMIT:
-                head_deduction += 10
-                deductions.append(f"고개 경미 이탈 3초 이상 지속 (-10점)")
-            else:
-                minor_short_count += 1
-        
-        if minor_short_count > HEAD_MINOR_ALLOW_COUNT:
-            penalty_count = minor_short_count - HEAD_MINOR_ALLOW_COUNT
-            ded = penalty_count * 5
-            head_deduction += ded
-            deductions.append(f"고개 경미 이탈 횟수 초과({penalty_count}회) (-{ded}점)")
-
-        # Major Logic: 1회 허용, 이후 -20/회
-        if len(major_events) > HEAD_MAJOR_ALLOW_COUNT:
-            penalty_count = len(major_events) - HEAD_MAJOR_ALLOW_COUNT
-            ded = penalty_count * 20
-            head_deduction += ded
-            deductions.append(f"고개 심각한 이탈 횟수 초과({penalty_count}회) (-{ded}점)")
-
-        # 최대 감점 -50
-        scores["head"] = max(0, 50 - min(50, head_deduction))
-
-
-        # =========================================================
-        # [2] Smile Logic (5점 만점)
-        # =========================================================
-        # 한번이라도 0.5 이상이면 +5
-        max_smile = max(h["smile_scores"]) if h["smile_scores"] else 0
-        if max_smile >= SMILE_THRESHOLD:
-            scores["smile"] = 5
-        else:
-            deductions.append("미소가 감지되지 않음 (0/5점)")
-
-
-        # =========================================================
-        # [3] Blink Logic (10점 만점)
-        # =========================================================
-        # Blink Count (Rising Edge 감지)
-        blink_cnt = 0
-        is_closed = False
-        for s in h["blink_scores"]:
-            if s > BLINK_THRESHOLD:
-                if not is_closed:
-                    blink_cnt += 1
-                    is_closed = True
-            else:
-                is_closed = False
-        
-        rpm = blink_cnt / (duration / 60.0) if duration > 0 else 0
-        
-        if rpm < BLINK_RPM_MIN: # 너무 적게 깜빡임 (긴장/경직)
-            if rpm < 5: # 심각
-                scores["blink"] -= 10
-                deductions.append(f"눈 깜빡임이 매우 부족함({rpm:.1f}회/분) (-10점)")
-            else:
-                scores["blink"] -= 5
-                deductions.append(f"눈 깜빡임 부족({rpm:.1f}회/분) (-5점)")
-        elif rpm > BLINK_RPM_MAX: # 너무 많이 깜빡임 (불안)
-            if rpm > 50: # 심각
-                scores["blink"] -= 10
-                deductions.append(f"눈 깜빡임이 과도함({rpm:.1f}회/분) (-10점)")
-            else:
-                scores["blink"] -= 5
-                deductions.append(f"눈 깜빡임 다소 과함({rpm:.1f}회/분) (-5점)")
-        
-        scores["blink"] = max(0, scores["blink"]) # 0점 미만 방지
 
-
-        # =========================================================
-        # [4] Gaze Logic (20점 만점)
-        # =========================================================
-        GAZE_THRESH = 0.15 # 튜닝값 (이 정도 shift면 이탈로 간주)
-        
-        gaze_off_frames = 0
-        long_gaze_events = 0
-        current_gaze_dur = 0
-        
-        for shift in h["gaze_shifts"]:
-            if shift > GAZE_THRESH:
-                gaze_off_frames += 1
-                current_gaze_dur += 1
+        # 2️⃣ 고개 각도 / 시선 / blink / smile 시계열 계산 후 V3 채점 로직 적용
+        result = self.score_landmarks(landmarks, duration_sec, sampler.stats() if sampler is not None else None)
+        if tracker is not None and "details" in result:
+            result["details"]["roi"] = tracker.stats()
+        if "details" in result:
+            result["details"]["pipeline"] = pipeline_details(sampler)
+        if isinstance(frames, FramePipeline) and "details" in result:
+            stages = frames.stats()
+            result["details"]["pipeline"].update(stages)
+            print(
+                f"⏱️ [Visual Pipeline] decode {stages['decode_utilization'] * 100:.0f}% / "
+                f"inference {stages['infer_utilization'] * 100:.0f}% (병목: {stages['bottleneck']})"
+            )
+        return result
+
+    def extract_landmarks(
+        self,
+        frames: Iterable[Tuple[int, np.ndarray]],
+        sampler: Optional[FrameSampler] = None,
+        landmarks: Optional[LandmarkBuffer] = None,
+        tracker: Optional[FaceRoiTracker] = None,
+    ) -> LandmarkBuffer:
+        """
+        프레임 스트림 -> 채점용 랜드마크 버퍼 (채점은 하지 않음, 병렬 구간 분석에서도 사용)
+        - tracker: 얼굴 ROI crop 추론 (None 이면 매 프레임 전체 프레임 추론)
+        """
+        if landmarks is None:
+            landmarks = LandmarkBuffer()
+        try:
+            # 풀에서 landmarker 를 빌려 씀 (모델 로드는 프로세스당 한 번, 끝나면 닫지 않고 반납)
+            with landmarker_pool.acquire() as landmarker:
+                self._extract_with(landmarker, frames, sampler, landmarks, tracker)
+        finally:
+            # 프레임 소스(제너레이터) 해제
+            close = getattr(frames, "close", None)
+            if close is not None:
+                close()
+        return landmarks
+
+    def _extract_with(
+        self,
+        landmarker,
+        frames,
+        sampler,
+        landmarks: LandmarkBuffer,
+        tracker: Optional[FaceRoiTracker] = None,
+    ) -> None:
+        last_ts = -1
+        for timestamp_ms, rgb in frames:
+            if sampler is not None and not sampler.want(timestamp_ms):
+                continue
+            sample_ts = timestamp_ms
+
+            # VIDEO 모드는 timestamp가 단조 증가해야 함
+            if timestamp_ms <= last_ts:
+                timestamp_ms = last_ts + 1
+            last_ts = timestamp_ms
+
+            h, w, _ = rgb.shape
+            roi = None
+            if tracker is None:
+                mp_img = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+                result = landmarker.detect_for_video(mp_img, timestamp_ms)
             else:
-                # 이탈 종료 시 장기 여부 체크
-                if current_gaze_dur > 0:
-                    # 프레임 수 -> 시간 변환 필요 (여기선 약식으로 프레임간격 평균 사용)
-                    # 정확히 하려면 timestamp 참조해야 함. 약식 로직:
-                    dt = duration / len(h["timestamps"])
-                    sec = current_gaze_dur * dt
-                    if sec > GAZE_LONG_DURATION:
-                        long_gaze_events += 1
-                current_gaze_dur = 0
-        
-        total_score = 100
-        # 점수 계산
-        ratio = gaze_off_frames / len(h["timestamps"]) if h["timestamps"] else 0
-        
-        # 전체 이탈 비율 10% 이상 -> -10
-        if ratio >= GAZE_OFF_RATIO_LIMIT:
-            scores["gaze"] -= 10
-            deductions.append(f"시선 불안정 비율 높음({ratio*100:.1f}%) (-10점)")
-        
-        # 장기 이탈 횟수당 -5 (최대 -10)
-        if long_gaze_events > 0:
-            ded = min(10, long_gaze_events * 5)
-            scores["gaze"] -= ded
-            deductions.append(f"2초 이상 시선 이탈 {long_gaze_events}회 (-{ded}점)")
-
-        scores["gaze"] = max(0, scores["gaze"])
-
-
-        # =========================================================
-        # 📝 최종 결과 집계
-        # =========================================================
-        final_score = sum(scores.values())
-        
-        summary = ""
-        if final_score >= 90: summary = "매우 안정적이고 훌륭한 비언어적 태도입니다."
-        elif final_score >= 70: summary = "전반적으로 양호하나 일부 개선이 필요합니다."
-        else: summary = "시선 처리와 자세에서 불안정한 모습이 보입니다."
-
-        # 피드백 문자열 생성
-        feedback_str = summary
-        if deductions:
-            feedback_str += "\n\n[주요 감점 요인]\n- " + "\n- ".join(deductions[:3]) # 상위 3개만
-
-        return {
-            "score": int(final_score),
-            "feedback": feedback_str,
-            "details": {
-                "head_score": scores["head"],
-                "smile_score": scores["smile"],
-                "blink_score": scores["blink"],
-                "gaze_score": scores["gaze"],
-                "rpm": round(rpm, 1),
-                "timeline_timestamps": h["timestamps"][::15], # 그래프용 (데이터 줄임)
-                "timeline_head": h["head_angles"][::15]
-            }
-        }
+                if tracker.skip(timestamp_ms):
+                    # 얼굴 없는 구간: 추론 없이 '얼굴 없음' 으로 기록
+                    landmarks.append_empty(timestamp_ms / 1000.0)
+                    if sampler is not None:
+                        sampler.observe(sample_ts, 0.0)
+                    continue
+                result, roi = self._detect_tracked(landmarker, tracker, rgb, w, h, timestamp_ms)
+
+            # 채점에 필요한 랜드마크/blendshape 만 버퍼에 복사 (파생 지표는 끝난 뒤 한 번에 계산)
+            blink_sc = landmarks.append(timestamp_ms / 1000.0, w, h, result, roi=roi) # ts: sec
+
+            if sampler is not None:
+                sampler.observe(sample_ts, blink_sc)
+
+    def _detect_tracked(self, landmarker, tracker: FaceRoiTracker, rgb: np.ndarray, w: int, h: int, timestamp_ms: int):
+        """
+        얼굴 ROI crop 으로 추론, crop 에서 놓치면 같은 프레임을 전체 프레임으로 다시 탐지
+        - crop 은 IMAGE 모드 landmarker (프레임마다 독립), 전체 프레임만 VIDEO 모드 landmarker
+          => VIDEO 모드 추적에 크기가 다른 이미지가 섞이지 않고, 같은 timestamp 를 두 번 넘기지 않음
+        반환: (result, 사용한 roi 또는 None)
+        """
+        roi = tracker.roi
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            crop = np.ascontiguousarray(rgb[y0:y1, x0:x1])
+            result = landmarker.detect_image(mp.Image(image_format=mp.ImageFormat.SRGB, data=crop))
+            box = tracker.locate(result, roi, w, h)
+            if box is not None and tracker.inside(box, roi):
+                tracker.crop_frames += 1
+                tracker.update(box, w, h, timestamp_ms)
+                return result, roi
+            tracker.redetects += 1
+
+        # 전체 프레임 (VIDEO 모드, 이 프레임의 timestamp 로 한 번만 호출)
+        result = landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), timestamp_ms)
+        tracker.full_frames += 1
+        tracker.update(tracker.locate(result, None, w, h), w, h, timestamp_ms)
+        return result, None
+
+    def score_landmarks(
+        self,
+        landmarks: LandmarkBuffer,
+        duration_sec: float,
+        sampling: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """랜드마크 버퍼 전체 -> 시계열 -> V3 점수 (sampling: 샘플러 통계, details 에 기록)"""
+        history = landmarks.to_history()
+        result = self._calculate_v3_score(history, duration_sec)
+        if sampling is not None and "details" in result:
+            result["details"]["sampling"] = sampling
+        return result
+
+    def _calculate_v3_score(self, h: HistoryLike, duration: float) -> Dict[str, Any]:
+        """V3 채점 (벡터화 구현은 app/engines/visual/scoring.py)"""
+        return score_history(h, duration)
+
+def _bgr_to_rgb(bgr: np.ndarray, dst: np.ndarray) -> None:
+    cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=dst)
 
 # 싱글톤 인스턴스
 _visual_engine = VisualAnalysisEngine()
+# FaceLandmarker 풀 (프로세스별, spawn 된 워커 프로세스는 각자 풀을 가짐)
+landmarker_pool = LandmarkerPool(MODEL_PATH, settings.VISUAL_LANDMARKER_POOL_SIZE)
 
-def run_visual(video_path: str) -> Dict[str, Any]:
+def run_visual(video_path: str, sampler: Optional[FrameSampler] = None) -> Dict[str, Any]:
     """
     Visual 엔진의 외부 표준 인터페이스 (v0 contract)
     - 성공: {"module":"visual","metrics":{score,feedback,details}, "events":[], "error":None}
     - 실패: {"module":"visual","metrics":{}, "events":[], "error":{type,message}}
+    - sampler: 추론 프레임 선택 (기본: VISUAL_SAMPLE_FPS)
     """
     try:
-        raw = _visual_engine.analyze(video_path)  # 기존 로직 (raw v3)
+        raw = _visual_engine.analyze(video_path, sampler or make_frame_sampler())  # 기존 로직 (raw v3)
     except Exception as e:
         # 엔진 자체 예외
         return error_result("visual", "VisualException", str(e))
+    return _to_v0(raw)
+
+
+def run_visual_frames(
+    frames: Iterable[Tuple[int, np.ndarray]],
+    duration_sec: float,
+    *,
+    sampler: Optional[FrameSampler] = None,
+) -> Dict[str, Any]:
+    """
+    run_visual 과 같은 v0 결과를, 파일 대신 디코드된 (timestamp_ms, RGB) 프레임 스트림에서 만듭니다.
+    - sampler: 프레임 소스와 같은 샘플러를 넘겨야 함 (예: iter_frames(want=source_filter(sampler)))
+    """
+    try:
+        raw = _visual_engine.analyze_frames(frames, duration_sec, sampler)
+    except Exception as e:
+        return error_result("visual", "VisualException", str(e))
+    return _to_v0(raw)
+
+
+def compare_sampling(video_path: str, base_fps: Optional[float] = None) -> Dict[str, Any]:
+    """
+    [비교 모드] 같은 영상을 모든 프레임 / 샘플링으로 각각 분석해 점수 차이와 속도 향상을 반환
+    - base_fps: 샘플링 기준 fps (기본: settings.VISUAL_SAMPLE_FPS, 0 이면 BASE_SAMPLE_FPS)
+    """
+    if base_fps is None:
+        base_fps = settings.VISUAL_SAMPLE_FPS or BASE_SAMPLE_FPS
+
+    runs = {}
+    for name, sampler in (("full", FrameSampler(0)), ("sampled", FrameSampler(base_fps))):
+        t0 = time.perf_counter()
+        raw = _visual_engine.analyze(video_path, sampler)
+        elapsed = time.perf_counter() - t0
+        if raw.get("error"):
+            return {"error": f"{name}: {raw['error']}"}
+        details = raw.get("details", {})
+        runs[name] = {
+            "score": raw.get("score", 0),
+            "head_score": details.get("head_score"),
+            "smile_score": details.get("smile_score"),
+            "blink_score": details.get("blink_score"),
+            "gaze_score": details.get("gaze_score"),
+            "rpm": details.get("rpm"),
+            "frames_analyzed": details.get("frames_analyzed"),
+            "burst_frames": sampler.burst_frames,
+            "elapsed_sec": round(elapsed, 3),
+        }
+
+    full, sampled = runs["full"], runs["sampled"]
+    return {
+        "base_fps": base_fps,
+        "full": full,
+        "sampled": sampled,
+        "score_delta": sampled["score"] - full["score"],
+        "subscore_delta": {
+            k: (sampled[k] or 0) - (full[k] or 0)
+            for k in ("head_score", "smile_score", "blink_score", "gaze_score")
+        },
+        "rpm_delta": round((sampled["rpm"] or 0) - (full["rpm"] or 0), 1),
+        "speedup": round(full["elapsed_sec"] / sampled["elapsed_sec"], 2) if sampled["elapsed_sec"] > 0 else None,
+    }
+
 
+def _to_v0(raw: Any) -> Dict[str, Any]:
     # analyze()가 {"error": "..."} 형태로 실패를 반환하는 케이스 처리
     if isinstance(raw, dict) and raw.get("error"):
         return error_result("visual", "VisualEngineError", str(raw.get("error")))
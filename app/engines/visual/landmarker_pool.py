@@ -0,0 +1,227 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from mediapipe.tasks import python
+from mediapipe.tasks.python import vision
+
+
+class PooledLandmarker:
+    """
+    풀에서 빌려준 FaceLandmarker (VIDEO 모드)
+    - 영상(작업) 하나 전용: 반납되면 풀이 닫고 새 인스턴스로 교체하므로
+      이전 영상의 얼굴 ROI / 추적 상태가 다음 영상으로 이어지지 않음
+    - VIDEO 모드는 timestamp 가 증가해야 하므로 같거나 작은 값은 +1ms 로 보정
+    - 얼굴 ROI crop 은 detect_image (IMAGE 모드 landmarker, 처음 쓸 때 생성)
+      => VIDEO 모드 추적에는 전체 프레임만 들어가고, 크기가 다른 crop 이 추적 상태를 바꾸지 않음
+    """
+
+    def __init__(self, landmarker, slot: int, *, image_factory: Optional[Callable[[], object]] = None, image_landmarker=None):
+        self._landmarker = landmarker
+        self.slot = slot
+        self._last_ms = -1   # landmarker 에 실제로 넘긴 마지막 timestamp
+        self._image_factory = image_factory
+        self._image = image_landmarker
+
+    def detect_for_video(self, image, timestamp_ms: int):
+        ts = int(timestamp_ms)
+        if ts <= self._last_ms:
+            ts = self._last_ms + 1
+        self._last_ms = ts
+        return self._landmarker.detect_for_video(image, ts)
+
+    def detect_image(self, image):
+        """프레임 하나 독립 추론 (추적 상태 없음)"""
+        if self._image is None:
+            self._image = self._image_factory()
+        return self._image.detect(image)
+
+    def detach_image(self):
+        """IMAGE 모드 landmarker 를 떼어 냄 (상태가 없으므로 교체되는 인스턴스로 넘겨 재사용)"""
+        image, self._image = self._image, None
+        return image
+
+    def close(self) -> None:
+        self._landmarker.close()
+        if self._image is not None:
+            self._image.close()
+            self._image = None
+
+
+class LandmarkerPool:
+    """
+    FaceLandmarker 풀 (스레드 안전)
+    - 모델 파일(.task)은 처음 한 번만 읽어 메모리 버퍼로 보관 (model_asset_buffer)
+    - landmarker 는 size 개까지, 영상 하나에 하나씩 빌려줌
+    - 반납된 landmarker 는 VIDEO 모드 추적 상태가 남아 있으므로 백그라운드 스레드에서 닫고 새로 만들어 채워 둠
+      (다음 영상은 상태가 초기화된 인스턴스를 받고, 생성 시간은 기다리지 않음)
+    - 빈 landmarker 가 없으면 반납(교체)될 때까지 대기 (대기 시간 / 사용률 집계)
+    """
+
+    def __init__(self, model_path: str, size: int):
+        self.model_path = model_path
+        self.size = max(1, int(size))
+
+        self._cond = threading.Condition()
+        self._model_buffer: Optional[bytes] = None
+        self._idle: List[PooledLandmarker] = []
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+
+        # metrics
+        self._started_at = time.monotonic()
+        self._acquisitions = 0
+        self._waits = 0
+        self._wait_total_sec = 0.0
+        self._wait_max_sec = 0.0
+        self._busy_sec = 0.0
+        self._peak_in_use = 0
+        self._recreated = 0
+
+    def _load_model(self) -> bytes:
+        if self._model_buffer is None:
+            with open(self.model_path, "rb") as f:
+                self._model_buffer = f.read()
+        return self._model_buffer
+
+    def _options(self, mode) -> "vision.FaceLandmarkerOptions":
+        return vision.FaceLandmarkerOptions(
+            base_options=python.BaseOptions(model_asset_buffer=self._load_model()),
+            running_mode=mode,
+            num_faces=1,
+            output_face_blendshapes=True,
+            output_facial_transformation_matrixes=False  # 채점에 쓰지 않음 (프레임마다 4x4 행렬 생성 생략)
+        )
+
+    def _create(self, slot: int, image_landmarker=None) -> PooledLandmarker:
+        return PooledLandmarker(
+            vision.FaceLandmarker.create_from_options(self._options(vision.RunningMode.VIDEO)),  # 비디오 모드
+            slot,
+            image_factory=self._create_image,
+            image_landmarker=image_landmarker,
+        )
+
+    def _create_image(self):
+        """ROI crop 용 IMAGE 모드 landmarker (VISUAL_FACE_ROI_TRACKING 일 때만 생성됨)"""
+        return vision.FaceLandmarker.create_from_options(self._options(vision.RunningMode.IMAGE))
+
+    def create_detached(self) -> PooledLandmarker:
+        """
+        풀 밖에서 쓰는 전용 landmarker (size / 사용률에 포함되지 않음, 쓴 쪽이 close)
+        녹화 중 실시간 분석처럼 오래 붙잡는 용도 -> 업로드 후 분석이 풀 자리를 기다리지 않음
+        """
+        return self._create(-1)
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """워커 시작 시 landmarker 를 미리 만들어 둠 (첫 작업 지연 제거)"""
+        count = self.size if count is None else min(count, self.size)
+        with self._cond:
+            while self._created < count:
+                self._idle.append(self._create(self._created))
+                self._created += 1
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[PooledLandmarker]:
+        t0 = time.monotonic()
+        lm: Optional[PooledLandmarker] = None
+        create_slot: Optional[int] = None
+
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                remaining = None if timeout is None else timeout - (time.monotonic() - t0)
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"FaceLandmarker 대기 시간 초과 ({timeout}s)")
+                self._cond.wait(remaining)
+            if self._idle:
+                lm = self._idle.pop()
+            else:
+                # 생성은 락 밖에서 (수백 ms) - 자리만 먼저 예약
+                create_slot = self._created
+                self._created += 1
+            self._mark_acquired(time.monotonic() - t0)
+
+        if lm is None:
+            try:
+                lm = self._create(create_slot)
+            except BaseException:
+                with self._cond:
+                    self._created -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+
+        used_from = time.monotonic()
+        try:
+            yield lm
+        finally:
+            with self._cond:
+                self._busy_sec += time.monotonic() - used_from
+                self._in_use -= 1
+            # 자리(_created)는 유지한 채 교체가 끝나면 idle 로 돌아감
+            threading.Thread(target=self._replace, args=(lm,), name=f"landmarker-refresh-{lm.slot}", daemon=True).start()
+
+    def _replace(self, used: PooledLandmarker) -> None:
+        """
+        사용한 landmarker 를 닫고 같은 자리에 새 인스턴스 생성 (실패하면 자리를 비워 다음 acquire 가 만들게 함)
+        IMAGE 모드 landmarker 는 상태가 없으므로 새 인스턴스로 그대로 넘김
+        """
+        image = used.detach_image()
+        try:
+            used.close()
+        except Exception as e:
+            print(f"⚠️ [LandmarkerPool] landmarker close 실패: {e}")
+        fresh: Optional[PooledLandmarker] = None
+        try:
+            fresh = self._create(used.slot, image)
+        except Exception as e:
+            print(f"⚠️ [LandmarkerPool] landmarker 재생성 실패: {e}")
+            if image is not None:
+                image.close()
+        with self._cond:
+            if fresh is None:
+                self._created -= 1
+            elif self._closed:
+                fresh.close()
+                self._created -= 1
+            else:
+                self._idle.append(fresh)
+                self._recreated += 1
+            self._cond.notify()
+
+    def _mark_acquired(self, waited: float) -> None:
+        """락을 잡은 상태에서 호출"""
+        self._acquisitions += 1
+        self._in_use += 1
+        self._peak_in_use = max(self._peak_in_use, self._in_use)
+        if waited > 0.001:
+            self._waits += 1
+            self._wait_total_sec += waited
+            self._wait_max_sec = max(self._wait_max_sec, waited)
+
+    def stats(self) -> dict:
+        with self._cond:
+            elapsed = max(time.monotonic() - self._started_at, 1e-9)
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "recreated": self._recreated,
+                "acquisitions": self._acquisitions,
+                "waits": self._waits,
+                "wait_total_sec": round(self._wait_total_sec, 3),
+                "wait_avg_sec": round(self._wait_total_sec / self._acquisitions, 3) if self._acquisitions else 0.0,
+                "wait_max_sec": round(self._wait_max_sec, 3),
+                # 풀 전체 용량 대비 실제 사용 시간 (반납된 작업 기준)
+                "utilization": round(self._busy_sec / (self.size * elapsed), 3),
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for lm in self._idle:
+                lm.close()
+            self._created -= len(self._idle)
+            self._idle.clear()
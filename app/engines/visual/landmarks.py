@@ -0,0 +1,181 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.engines.visual.scoring import FrameHistory
+
+# =========================================================
+# 채점에 쓰는 랜드마크 / Blendshape 만 골라서 저장
+# =========================================================
+# 버퍼 안에서의 위치(slot) -> MediaPipe Face Mesh 인덱스
+LANDMARK_INDICES = (
+    1,     # 0: 코 (Nose)
+    10,    # 1: 정수리 (HeadTop)
+    33,    # 2: 왼눈 바깥
+    133,   # 3: 왼눈 안쪽
+    263,   # 4: 오른눈 바깥
+    362,   # 5: 오른눈 안쪽
+    468, 469, 470, 471, 472,   # 6~10: 왼쪽 홍채
+    473, 474, 475, 476, 477,   # 11~15: 오른쪽 홍채
+)
+SLOT_NOSE, SLOT_HEAD_TOP = 0, 1
+SLOT_L_OUTER, SLOT_L_INNER, SLOT_R_OUTER, SLOT_R_INNER = 2, 3, 4, 5
+SLOT_L_IRIS = slice(6, 11)
+SLOT_R_IRIS = slice(11, 16)
+
+BLENDSHAPE_NAMES = ("eyeBlinkLeft", "eyeBlinkRight", "mouthSmileLeft", "mouthSmileRight")
+
+LANDMARK_DTYPE = np.dtype([
+    ("ts", np.float64),                              # 초
+    ("face", np.bool_),                              # 얼굴 감지 여부
+    ("size", np.float32, (2,)),                      # 프레임 (w, h) - 홍채 픽셀 좌표 변환용
+    ("pts", np.float32, (len(LANDMARK_INDICES), 2)), # 정규화 좌표 (x, y)
+    ("bs", np.float32, (len(BLENDSHAPE_NAMES),)),    # blendshape 점수
+])
+
+
+class LandmarkBuffer:
+    """
+    프레임별 MediaPipe 결과에서 필요한 값만 미리 잡아둔 structured 배열에 복사
+    - 프레임마다 dict / np.array 를 만들지 않음
+    - 고개 각도, 홍채 이탈 등 파생 지표는 to_history() 에서 전체 버퍼에 대해 한 번에 계산
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._bs_index: Optional[Sequence[int]] = None
+        self.size = 0
+        # 프레임마다 재사용하는 임시 리스트 (배열에는 한 번에 복사)
+        self._pts_scratch = [0.0] * (len(LANDMARK_INDICES) * 2)
+        self._bs_scratch = [0.0] * len(BLENDSHAPE_NAMES)
+        self._alloc(max(1, int(capacity)))
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray) -> "LandmarkBuffer":
+        """LANDMARK_DTYPE 배열(다른 프로세스에서 추출한 구간 결과 등)로 버퍼 생성"""
+        buf = cls(capacity=max(1, rows.shape[0]))
+        buf._buf[:rows.shape[0]] = rows
+        buf.size = rows.shape[0]
+        return buf
+
+    def _alloc(self, capacity: int) -> None:
+        buf = np.zeros(capacity, dtype=LANDMARK_DTYPE)
+        if self.size:
+            buf[:self.size] = self._buf[:self.size]
+        self._buf = buf
+        # 필드별 view 를 미리 잡아둠 (np.void 행 접근보다 빠름)
+        self._ts = buf["ts"]
+        self._face = buf["face"]
+        self._size = buf["size"]
+        self._pts = buf["pts"].reshape(capacity, -1)
+        self._bs = buf["bs"]
+
+    def _resolve_blendshapes(self, blendshapes) -> Sequence[int]:
+        """category_name -> 리스트 위치 (모델 출력 순서는 고정이므로 처음 한 번만)"""
+        names = [b.category_name for b in blendshapes]
+        return tuple(names.index(n) for n in BLENDSHAPE_NAMES)
+
+    def append_empty(self, ts_sec: float) -> None:
+        """추론을 건너뛴 프레임 ('얼굴 없음' 으로 기록)"""
+        i = self.size
+        if i == self._buf.shape[0]:
+            self._alloc(i * 2)
+        self.size = i + 1
+        self._ts[i] = ts_sec
+        self._face[i] = False
+
+    def append(self, ts_sec: float, width: int, height: int, result, roi: Optional[Tuple[int, int, int, int]] = None) -> float:
+        """
+        FaceLandmarker 결과 1프레임 저장
+        - roi: crop (x0, y0, x1, y1) 에서 추론한 경우, 랜드마크를 전체 프레임 정규화 좌표로 변환
+        반환: 이 프레임의 blink 점수 (샘플러 burst 판단용, 얼굴 없으면 0)
+        """
+        i = self.size
+        if i == self._buf.shape[0]:
+            self._alloc(i * 2)
+        self.size = i + 1
+
+        self._ts[i] = ts_sec
+        if not result.face_landmarks:
+            self._face[i] = False
+            return 0.0
+
+        self._face[i] = True
+        self._size[i] = (width, height)
+
+        landmarks = result.face_landmarks[0]
+        pts = self._pts_scratch
+        k = 0
+        for idx in LANDMARK_INDICES:
+            lm = landmarks[idx]
+            pts[k] = lm.x
+            pts[k + 1] = lm.y
+            k += 2
+        self._pts[i] = pts
+        if roi is not None:
+            xy = self._pts[i].reshape(-1, 2)
+            xy[:, 0] = xy[:, 0] * ((roi[2] - roi[0]) / width) + roi[0] / width
+            xy[:, 1] = xy[:, 1] * ((roi[3] - roi[1]) / height) + roi[1] / height
+
+        blendshapes = result.face_blendshapes[0]
+        if self._bs_index is None:
+            self._bs_index = self._resolve_blendshapes(blendshapes)
+        bs = self._bs_scratch
+        for slot, idx in enumerate(self._bs_index):
+            bs[slot] = blendshapes[idx].score
+        self._bs[i] = bs
+
+        return (bs[0] + bs[1]) / 2.0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._buf[:self.size]
+
+    def to_history(self) -> FrameHistory:
+        """버퍼 전체 -> FrameHistory (고개 각도 / 홍채 이탈 / blink / smile 벡터 계산)"""
+        rows = self.rows
+        face = rows["face"]
+        pts = rows["pts"].astype(np.float64)
+        bs = rows["bs"].astype(np.float64)
+
+        head = head_roll_deg(pts)
+        gaze = iris_shift(pts, rows["size"].astype(np.float64))
+        blink = (bs[:, 0] + bs[:, 1]) / 2.0
+        smile = (bs[:, 2] + bs[:, 3]) / 2.0
+
+        # 얼굴이 없던 프레임은 기존과 같이 0
+        zero = ~face
+        for arr in (head, gaze, blink, smile):
+            arr[zero] = 0.0
+
+        return FrameHistory.from_arrays(rows["ts"], head, gaze, blink, smile)
+
+
+def head_roll_deg(pts: np.ndarray) -> np.ndarray:
+    """코 -> 정수리 벡터로 고개 기울기(Roll) 계산 (영상 좌표계, y 아래 방향)"""
+    d = pts[:, SLOT_HEAD_TOP] - pts[:, SLOT_NOSE]
+    return np.degrees(np.arctan2(d[:, 1], d[:, 0])) + 90.0
+
+
+def iris_shift(pts: np.ndarray, size: np.ndarray) -> np.ndarray:
+    """
+    홍채 중심을 눈꼬리-눈머리 축에 투영한 이탈 정도 (눈 너비 대비)
+    두 눈 중 더 크게 이탈한 값
+    """
+    px = pts * size[:, None, :]  # 정규화 좌표 -> 픽셀
+
+    def _shift(iris: slice, outer: int, inner: int) -> np.ndarray:
+        iris_c = px[:, iris].mean(axis=1)
+        p_out = px[:, outer]
+        p_in = px[:, inner]
+        axis = p_in - p_out
+        eye_width = np.linalg.norm(axis, axis=1) + 1e-6
+        eye_center = (p_out + p_in) * 0.5
+        rel = iris_c - eye_center
+        return np.einsum("ij,ij->i", rel, axis) / (eye_width * eye_width)
+
+    shift_l = _shift(SLOT_L_IRIS, SLOT_L_OUTER, SLOT_L_INNER)
+    shift_r = _shift(SLOT_R_IRIS, SLOT_R_OUTER, SLOT_R_INNER)
+    return np.maximum(np.abs(shift_l), np.abs(shift_r))
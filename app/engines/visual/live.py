@@ -0,0 +1,189 @@
+"""
+녹화 중 실시간 Visual 분석 (WebRTC 영상 프로세서에서 사용)
+
+- recv() 스레드는 샘플링된 프레임만 proxy 해상도로 줄여 큐에 넣고 바로 반환 (영상 지연 최소화)
+- 별도 추론 스레드가 세션 전용 FaceLandmarker (풀 밖, landmarker_pool.create_detached) 로 랜드마크를 LandmarkBuffer 에 누적
+  녹화 내내 붙잡으므로 풀 자리를 쓰지 않음 -> 동시 녹화 수와 상관없이 업로드 후 분석이 대기하지 않음
+  landmarker 는 추론 스레드가 끝날 때 (finish() 가 멈춤을 요청한 뒤) 닫음
+- 녹화 종료 시 finish() 한 번으로 업로드 후 분석과 같은 V3 채점 결과(v0 형식)를 반환
+  (채점은 같은 score_landmarks 사용 -> 같은 프레임이면 같은 점수)
+
+추론이 밀려 큐가 가득 차면 프레임을 버리고 dropped 로 집계 (녹화 영상 자체에는 영향 없음)
+finish() 는 아래 경우 error 결과를 반환 (업로드 시 저장되지 않고 업로드 후 분석으로 진행)
+- 추론 스레드가 timeout 안에 끝나지 않음 (밀린 프레임이 남아 있음)
+- 분석 프레임이 없거나, 녹화 길이 대비 분석 구간 비율(coverage)이 VISUAL_LIVE_MIN_COVERAGE 미만
+"""
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from app.core.config import settings
+from app.engines.visual.engine import _visual_engine, _to_v0, landmarker_pool
+from app.engines.visual.landmarks import LandmarkBuffer
+from app.engines.visual.sampling import FrameSampler
+from app.engines.visual.scoring import BLINK_THRESHOLD, LIVE_COVERAGE_BIN_SEC
+from app.utils.media_decode import FrameRateCap, analysis_frame_limits, analysis_frame_rate, fit_size
+
+_STOP = object()
+
+
+class LiveVisualAccumulator:
+    def __init__(self, *, sample_fps: Optional[float] = None, queue_depth: int = 2):
+        self.sampler = FrameSampler(settings.VISUAL_SAMPLE_FPS if sample_fps is None else sample_fps)
+        self.landmarks = LandmarkBuffer(capacity=1024)
+        self.max_width, self.max_height = analysis_frame_limits()
+        self._rate_cap = FrameRateCap(analysis_frame_rate())   # 업로드 후 분석과 같은 fps 상한 (recv 스레드 전용)
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_depth))
+        self._lock = threading.Lock()
+        self._first_ts: Optional[int] = None
+        self._last_ts = 0
+        self._closed = False
+        self._abort = threading.Event()   # finish() 가 기다리다 포기하면 추론 스레드도 다음 프레임에서 멈춤
+        self._error: Optional[str] = None
+
+        # 녹화 중 확인용 누적 값
+        self.offered = 0
+        self.dropped = 0
+        self.face_frames = 0
+        self.blinks = 0
+        self._eye_closed = False
+
+        self._thread = threading.Thread(target=self._run, name="live-visual", daemon=True)
+        self._thread.start()
+
+    # ---------------------------------------------------------
+    # recv() 스레드
+    # ---------------------------------------------------------
+    def offer(self, ts_ms: int, bgr: np.ndarray) -> bool:
+        """WebRTC 프레임 1개 (BGR). 샘플링 대상이면 축소해서 큐에 넣음"""
+        if self._closed:
+            return False
+        if self._first_ts is None:
+            self._first_ts = ts_ms
+        rel_ts = ts_ms - self._first_ts
+        self._last_ts = rel_ts
+        if not self._rate_cap.accept(rel_ts) or not self.sampler.want(rel_ts):
+            return False
+        self.sampler.schedule(rel_ts)
+
+        h, w = bgr.shape[:2]
+        tw, th = fit_size(w, h, self.max_width, self.max_height)
+        small = cv2.resize(bgr, (tw, th), interpolation=cv2.INTER_AREA) if (tw, th) != (w, h) else bgr
+        rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        try:
+            self._queue.put_nowait((rel_ts, rgb))
+            self.offered += 1
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    # ---------------------------------------------------------
+    # 추론 스레드
+    # ---------------------------------------------------------
+    def _run(self) -> None:
+        landmarker = None
+        try:
+            landmarker = landmarker_pool.create_detached()
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                ts_ms, rgb = item
+                h, w, _ = rgb.shape
+                result = landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), ts_ms)
+                with self._lock:
+                    blink = self.landmarks.append(ts_ms / 1000.0, w, h, result)
+                    self._count(result, blink)
+                self.sampler.observe(ts_ms, blink)
+                if self._abort.is_set():
+                    return
+        except Exception as e:
+            self._error = str(e)
+            print(f"⚠️ [Live Visual] 추론 중단: {e}")
+        finally:
+            if landmarker is not None:
+                landmarker.close()
+
+    def _count(self, result, blink: float) -> None:
+        if result.face_landmarks:
+            self.face_frames += 1
+        closed = blink > BLINK_THRESHOLD
+        if closed and not self._eye_closed:
+            self.blinks += 1
+        self._eye_closed = closed
+
+    # ---------------------------------------------------------
+    # 조회 / 종료
+    # ---------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """녹화 중 누적 상태 (UI 표시용)"""
+        with self._lock:
+            frames = len(self.landmarks)
+            return {
+                "elapsed_sec": round(self._last_ts / 1000.0, 1),
+                "frames": frames,
+                "face_ratio": round(self.face_frames / frames, 3) if frames else 0.0,
+                "blinks": self.blinks,
+                "dropped": self.dropped,
+            }
+
+    def coverage(self, duration_sec: float) -> float:
+        """녹화 길이를 LIVE_COVERAGE_BIN_SEC 칸으로 나눴을 때 분석 프레임이 하나라도 있는 칸의 비율"""
+        bins = max(1, int(np.ceil(duration_sec / LIVE_COVERAGE_BIN_SEC)))
+        with self._lock:
+            ts = self.landmarks.rows["ts"]
+            if ts.shape[0] == 0:
+                return 0.0
+            slots = np.clip(np.floor(ts / LIVE_COVERAGE_BIN_SEC).astype(np.int64), 0, bins - 1)
+        return float(np.unique(slots).shape[0]) / bins
+
+    def finish(self, duration_sec: Optional[float] = None, timeout: float = 10.0) -> Dict[str, Any]:
+        """
+        녹화 종료: 큐에 남은 프레임까지 추론한 뒤 V3 채점 (v0 결과)
+        duration_sec 가 없으면 받은 마지막 프레임 시각을 길이로 사용
+        추론이 timeout 안에 끝나지 않았거나 분석 구간이 부족하면 error 결과 (details["live"]["coverage"] 참고)
+        """
+        if not self._closed:
+            self._closed = True
+            deadline = time.monotonic() + timeout
+            try:
+                if self._thread.is_alive():
+                    self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(max(0.0, deadline - time.monotonic()))
+
+        if self._thread.is_alive():
+            # 밀린 프레임을 다 추론하지 못함 -> 일부 구간만의 점수가 되므로 쓰지 않음 (스레드는 landmarker 를 닫고 종료)
+            self._abort.set()
+            return _to_v0({"error": f"live visual: 추론이 {timeout:.0f}초 안에 끝나지 않음 (대기 {self._queue.qsize()}프레임)"})
+        if self._error is not None:
+            return _to_v0({"error": f"live visual: {self._error}"})
+        if duration_sec is None:
+            duration_sec = self._last_ts / 1000.0
+
+        frames = len(self.landmarks)
+        coverage = self.coverage(duration_sec)
+        if frames == 0 or coverage < settings.VISUAL_LIVE_MIN_COVERAGE:
+            return _to_v0({
+                "error": f"live visual: 분석 구간 부족 (프레임 {frames}, coverage {coverage:.2f} < {settings.VISUAL_LIVE_MIN_COVERAGE})"
+            })
+
+        with self._lock:
+            raw = _visual_engine.score_landmarks(self.landmarks, duration_sec, self.sampler.stats())
+        if isinstance(raw, dict) and "details" in raw:
+            raw["details"]["live"] = {
+                "offered_frames": self.offered,
+                "dropped_frames": self.dropped,
+                "duration_sec": round(duration_sec, 3),
+                "coverage": round(coverage, 3),
+                "finished_at": time.time(),
+            }
+        return _to_v0(raw)
@@ -0,0 +1,259 @@
+"""
+긴 영상용 구간 병렬 Visual 분석
+
+- 영상을 시간 구간(window)으로 나눠 구간마다 별도 프로세스(자기 FaceLandmarker)에서 랜드마크만 추출
+- 각 프로세스는 구간 시작 직전 키프레임으로 seek 해서 디코드하고,
+  구간 앞 overlap 동안은 landmarker 추적 상태 / 샘플러를 미리 돌려두기만 함 (결과에는 넣지 않음)
+- 구간별 프레임 시계열을 timestamp 순으로 합친 뒤 전체 시계열로 한 번만 채점
+  => 구간 경계에 걸친 고개/시선 이탈, 깜빡임도 순차 분석과 같은 규칙으로 계산됨
+     (구간별 점수를 합치지 않음)
+- 샘플러는 전역 시간 격자(floor(ts / interval))로 프레임을 고르므로 구간 시작 위치와 상관없이
+  순차 분석과 같은 timestamp 를 추론함 (깜빡임 burst 구간은 warm-up 이 짧으면 다를 수 있음)
+- 허용 차이: landmarker 추적이 구간마다 새로 시작하므로 랜드마크 값은 미세하게 다를 수 있음
+  세부 점수 / 총점 차이 PARALLEL_SCORE_TOLERANCE 점 이내 (scripts/compare_visual_parallel.py 로 확인)
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.concurrency import inner_pool_workers
+from app.core.config import settings
+from app.engines.common.result import error_result
+from app.engines.visual.engine import _visual_engine, _to_v0
+from app.engines.visual.landmarks import LandmarkBuffer, LANDMARK_DTYPE
+from app.engines.visual.pipeline import FramePipeline
+from app.engines.visual.roi import make_roi_tracker
+from app.engines.visual.sampling import FrameSampler, pipeline_depth, pipeline_details, source_filter
+from app.utils.media_decode import analysis_frame_limits, analysis_frame_rate, iter_window_frames
+
+# 마지막 구간 끝: 메타데이터 길이보다 뒤에 있는 프레임도 포함되도록 여유
+_TAIL_SLACK_MS = 60_000
+# 순차 분석 대비 허용 점수 차이 (세부 점수 / 총점)
+PARALLEL_SCORE_TOLERANCE = 1
+
+
+@dataclass(frozen=True)
+class VisualWindow:
+    start_ms: int    # 결과에 넣는 구간 [start_ms, end_ms)
+    end_ms: int
+    warmup_ms: int   # 실제 디코드/추론 시작 시각 (start_ms - overlap, 0 이상)
+
+
+def plan_windows(
+    duration_sec: float,
+    workers: int,
+    *,
+    min_window_sec: Optional[float] = None,
+    overlap_sec: Optional[float] = None,
+) -> List[VisualWindow]:
+    """
+    영상 길이를 workers 개 이하의 같은 길이 구간으로 나눔
+    구간 하나가 min_window_sec 보다 짧아지면 구간 수를 줄임 (짧은 영상은 구간 1개 = 순차 분석)
+    """
+    if min_window_sec is None:
+        min_window_sec = settings.VISUAL_PARALLEL_MIN_WINDOW_SEC
+    if overlap_sec is None:
+        overlap_sec = settings.VISUAL_PARALLEL_OVERLAP_SEC
+
+    duration_ms = int(max(duration_sec, 0.0) * 1000)
+    count = max(1, min(int(workers), int(duration_sec // max(min_window_sec, 1e-3))))
+    bounds = np.linspace(0, duration_ms, count + 1).astype(np.int64)
+    overlap_ms = int(overlap_sec * 1000)
+
+    windows = []
+    for i in range(count):
+        start = int(bounds[i])
+        end = int(bounds[i + 1]) if i + 1 < count else duration_ms + _TAIL_SLACK_MS
+        windows.append(VisualWindow(start, end, max(0, start - overlap_ms)))
+    return windows
+
+
+# =========================================================
+# 워커 프로세스 쪽 함수 (spawn 된 프로세스에서 실행, pickle 가능하도록 최상위 함수)
+# =========================================================
+def _extract_window(video_path: str, window: VisualWindow, base_fps: float) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    sampler = FrameSampler(base_fps)
+    max_width, max_height = analysis_frame_limits()
+    frames = iter_window_frames(
+        video_path, window.warmup_ms, window.end_ms,
+        want=source_filter(sampler), max_width=max_width, max_height=max_height, max_fps=analysis_frame_rate(),
+    )
+    depth = pipeline_depth(sampler)
+    if depth > 0:
+        frames = FramePipeline(frames, depth=depth)
+    landmarks = _visual_engine.extract_landmarks(frames, sampler, tracker=make_roi_tracker())
+
+    rows = landmarks.rows
+    keep = np.rint(rows["ts"] * 1000.0) >= window.start_ms
+    return {
+        "rows": np.ascontiguousarray(rows[keep]),
+        "warmup_frames": int(np.count_nonzero(~keep)),
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
+    }
+
+
+def merge_window_rows(parts: Sequence[np.ndarray]) -> np.ndarray:
+    """구간별 랜드마크 행 -> timestamp 순 하나의 시계열 (겹친 timestamp 는 앞 구간 것 사용)"""
+    parts = [p for p in parts if p.shape[0]]
+    if not parts:
+        return np.zeros(0, dtype=LANDMARK_DTYPE)
+    rows = np.concatenate(parts)
+    rows = rows[np.argsort(rows["ts"], kind="stable")]
+    ts = rows["ts"]
+    first = np.ones(ts.shape[0], dtype=bool)
+    first[1:] = ts[1:] > ts[:-1]
+    return rows[first]
+
+
+# =========================================================
+# 부모 프로세스: 워커 풀 (프로세스마다 landmarker 를 재사용하도록 유지)
+# =========================================================
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # fork 는 MediaPipe 스레드 / DB 풀을 그대로 복제하므로 spawn 사용
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+
+
+def analyze_parallel(
+    video_path: str,
+    duration_sec: float,
+    *,
+    workers: Optional[int] = None,
+    base_fps: Optional[float] = None,
+    windows: Optional[List[VisualWindow]] = None,
+) -> Dict[str, Any]:
+    """
+    구간 병렬 분석 -> VisualAnalysisEngine.analyze 와 같은 raw V3 결과 (details['parallel'] 추가)
+    - windows: 구간 직접 지정 (비교 스크립트용, 기본은 plan_windows)
+    """
+    workers = inner_pool_workers(settings.VISUAL_PARALLEL_WORKERS if workers is None else workers)
+    if base_fps is None:
+        base_fps = settings.VISUAL_SAMPLE_FPS
+
+    if windows is None:
+        windows = plan_windows(duration_sec, workers)
+    executor = _get_executor(max(1, int(workers)))
+    try:
+        futures = [executor.submit(_extract_window, video_path, w, base_fps) for w in windows]
+        parts = [f.result() for f in futures]
+    except BrokenProcessPool:
+        # 워커 프로세스가 죽으면 다음 호출에서 풀을 새로 만듦
+        _reset_executor()
+        raise
+
+    rows = merge_window_rows([p["rows"] for p in parts])
+    result = _visual_engine.score_landmarks(
+        LandmarkBuffer.from_rows(rows),
+        duration_sec,
+        {"processed_frames": int(rows.shape[0]), "base_fps": base_fps},
+    )
+    if "details" in result:
+        result["details"]["parallel"] = {
+            "windows": len(windows),
+            "workers": int(workers),
+            "overlap_sec": settings.VISUAL_PARALLEL_OVERLAP_SEC,
+            "warmup_frames": sum(p["warmup_frames"] for p in parts),
+            "window_elapsed_sec": [p["elapsed_sec"] for p in parts],
+        }
+        result["details"]["pipeline"] = pipeline_details(FrameSampler(base_fps))
+    return result
+
+
+def compare_parallel(
+    video_path: str,
+    duration_sec: float,
+    *,
+    windows: int = 4,
+    workers: Optional[int] = None,
+    base_fps: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    [비교 모드] 같은 영상을 구간 1개(순차) / windows 개 구간으로 분석해
+    추론 timestamp 와 점수 차이를 반환 (구간 길이 하한 없이 나눔)
+    """
+    if base_fps is None:
+        base_fps = settings.VISUAL_SAMPLE_FPS
+
+    runs = {}
+    for name, count in (("serial", 1), ("parallel", windows)):
+        t0 = time.perf_counter()
+        raw = analyze_parallel(
+            video_path, duration_sec, workers=workers, base_fps=base_fps,
+            windows=plan_windows(duration_sec, count, min_window_sec=0),
+        )
+        elapsed = time.perf_counter() - t0
+        if raw.get("error"):
+            return {"error": f"{name}: {raw['error']}"}
+        details = raw.get("details", {})
+        runs[name] = {
+            "score": raw.get("score", 0),
+            "head_score": details.get("head_score"),
+            "smile_score": details.get("smile_score"),
+            "blink_score": details.get("blink_score"),
+            "gaze_score": details.get("gaze_score"),
+            "rpm": details.get("rpm"),
+            "frames_analyzed": details.get("frames_analyzed"),
+            "windows": details.get("parallel", {}).get("windows"),
+            "elapsed_sec": round(elapsed, 3),
+        }
+
+    serial, parallel = runs["serial"], runs["parallel"]
+    deltas = {
+        k: (parallel[k] or 0) - (serial[k] or 0)
+        for k in ("score", "head_score", "smile_score", "blink_score", "gaze_score")
+    }
+    return {
+        "base_fps": base_fps,
+        "serial": serial,
+        "parallel": parallel,
+        "frames_delta": (parallel["frames_analyzed"] or 0) - (serial["frames_analyzed"] or 0),
+        "score_deltas": deltas,
+        "rpm_delta": round((parallel["rpm"] or 0) - (serial["rpm"] or 0), 1),
+        "within_tolerance": all(abs(d) <= PARALLEL_SCORE_TOLERANCE for d in deltas.values()),
+    }
+
+
+def should_run_parallel(duration_sec: Optional[float]) -> bool:
+    """
+    병렬 워커가 2개 이상이고, 영상이 구간 2개 이상으로 나뉠 만큼 긴지
+    (워커 수는 CPU 예산으로 제한, 세션 워커 프로세스 안에서는 항상 순차)
+    """
+    workers = inner_pool_workers(settings.VISUAL_PARALLEL_WORKERS)
+    if workers <= 1 or not duration_sec:
+        return False
+    return len(plan_windows(duration_sec, workers)) > 1
+
+
+def run_visual_parallel(video_path: str, duration_sec: float, *, workers: Optional[int] = None) -> Dict[str, Any]:
+    """run_visual 과 같은 v0 결과를 구간 병렬 분석으로 만듭니다."""
+    try:
+        raw = analyze_parallel(video_path, duration_sec, workers=workers)
+    except Exception as e:
+        return error_result("visual", "VisualException", str(e))
+    return _to_v0(raw)
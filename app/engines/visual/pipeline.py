@@ -0,0 +1,212 @@
+"""
+Visual 엔진 디코드 / 추론 파이프라인
+
+- decoder 스레드: 프레임 소스(cv2 grab/retrieve, PyAV 디코드)를 돌리면서 RGB 프레임을 준비
+- 호출 스레드(추론): 준비된 프레임을 순서대로 꺼내 MediaPipe 추론
+  => H.264 디코드 / 색 변환과 추론이 서로 다른 스레드에서 겹쳐 실행 (둘 다 GIL 밖에서 도는 네이티브 코드)
+
+convert 를 넘기면 depth 개의 RGB 버퍼를 미리 잡아두고 돌려쓰는 ring 으로 동작 (프레임마다 할당 없음)
+convert 가 없으면 소스가 만든 배열을 그대로 넘기고 큐 길이만 depth 로 제한
+
+샘플러(FrameSampler)로 프레임을 거르는 일은 호출 스레드(추론)만 함
+- 소스에는 sampling.source_filter(sampler) 를 넘김 (파이프라인 사용 시 None -> 디코더는 거르지 않음)
+- decoder 가 최대 depth 프레임 앞서 가더라도 깜빡임 burst 판단은 추론 순서 그대로 적용됨
+  (depth 0 = 파이프라인 없이 기존 순차 동작, 소스에서 바로 거름)
+- 디코더가 모든 프레임을 변환하게 되므로 샘플링 중에는 기본적으로 쓰지 않음 (sampling.pipeline_depth)
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+_END = object()
+_POLL_SEC = 0.1   # 중단 요청 확인 간격
+
+
+class FramePipeline:
+    """
+    for ts_ms, rgb in FramePipeline(source, depth=4, convert=...):
+        ...  # rgb 는 다음 프레임을 꺼내는 순간 재사용되므로 그 전에 다 써야 함 (mp.Image 는 복사함)
+
+    - source: (timestamp_ms, raw) 순서대로 (decoder 스레드에서 소비됨)
+    - convert(raw, dst): raw 를 미리 잡아둔 RGB 버퍼 dst 에 기록 (shape_of(raw) 로 버퍼 크기 결정)
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Tuple[int, Any]],
+        *,
+        depth: int,
+        convert: Optional[Callable[[Any, np.ndarray], None]] = None,
+        shape_of: Optional[Callable[[Any], Tuple[int, ...]]] = None,
+    ):
+        self.source = source
+        self.depth = max(1, int(depth))
+        self.convert = convert
+        self.shape_of = shape_of or (lambda raw: raw.shape)
+
+        self._buffers: List[Optional[np.ndarray]] = [None] * self.depth
+        self._free: "queue.Queue[int]" = queue.Queue()
+        for i in range(self.depth):
+            self._free.put(i)
+        self._ready: "queue.Queue[Any]" = queue.Queue(maxsize=self.depth)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._gen: Optional[Iterator[Tuple[int, np.ndarray]]] = None
+
+        # stage 별 시간 (초)
+        self.frames = 0
+        self.allocations = 0
+        self.decode_busy_sec = 0.0
+        self.decode_wait_sec = 0.0   # 빈 버퍼 / 큐 자리를 기다린 시간 -> 추론이 느림
+        self.infer_busy_sec = 0.0
+        self.infer_wait_sec = 0.0    # 준비된 프레임을 기다린 시간 -> 디코드가 느림
+        self._wall_sec = 0.0
+
+    # ---------------------------------------------------------
+    # decoder 스레드
+    # ---------------------------------------------------------
+    def _put(self, q: "queue.Queue[Any]", item: Any) -> bool:
+        t0 = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    q.put(item, timeout=_POLL_SEC)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.decode_wait_sec += time.perf_counter() - t0
+
+    def _take_slot(self) -> Optional[int]:
+        t0 = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    return self._free.get(timeout=_POLL_SEC)
+                except queue.Empty:
+                    continue
+            return None
+        finally:
+            self.decode_wait_sec += time.perf_counter() - t0
+
+    def _slot_buffer(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        buf = self._buffers[slot]
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._buffers[slot] = buf
+            self.allocations += 1
+        return buf
+
+    def _decode_loop(self) -> None:
+        it = iter(self.source)
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                try:
+                    ts_ms, raw = next(it)
+                except StopIteration:
+                    break
+
+                if self.convert is None:
+                    self.decode_busy_sec += time.perf_counter() - t0
+                    if not self._put(self._ready, (ts_ms, raw, None)):
+                        break
+                    continue
+
+                busy = time.perf_counter() - t0
+                slot = self._take_slot()
+                if slot is None:
+                    break
+                t1 = time.perf_counter()
+                self.convert(raw, self._slot_buffer(slot, tuple(self.shape_of(raw))))
+                self.decode_busy_sec += busy + (time.perf_counter() - t1)
+                if not self._put(self._ready, (ts_ms, None, slot)):
+                    break
+        except BaseException as e:
+            self._error = e
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+            self._put_end()
+
+    def _put_end(self) -> None:
+        while True:
+            try:
+                self._ready.put(_END, timeout=_POLL_SEC)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    return
+
+    # ---------------------------------------------------------
+    # 추론 스레드 (호출 측)
+    # ---------------------------------------------------------
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        if self._gen is None:
+            self._gen = self._run()
+        return self._gen
+
+    def close(self) -> None:
+        """추론 쪽에서 중간에 그만둘 때: decoder 스레드 정지 + 소스 해제"""
+        if self._gen is not None:
+            self._gen.close()
+            return
+        close = getattr(self.source, "close", None)
+        if close is not None:
+            close()
+
+    def _run(self) -> Iterator[Tuple[int, np.ndarray]]:
+        self._thread = threading.Thread(target=self._decode_loop, name="visual-decode", daemon=True)
+        started = time.perf_counter()
+        self._thread.start()
+        try:
+            while True:
+                t0 = time.perf_counter()
+                item = self._ready.get()
+                self.infer_wait_sec += time.perf_counter() - t0
+                if item is _END:
+                    break
+
+                ts_ms, raw, slot = item
+                self.frames += 1
+                t1 = time.perf_counter()
+                yield ts_ms, (raw if slot is None else self._buffers[slot])
+                self.infer_busy_sec += time.perf_counter() - t1
+                if slot is not None:
+                    self._free.put(slot)   # 소비 끝난 버퍼 재사용
+
+            if self._error is not None:
+                raise self._error
+        finally:
+            self._stop.set()
+            # decoder 가 큐 자리를 기다리며 막혀 있지 않도록 비워줌
+            while True:
+                try:
+                    self._ready.get_nowait()
+                except queue.Empty:
+                    break
+            self._thread.join()
+            self._wall_sec = time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        wall = max(self._wall_sec, 1e-9)
+        decode_util = self.decode_busy_sec / wall
+        infer_util = self.infer_busy_sec / wall
+        return {
+            "depth": self.depth,
+            "frames": self.frames,
+            "buffer_allocations": self.allocations,
+            "decode_busy_sec": round(self.decode_busy_sec, 3),
+            "decode_wait_sec": round(self.decode_wait_sec, 3),
+            "infer_busy_sec": round(self.infer_busy_sec, 3),
+            "infer_wait_sec": round(self.infer_wait_sec, 3),
+            "decode_utilization": round(decode_util, 3),
+            "infer_utilization": round(infer_util, 3),
+            "bottleneck": "decode" if decode_util > infer_util else "inference",
+        }
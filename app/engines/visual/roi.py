@@ -0,0 +1,140 @@
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# 얼굴 외곽선 (Face Mesh FACE_OVAL) - ROI 계산용 얼굴 박스
+FACE_OVAL_INDICES = (
+    10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288, 397, 365, 379, 378, 400, 377,
+    152, 148, 176, 149, 150, 136, 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109,
+)
+
+ROI_PADDING = 0.5          # 얼굴 박스 긴 변 대비 사방 여백 비율
+ROI_MIN_SIZE = 160         # crop 최소 한 변 (px)
+ROI_EDGE_MARGIN = 0.04     # 얼굴이 crop 가장자리에서 이 비율 안쪽에 있어야 추적 유지
+ROI_RECENTER = 0.15        # 얼굴 중심이 crop 크기 대비 이만큼 움직이면 crop 다시 잡음
+NO_FACE_PROBE_MS = 500     # 얼굴이 없는 동안 전체 프레임 재탐지 간격
+
+Box = Tuple[int, int, int, int]  # (x0, y0, x1, y1) 전체 프레임 픽셀 좌표
+
+
+class FaceRoiTracker:
+    """
+    얼굴 주변만 잘라서 추론하기 위한 ROI 추적기
+
+    - 얼굴을 찾은 뒤에는 여백을 둔 정사각형 crop 으로만 추론 (720p 전체 대신)
+    - crop 에서 얼굴을 놓치거나 가장자리에 붙으면 같은 프레임을 전체 프레임으로 다시 탐지
+    - 얼굴이 없는 동안은 no_face_probe_ms 간격으로만 전체 프레임 추론 (나머지는 '얼굴 없음' 으로 기록)
+
+    crop 좌표 -> 전체 프레임 좌표 변환은 LandmarkBuffer.append(roi=...) 에서 처리
+    """
+
+    def __init__(
+        self,
+        *,
+        padding: float = ROI_PADDING,
+        min_size: int = ROI_MIN_SIZE,
+        edge_margin: float = ROI_EDGE_MARGIN,
+        recenter: float = ROI_RECENTER,
+        no_face_probe_ms: int = NO_FACE_PROBE_MS,
+    ):
+        self.padding = padding
+        self.min_size = min_size
+        self.edge_margin = edge_margin
+        self.recenter = recenter
+        self.no_face_probe_ms = no_face_probe_ms
+
+        self.roi: Optional[Box] = None
+        self._face_present = True      # 처음에는 있다고 보고 전체 프레임 탐지
+        self._last_probe_ms: Optional[int] = None
+
+        self.crop_frames = 0
+        self.full_frames = 0
+        self.redetects = 0
+        self.skipped_frames = 0
+
+    def skip(self, ts_ms: int) -> bool:
+        """얼굴이 없는 구간에서 이번 프레임 추론을 건너뛸지"""
+        if self._face_present:
+            return False
+        if self._last_probe_ms is None or ts_ms - self._last_probe_ms >= self.no_face_probe_ms:
+            self._last_probe_ms = ts_ms
+            return False
+        self.skipped_frames += 1
+        return True
+
+    def locate(self, result, roi: Optional[Box], width: int, height: int) -> Optional[Box]:
+        """추론 결과의 얼굴 박스 (전체 프레임 픽셀 좌표), 얼굴 없으면 None"""
+        if not result.face_landmarks:
+            return None
+        lms = result.face_landmarks[0]
+        xs = [lms[i].x for i in FACE_OVAL_INDICES]
+        ys = [lms[i].y for i in FACE_OVAL_INDICES]
+        if roi is None:
+            ox, oy, sw, sh = 0, 0, width, height
+        else:
+            ox, oy, sw, sh = roi[0], roi[1], roi[2] - roi[0], roi[3] - roi[1]
+        return (
+            int(ox + min(xs) * sw), int(oy + min(ys) * sh),
+            int(ox + max(xs) * sw), int(oy + max(ys) * sh),
+        )
+
+    def inside(self, box: Box, roi: Box) -> bool:
+        """crop 안에서 얼굴이 가장자리에 닿지 않았는지 (닿았으면 추적 신뢰 불가)"""
+        mx = (roi[2] - roi[0]) * self.edge_margin
+        my = (roi[3] - roi[1]) * self.edge_margin
+        return (
+            box[0] >= roi[0] + mx and box[1] >= roi[1] + my
+            and box[2] <= roi[2] - mx and box[3] <= roi[3] - my
+        )
+
+    def update(self, box: Optional[Box], width: int, height: int, ts_ms: int) -> None:
+        """이번 프레임 결과로 다음 프레임 crop 결정"""
+        if box is None:
+            self.roi = None
+            if self._face_present:
+                self._last_probe_ms = ts_ms
+            self._face_present = False
+            return
+        self._face_present = True
+
+        if self.roi is not None and not self._needs_recenter(box):
+            return
+        self.roi = self._roi_for(box, width, height)
+
+    def _needs_recenter(self, box: Box) -> bool:
+        rx0, ry0, rx1, ry1 = self.roi
+        size = max(rx1 - rx0, ry1 - ry0)
+        dx = (box[0] + box[2]) / 2 - (rx0 + rx1) / 2
+        dy = (box[1] + box[3]) / 2 - (ry0 + ry1) / 2
+        face = max(box[2] - box[0], box[3] - box[1])
+        target = face * (1 + 2 * self.padding)
+        return (
+            abs(dx) > size * self.recenter or abs(dy) > size * self.recenter
+            or abs(target - size) > size * self.recenter * 2
+        )
+
+    def _roi_for(self, box: Box, width: int, height: int) -> Optional[Box]:
+        face = max(box[2] - box[0], box[3] - box[1])
+        side = int(max(self.min_size, face * (1 + 2 * self.padding)))
+        if side >= min(width, height):
+            return None  # 얼굴이 화면 대부분이면 crop 이득 없음
+        cx = (box[0] + box[2]) // 2
+        cy = (box[1] + box[3]) // 2
+        x0 = min(max(0, cx - side // 2), width - side)
+        y0 = min(max(0, cy - side // 2), height - side)
+        return (x0, y0, x0 + side, y0 + side)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "crop_frames": self.crop_frames,
+            "full_frames": self.full_frames,
+            "redetects": self.redetects,
+            "skipped_no_face_frames": self.skipped_frames,
+        }
+
+
+def make_roi_tracker() -> Optional[FaceRoiTracker]:
+    """settings.VISUAL_FACE_ROI_TRACKING 이 켜져 있을 때만 추적기 생성"""
+    if not settings.VISUAL_FACE_ROI_TRACKING:
+        return None
+    return FaceRoiTracker(padding=settings.VISUAL_FACE_ROI_PADDING)
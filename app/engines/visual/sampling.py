@@ -0,0 +1,150 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.utils.media_decode import grid_slot
+
+# =========================================================
+# ⚙️ 프레임 샘플링 기본값
+# =========================================================
+# 고개 각도 / 시선은 10fps 면 충분, 눈 깜빡임(100~400ms)은 후보 구간에서만 원본 fps 로
+BASE_SAMPLE_FPS = 10.0
+BLINK_CANDIDATE_THRESHOLD = 0.25   # 이 값 이상이면 깜빡임이 시작되는 중으로 보고 burst 진입 (BLINK_THRESHOLD 보다 낮게)
+BLINK_BURST_MS = 400               # burst 유지 시간 (마지막 후보 프레임 기준)
+
+
+class FrameSampler:
+    """
+    프레임별로 MediaPipe 추론을 할지 결정하는 스케줄러
+
+    - 평소: base_fps 간격으로만 추론 (나머지 프레임은 cap.grab() 으로 건너뜀 -> RGB 변환/추론 없음)
+    - 깜빡임 후보(blink score >= candidate_threshold)가 보이면 burst_ms 동안 burst_fps(None = 원본 fps 전부)로 추론
+    - base_fps <= 0 이면 모든 프레임 추론 (기존 동작)
+
+    간격은 영상 시간 0 기준 고정 격자로 판단: floor(ts / interval) 칸이 마지막으로 추론한 프레임의 칸과 다르면 추론
+    => 어느 시점부터 보기 시작해도 (구간 병렬 분석의 구간 시작 등) burst 밖에서는 같은 프레임이 선택됨
+
+    사용 순서: want(ts) 가 True 인 프레임만 디코드/추론하고, 추론 후 observe(ts, blink_score) 호출
+    want / schedule / observe 는 lock 으로 보호 (실시간 분석처럼 recv 스레드와 추론 스레드가 나눠 호출하는 경우)
+    샘플링 중에는 기본적으로 디코드/추론 파이프라인을 쓰지 않음 (pipeline_depth 참고)
+    """
+
+    def __init__(
+        self,
+        base_fps: float = BASE_SAMPLE_FPS,
+        *,
+        burst_fps: Optional[float] = None,
+        burst_ms: int = BLINK_BURST_MS,
+        blink_candidate_threshold: float = BLINK_CANDIDATE_THRESHOLD,
+    ):
+        self.base_fps = base_fps
+        self.burst_fps = burst_fps
+        self.burst_ms = burst_ms
+        self.blink_candidate_threshold = blink_candidate_threshold
+
+        self._base_interval_ms = 1000.0 / base_fps if base_fps > 0 else 0.0
+        self._burst_interval_ms = 1000.0 / burst_fps if burst_fps else 0.0
+
+        self._last_ts: Optional[int] = None
+        self._burst_until: int = -1
+        self._lock = threading.Lock()
+
+        self.processed_frames = 0
+        self.burst_frames = 0
+
+    @property
+    def full_rate(self) -> bool:
+        return self.base_fps <= 0
+
+    def in_burst(self, ts_ms: int) -> bool:
+        return ts_ms <= self._burst_until
+
+    def want(self, ts_ms: int) -> bool:
+        """이 타임스탬프의 프레임을 디코드/추론할지 (상태를 바꾸지 않음)"""
+        if self.full_rate:
+            return True
+        with self._lock:
+            if self._last_ts is None:
+                return True
+            interval = self._burst_interval_ms if self.in_burst(ts_ms) else self._base_interval_ms
+            if interval <= 0:
+                return True
+            return grid_slot(ts_ms, interval) != grid_slot(self._last_ts, interval)
+
+    def schedule(self, ts_ms: int) -> None:
+        """
+        추론 결과가 나오기 전에 이 프레임을 보냈다고 기록 (비동기 추론용)
+        - 추론 스레드의 observe() 를 기다리지 않고 다음 want() 가 이 프레임 기준 간격을 적용
+        """
+        with self._lock:
+            self._last_ts = ts_ms
+
+    def observe(self, ts_ms: int, blink_score: float) -> None:
+        """추론한 프레임 기록 + 깜빡임 후보면 burst 연장"""
+        with self._lock:
+            self.processed_frames += 1
+            if self.in_burst(ts_ms):
+                self.burst_frames += 1
+            self._last_ts = ts_ms
+            if blink_score >= self.blink_candidate_threshold:
+                self._burst_until = ts_ms + self.burst_ms
+
+    def stats(self) -> dict:
+        return {
+            "processed_frames": self.processed_frames,
+            "burst_frames": self.burst_frames,
+            "base_fps": self.base_fps,
+        }
+
+
+def _sampling(sampler: Optional[FrameSampler]) -> bool:
+    return sampler is not None and not sampler.full_rate
+
+
+def pipeline_depth(sampler: Optional[FrameSampler]) -> int:
+    """
+    실제로 쓸 디코드/추론 파이프라인 깊이
+    - 샘플링 중이면 0 (VISUAL_PIPELINE_WITH_SAMPLING 이 켜져 있을 때만 VISUAL_PIPELINE_DEPTH)
+      디코더가 추론보다 앞서 가면 burst 여부를 모르므로 모든 프레임을 retrieve + RGB 변환해야 함
+      burst(400ms)는 base 간격(100ms)의 어느 프레임에서든 시작될 수 있어 타임스탬프만으로 미리 거를 수 있는 프레임도 없음
+      => 기본은 겹쳐 실행하는 대신 디코더에서 grab() 만 하고 건너뛰기 (약 2/3 프레임 변환 생략)
+    - 모든 프레임 추론이면 VISUAL_PIPELINE_DEPTH 그대로
+    """
+    if _sampling(sampler) and not settings.VISUAL_PIPELINE_WITH_SAMPLING:
+        return 0
+    return max(0, settings.VISUAL_PIPELINE_DEPTH)
+
+
+def source_filter(sampler: Optional[FrameSampler]) -> Optional[Callable[[int], bool]]:
+    """
+    프레임 소스(디코더)에 넘길 want 함수
+    - 파이프라인을 쓰면 디코더가 별도 스레드에서 돌므로 None (추론 스레드에서만 거름)
+      => 샘플러 상태(burst)를 한 스레드만 읽고 바꿔서 결과가 스레드 타이밍과 무관
+    - 파이프라인이 없으면 sampler.want (건너뛸 프레임은 retrieve / RGB 변환 생략)
+    """
+    if sampler is None or pipeline_depth(sampler) > 0:
+        return None
+    return sampler.want
+
+
+def pipeline_details(sampler: Optional[FrameSampler]) -> Dict[str, Any]:
+    """
+    details["pipeline"] 에 남길 디코드 방식
+    - mode: "skip" (샘플링 + 디코더에서 건너뛰기, 겹쳐 실행 없음) / "overlap" (파이프라인, 모든 프레임 변환) / "sequential"
+    """
+    depth = pipeline_depth(sampler)
+    if depth > 0:
+        mode = "overlap"
+    else:
+        mode = "skip" if _sampling(sampler) else "sequential"
+    return {
+        "mode": mode,
+        "depth": depth,
+        "configured_depth": settings.VISUAL_PIPELINE_DEPTH,
+        "source_filter": mode == "skip",
+    }
+
+
+def make_frame_sampler() -> FrameSampler:
+    """settings.VISUAL_SAMPLE_FPS 기준 샘플러 (0 이면 모든 프레임 추론)"""
+    return FrameSampler(settings.VISUAL_SAMPLE_FPS)
@@ -0,0 +1,456 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# =========================================================
+# ⚙️ V3 채점 기준 상수 설정
+# =========================================================
+# [1] Head (고개 각도)
+HEAD_NORMAL_THRESHOLD = 2.5   # 정상 범위 (±2.5도)
+HEAD_MINOR_THRESHOLD = 10.0   # 경미/심각 경계 (10도)
+HEAD_MINOR_TIME_LIMIT = 3.0   # 경미한 이탈 허용 시간 (3초)
+HEAD_MINOR_ALLOW_COUNT = 3    # 경미한 이탈 허용 횟수
+HEAD_MAJOR_ALLOW_COUNT = 1    # 심각한 이탈 허용 횟수
+
+# [2] Smile (미소)
+SMILE_THRESHOLD = 0.5         # 미소 감지 임계값 (Blendshape)
+
+# [3] Blink (눈 깜빡임)
+BLINK_THRESHOLD = 0.5         # 눈 감음 임계값
+BLINK_RPM_MIN = 10            # 정상 최소 RPM
+BLINK_RPM_MAX = 30            # 정상 최대 RPM
+
+# [4] Gaze (시선)
+GAZE_THRESHOLD = 0.15         # 튜닝값 (이 정도 shift면 이탈로 간주)
+GAZE_OFF_RATIO_LIMIT = 0.10   # 전체 시간 대비 허용 이탈 비율 (10%)
+GAZE_LONG_DURATION = 2.0      # 장기 이탈 기준 시간 (2초)
+
+HEAD_NORMAL, HEAD_MINOR, HEAD_MAJOR = 0, 1, 2
+
+TIMELINE_EVERY_SEC = 0.5      # 그래프용 다운샘플 간격
+
+
+class FrameHistory:
+    """
+    프레임별 시계열을 미리 잡아둔 NumPy 배열에 저장 (파이썬 리스트 append 대신)
+    - capacity 를 넘으면 2배로 늘림
+    - timestamps 는 초 단위
+    """
+
+    FIELDS = ("timestamps", "head_angles", "gaze_shifts", "blink_scores", "smile_scores")
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, int(capacity))
+        self._data = np.zeros((len(self.FIELDS), capacity), dtype=np.float64)
+        self.size = 0
+
+    @classmethod
+    def from_lists(cls, h: Dict[str, Sequence[float]]) -> "FrameHistory":
+        n = len(h["timestamps"])
+        fh = cls(capacity=n)
+        for row, name in enumerate(cls.FIELDS):
+            fh._data[row, :n] = h[name]
+        fh.size = n
+        return fh
+
+    @classmethod
+    def from_arrays(cls, *columns: np.ndarray) -> "FrameHistory":
+        """FIELDS 순서의 1차원 배열들로 생성 (벡터 계산 결과를 그대로 받음)"""
+        n = columns[0].shape[0]
+        fh = cls(capacity=n)
+        for row, col in enumerate(columns):
+            fh._data[row, :n] = col
+        fh.size = n
+        return fh
+
+    def append(self, ts_sec: float, head_angle: float, gaze_shift: float, blink: float, smile: float) -> None:
+        if self.size == self._data.shape[1]:
+            grown = np.zeros((self._data.shape[0], self.size * 2), dtype=self._data.dtype)
+            grown[:, :self.size] = self._data
+            self._data = grown
+        d = self._data
+        i = self.size
+        d[0, i] = ts_sec
+        d[1, i] = head_angle
+        d[2, i] = gaze_shift
+        d[3, i] = blink
+        d[4, i] = smile
+        self.size = i + 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    # 현재까지 채워진 부분만 보여주는 view (복사 없음)
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._data[0, :self.size]
+
+    @property
+    def head_angles(self) -> np.ndarray:
+        return self._data[1, :self.size]
+
+    @property
+    def gaze_shifts(self) -> np.ndarray:
+        return self._data[2, :self.size]
+
+    @property
+    def blink_scores(self) -> np.ndarray:
+        return self._data[3, :self.size]
+
+    @property
+    def smile_scores(self) -> np.ndarray:
+        return self._data[4, :self.size]
+
+
+HistoryLike = Union[FrameHistory, Dict[str, Sequence[float]]]
+
+
+# =========================================================
+# 벡터화 유틸
+# =========================================================
+def run_lengths(values: np.ndarray):
+    """
+    Run-length encoding -> (run 시작 인덱스, run 길이, run 값)
+    예) [0,0,1,1,1,0] -> starts [0,2,5], lengths [2,3,1], values [0,1,0]
+    """
+    n = values.shape[0]
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, values[:0]
+    change = np.flatnonzero(values[1:] != values[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    lengths = np.diff(np.concatenate((starts, [n])))
+    return starts, lengths, values[starts]
+
+
+def sample_intervals(times: np.ndarray, duration: float) -> np.ndarray:
+    """
+    각 샘플이 대표하는 시간(초) = 다음 샘플까지의 간격
+    마지막 샘플은 영상 끝까지 (단, 일반적인 샘플 간격을 넘지 않게)
+    """
+    n = times.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    if n == 1:
+        return np.array([max(duration - times[0], 0.0)])
+    gaps = np.diff(times)
+    typical = np.sort(gaps)[gaps.shape[0] // 2]
+    tail = duration - times[-1]
+    last = min(tail, typical) if tail > 0 else typical
+    return np.append(gaps, last)
+
+
+def timeline_step(intervals: np.ndarray, every_sec: float = TIMELINE_EVERY_SEC) -> int:
+    """그래프용 다운샘플 간격 (30fps 에서 기존 [::15] 와 같은 0.5초)"""
+    if intervals.shape[0] == 0:
+        return 1
+    typical = np.sort(intervals)[intervals.shape[0] // 2]
+    return max(1, int(round(every_sec / typical))) if typical > 0 else 1
+
+
+# =========================================================
+# 세부 지표 (채점 전 원시 값)
+# =========================================================
+def head_events(times: np.ndarray, angles: np.ndarray):
+    """
+    고개 상태(NORMAL/MINOR/MAJOR) 구간별 지속 시간
+    - 구간 길이 = 다음 상태가 시작된 프레임 시각 - 시작 프레임 시각 (마지막 구간은 마지막 프레임까지)
+    반환: (minor 지속시간 배열, major 지속시간 배열)
+    """
+    if times.shape[0] == 0:
+        return np.zeros(0), np.zeros(0)
+    abs_ang = np.abs(angles)
+    state = np.where(
+        abs_ang >= HEAD_MINOR_THRESHOLD, HEAD_MAJOR,
+        np.where(abs_ang >= HEAD_NORMAL_THRESHOLD, HEAD_MINOR, HEAD_NORMAL),
+    )
+    starts, _, run_state = run_lengths(state)
+    ends = np.append(times[starts[1:]], times[-1])
+    durs = ends - times[starts]
+    return durs[run_state == HEAD_MINOR], durs[run_state == HEAD_MAJOR]
+
+
+def blink_count(blink_scores: np.ndarray) -> int:
+    """눈 감음 rising edge 개수"""
+    closed = blink_scores > BLINK_THRESHOLD
+    if closed.shape[0] == 0:
+        return 0
+    return int(closed[0]) + int(np.count_nonzero(closed[1:] & ~closed[:-1]))
+
+
+def gaze_metrics(times: np.ndarray, shifts: np.ndarray, intervals: np.ndarray):
+    """
+    반환: (이탈 시간 비율, 장기 이탈 횟수)
+    - 장기 이탈: 이탈 시작 ~ 복귀 프레임 시각이 GAZE_LONG_DURATION 초과 (영상 끝까지 이어진 구간은 제외)
+    """
+    if times.shape[0] == 0:
+        return 0.0, 0
+    off = shifts > GAZE_THRESHOLD
+    covered = float(intervals.sum())
+    ratio = float(intervals[off].sum()) / covered if covered > 0 else 0.0
+
+    starts, lengths, run_off = run_lengths(off)
+    ends = starts + lengths                       # 복귀 프레임 인덱스
+    closed = run_off & (ends < times.shape[0])    # 복귀한 이탈 구간만
+    durs = times[ends[closed]] - times[starts[closed]]
+    return ratio, int(np.count_nonzero(durs > GAZE_LONG_DURATION))
+
+
+def extract_metrics(h: HistoryLike, duration: float) -> Dict[str, Any]:
+    """히스토리 -> 채점에 필요한 원시 지표"""
+    if not isinstance(h, FrameHistory):
+        h = FrameHistory.from_lists(h)
+    times = h.timestamps
+    intervals = sample_intervals(times, duration)
+    minor, major = head_events(times, h.head_angles)
+    gaze_ratio, long_gaze = gaze_metrics(times, h.gaze_shifts, intervals)
+    blinks = blink_count(h.blink_scores)
+    return {
+        "minor_events": minor,
+        "major_events": major,
+        "max_smile": float(h.smile_scores.max()) if len(h) else 0.0,
+        "blink_count": blinks,
+        "rpm": blinks / (duration / 60.0) if duration > 0 else 0,
+        "gaze_off_ratio": gaze_ratio,
+        "long_gaze_events": long_gaze,
+        "frames": len(h),
+        "timeline_step": timeline_step(intervals),
+    }
+
+
+# =========================================================
+# 채점 + 결과 조립
+# =========================================================
+def compose_result(m: Dict[str, Any], h: Optional[HistoryLike] = None) -> Dict[str, Any]:
+    """원시 지표 -> V3 점수/피드백 (h 가 있으면 그래프용 타임라인 포함)"""
+    scores = {
+        "head": 50,
+        "smile": 0,  # 기본 0, 감지시 +5
+        "blink": 10,
+        "gaze": 20,
+        "base": BASE_SCORE
+    }
+    deductions: List[str] = []  # 감점 사유 기록
+
+    # [1] Head (50점): Minor 3초 초과 -> -10, 3초 이하 -> 3회 허용 후 -5/회, Major 1회 허용 후 -20/회
+    head_deduction = 0
+    minor = np.asarray(m["minor_events"])
+    for _ in range(int(np.count_nonzero(minor > HEAD_MINOR_TIME_LIMIT))):
+        head_deduction += 10
+        deductions.append(f"고개 경미 이탈 3초 이상 지속 (-10점)")
+
+    minor_short_count = int(np.count_nonzero(minor <= HEAD_MINOR_TIME_LIMIT))
+    if minor_short_count > HEAD_MINOR_ALLOW_COUNT:
+        penalty_count = minor_short_count - HEAD_MINOR_ALLOW_COUNT
+        ded = penalty_count * 5
+        head_deduction += ded
+        deductions.append(f"고개 경미 이탈 횟수 초과({penalty_count}회) (-{ded}점)")
+
+    major_count = len(m["major_events"])
+    if major_count > HEAD_MAJOR_ALLOW_COUNT:
+        penalty_count = major_count - HEAD_MAJOR_ALLOW_COUNT
+        ded = penalty_count * 20
+        head_deduction += ded
+        deductions.append(f"고개 심각한 이탈 횟수 초과({penalty_count}회) (-{ded}점)")
+
+    scores["head"] = max(0, 50 - min(50, head_deduction))
+
+    # [2] Smile (5점): 한번이라도 0.5 이상이면 +5
+    if m["max_smile"] >= SMILE_THRESHOLD:
+        scores["smile"] = 5
+    else:
+        deductions.append("미소가 감지되지 않음 (0/5점)")
+
+    # [3] Blink (10점)
+    rpm = m["rpm"]
+    if rpm < BLINK_RPM_MIN: # 너무 적게 깜빡임 (긴장/경직)
+        if rpm < 5: # 심각
+            scores["blink"] -= 10
+            deductions.append(f"눈 깜빡임이 매우 부족함({rpm:.1f}회/분) (-10점)")
+        else:
+            scores["blink"] -= 5
+            deductions.append(f"눈 깜빡임 부족({rpm:.1f}회/분) (-5점)")
+    elif rpm > BLINK_RPM_MAX: # 너무 많이 깜빡임 (불안)
+        if rpm > 50: # 심각
+            scores["blink"] -= 10
+            deductions.append(f"눈 깜빡임이 과도함({rpm:.1f}회/분) (-10점)")
+        else:
+            scores["blink"] -= 5
+            deductions.append(f"눈 깜빡임 다소 과함({rpm:.1f}회/분) (-5점)")
+    scores["blink"] = max(0, scores["blink"]) # 0점 미만 방지
+
+    # [4] Gaze (20점): 이탈 비율 10% 이상 -10, 장기 이탈 횟수당 -5 (최대 -10)
+    ratio = m["gaze_off_ratio"]
+    if ratio >= GAZE_OFF_RATIO_LIMIT:
+        scores["gaze"] -= 10
+        deductions.append(f"시선 불안정 비율 높음({ratio*100:.1f}%) (-10점)")
+
+    long_gaze_events = m["long_gaze_events"]
+    if long_gaze_events > 0:
+        ded = min(10, long_gaze_events * 5)
+        scores["gaze"] -= ded
+        deductions.append(f"2초 이상 시선 이탈 {long_gaze_events}회 (-{ded}점)")
+    scores["gaze"] = max(0, scores["gaze"])
+
+    # 📝 최종 결과 집계
+    final_score = sum(scores.values())
+    feedback_str = _feedback_text(final_score, deductions)
+
+    details: Dict[str, Any] = {
+        "head_score": scores["head"],
+        "smile_score": scores["smile"],
+        "blink_score": scores["blink"],
+        "gaze_score": scores["gaze"],
+        "rpm": round(rpm, 1),
+        "frames_analyzed": m["frames"],
+    }
+    if h is not None:
+        if not isinstance(h, FrameHistory):
+            h = FrameHistory.from_lists(h)
+        step = m["timeline_step"]
+        details["timeline_timestamps"] = h.timestamps[::step].tolist() # 그래프용 (약 0.5초 간격)
+        details["timeline_head"] = h.head_angles[::step].tolist()
+
+    return {
+        "score": int(final_score),
+        "feedback": feedback_str,
+        "details": details,
+    }
+
+
+def _feedback_text(final_score: int, deductions: List[str]) -> str:
+    if final_score >= 90: summary = "매우 안정적이고 훌륭한 비언어적 태도입니다."
+    elif final_score >= 70: summary = "전반적으로 양호하나 일부 개선이 필요합니다."
+    else: summary = "시선 처리와 자세에서 불안정한 모습이 보입니다."
+
+    feedback_str = summary
+    if deductions:
+        feedback_str += "\n\n[주요 감점 요인]\n- " + "\n- ".join(deductions[:3]) # 상위 3개만
+    return feedback_str
+
+
+# 세부 점수 만점 (총점 = 세부 점수 합 + BASE_SCORE)
+SUB_SCORE_MAX = {"head_score": 50, "smile_score": 5, "blink_score": 10, "gaze_score": 20}
+BASE_SCORE = 15
+LIVE_COVERAGE_BIN_SEC = 0.5   # 실시간 분석 coverage 계산 칸 (녹화 길이를 이 간격으로 나눔)
+# 실시간 결과(클라이언트가 보낸 값)에서 세부 점수 외에 옮기는 details (형식을 확인한 것만 - sanitize_live_details)
+LIVE_TIMELINE_MAX_POINTS = 2400   # 그래프 점 최대 개수 (최대 답변 길이 600초 / 0.5초 간격의 2배)
+_LIVE_BLOB_KEYS = {
+    "sampling": ("processed_frames", "burst_frames", "base_fps"),
+    "live": ("offered_frames", "dropped_frames", "duration_sec", "coverage", "finished_at"),
+}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _valid_timeline(timestamps: Any, head: Any) -> bool:
+    """길이가 같은 숫자 리스트, LIVE_TIMELINE_MAX_POINTS 이하, timestamp 는 0 이상이고 증가"""
+    if not isinstance(timestamps, list) or not isinstance(head, list) or len(timestamps) != len(head):
+        return False
+    if len(timestamps) > LIVE_TIMELINE_MAX_POINTS:
+        return False
+    if not all(_is_number(v) for v in timestamps) or not all(_is_number(v) for v in head):
+        return False
+    if timestamps and timestamps[0] < 0:
+        return False
+    return all(b > a for a, b in zip(timestamps, timestamps[1:]))
+
+
+def sanitize_live_details(details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    클라이언트가 보낸 details 에서 세부 점수 외에 저장할 값만 형식 확인 후 복사
+    - rpm / frames_analyzed: 0 이상 유한한 숫자
+    - timeline_timestamps / timeline_head: _valid_timeline 을 통과할 때만 (아니면 둘 다 버림)
+    - sampling / live: 알려진 숫자 키만 (_LIVE_BLOB_KEYS)
+    """
+    out: Dict[str, Any] = {}
+    rpm, frames = details.get("rpm"), details.get("frames_analyzed")
+    if _is_number(rpm) and rpm >= 0:
+        out["rpm"] = round(float(rpm), 1)
+    if _is_number(frames) and frames >= 0:
+        out["frames_analyzed"] = int(frames)
+    timestamps, head = details.get("timeline_timestamps"), details.get("timeline_head")
+    if _valid_timeline(timestamps, head):
+        out["timeline_timestamps"] = [float(v) for v in timestamps]
+        out["timeline_head"] = [float(v) for v in head]
+    for key, allowed in _LIVE_BLOB_KEYS.items():
+        blob = details.get(key)
+        if isinstance(blob, dict):
+            out[key] = {k: blob[k] for k in allowed if _is_number(blob.get(k))}
+    return out
+
+
+def clamp_sub_scores(details: Dict[str, Any]) -> Dict[str, int]:
+    """세부 점수를 정수 0~만점 범위로 (없거나 숫자가 아니면 0)"""
+    out: Dict[str, int] = {}
+    for key, top in SUB_SCORE_MAX.items():
+        value = details.get(key)
+        out[key] = int(min(top, max(0, value))) if _is_number(value) else 0
+    return out
+
+
+def live_result_details(result: Any, min_coverage: float) -> Optional[Dict[str, Any]]:
+    """
+    녹화 중 실시간 Visual 결과(v0) -> 세부 점수 + sanitize_live_details 를 거친 details (쓸 수 없는 결과면 None)
+    - 실패 결과 / 세부 점수가 숫자가 아닌 결과
+    - 분석 프레임이 없거나 details.live.coverage 가 min_coverage 미만 (추론이 밀려 일부 구간만 분석된 결과)
+    """
+    if not isinstance(result, dict) or result.get("module") != "visual" or result.get("error"):
+        return None
+    metrics = result.get("metrics")
+    details = metrics.get("details") if isinstance(metrics, dict) else None
+    if not isinstance(details, dict) or not all(_is_number(details.get(k)) for k in SUB_SCORE_MAX):
+        return None
+    clean = sanitize_live_details(details)
+    coverage = clean.get("live", {}).get("coverage")
+    if not clean.get("frames_analyzed") or coverage is None or coverage < min_coverage:
+        return None
+    clean.update(clamp_sub_scores(details))
+    return clean
+
+
+def compose_from_sub_scores(details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    세부 점수만으로 총점/피드백을 다시 계산 (녹화 중 실시간 결과처럼 클라이언트가 보낸 결과용)
+    - 클라이언트가 보낸 score / feedback 은 쓰지 않음
+    - details 는 세부 점수 + sanitize_live_details 를 통과한 값만 남김
+    """
+    scores = clamp_sub_scores(details)
+    deductions: List[str] = []
+    if scores["head_score"] < SUB_SCORE_MAX["head_score"]:
+        deductions.append(f"고개 이탈 (-{SUB_SCORE_MAX['head_score'] - scores['head_score']}점)")
+    if scores["smile_score"] < SUB_SCORE_MAX["smile_score"]:
+        deductions.append("미소가 감지되지 않음 (0/5점)")
+    if scores["blink_score"] < SUB_SCORE_MAX["blink_score"]:
+        deductions.append(f"눈 깜빡임 빈도 (-{SUB_SCORE_MAX['blink_score'] - scores['blink_score']}점)")
+    if scores["gaze_score"] < SUB_SCORE_MAX["gaze_score"]:
+        deductions.append(f"시선 이탈 (-{SUB_SCORE_MAX['gaze_score'] - scores['gaze_score']}점)")
+
+    final_score = sum(scores.values()) + BASE_SCORE
+    out_details: Dict[str, Any] = dict(scores)
+    out_details.update(sanitize_live_details(details))
+    return {
+        "score": int(final_score),
+        "feedback": _feedback_text(final_score, deductions),
+        "details": out_details,
+    }
+
+
+def score_history(h: HistoryLike, duration: float) -> Dict[str, Any]:
+    """V3 채점 (VisualAnalysisEngine._calculate_v3_score 와 같은 결과)"""
+    if duration <= 0:
+        return {"score": 0, "feedback": "영상 길이가 너무 짧습니다."}
+    if not isinstance(h, FrameHistory):
+        h = FrameHistory.from_lists(h)
+    return compose_result(extract_metrics(h, duration), h)
+
+
+def score_histories(histories: Sequence[HistoryLike], durations: Sequence[float]) -> List[Dict[str, Any]]:
+    """
+    여러 답변의 히스토리를 한 번에 다시 채점 (기준 상수 변경 후 재채점 등)
+    MediaPipe 를 다시 돌리지 않으므로 10분 영상도 수 ms 수준
+    """
+    return [score_history(h, d) for h, d in zip(histories, durations)]
@@ -5,9 +5,13 @@ import os
 import re
 
 import numpy as np
-import librosa
 
+from app.core.config import settings
 from app.engines.common.result import ok_result, error_result
+from app.utils.audio_io import load_pcm
+from app.engines.voice.features import VoiceFeatureFrame
+from app.engines.voice.parallel import parallel_pitch_stats, should_run_parallel
+from app.engines.voice.pitch import resolve_backend, resolve_skip_silence
 
 
 # -------------------------
@@ -30,88 +34,58 @@ def _count_chars(text: Optional[str]) -> int:
 
 
 # -------------------------
-# silence
+# silence / pitch
 # -------------------------
 def _count_silence_intervals(
-    y: np.ndarray,
-    sr: int,
+    features: VoiceFeatureFrame,
     *,
     top_db: int = 30,
-    frame_length: int = 2048,
-    hop_length: int = 256,
     min_silence_sec: float = 0.25,
 ) -> int:
-    non_silent = librosa.effects.split(
-        y=y,
-        top_db=top_db,
-        frame_length=frame_length,
-        hop_length=hop_length,
-    )
-
-    total = len(y)
-    cur = 0
-    cnt = 0
-
-    for start, end in non_silent:
-        start, end = int(start), int(end)
-        if start > cur:
-            dur = (start - cur) / float(sr)
-            if dur >= min_silence_sec:
-                cnt += 1
-        cur = max(cur, end)
+    return features.silence_count(top_db, min_silence_sec)
 
-    if cur < total:
-        dur = (total - cur) / float(sr)
-        if dur >= min_silence_sec:
-            cnt += 1
 
-    return int(cnt)
-
-
-# -------------------------
-# pitch (pyin)
-# -------------------------
 def _compute_pitch_stats_hz(
-    y: np.ndarray,
-    sr: int,
+    features: VoiceFeatureFrame,
     *,
-    fmin_hz: float = 65.0,
-    fmax_hz: float = 2093.0,
-    frame_length: int = 2048,
-    hop_length: int = 512,
+    backend: Optional[str] = None,
+    fmin_hz: Optional[float] = None,
+    fmax_hz: Optional[float] = None,
+    skip_silence_db: Optional[float] = None,
+    workers: Optional[int] = None,
 ) -> Dict[str, Optional[float]]:
     """
-    pyin 기반 pitch 통계 (MVP):
+    F0 기반 pitch 통계 (MVP):
     - avg_pitch, max_pitch, pitch_std, voiced_ratio
+    - backend: "pyin" / "yin" (None 이면 settings.VOICE_PITCH_BACKEND), 범위를 안 주면 백엔드 기본 범위
+    - skip_silence_db 를 주면 발화 구간과 겹치는 프레임에서만 F0 추정 (나머지는 무성 처리)
+      voiced_ratio 분모는 그대로 전체 신호의 프레임 수
+    - 긴 답변은 워커(기본 settings.VOICE_PARALLEL_WORKERS)가 2개 이상이면 청크 병렬 실행 (결과 동일)
     """
-    f0, _, _ = librosa.pyin(
-        y=y,
-        fmin=fmin_hz,
-        fmax=fmax_hz,
-        sr=sr,
-        frame_length=frame_length,
-        hop_length=hop_length,
+    if should_run_parallel(
+        features.duration_sec,
+        backend=backend,
+        skip_silence=skip_silence_db is not None,
+        workers=workers,
+    ):
+        stats = parallel_pitch_stats(
+            features,
+            backend=backend,
+            fmin_hz=fmin_hz,
+            fmax_hz=fmax_hz,
+            skip_silence_db=skip_silence_db,
+            workers=workers,
+        )
+        info = stats.pop("parallel")
+        print(f"🧩 [Voice] pitch 청크 병렬 {info['chunks']}개 (workers={info['workers']}): {info['chunk_elapsed_sec']}")
+        return stats
+    return features.pitch_stats(
+        backend=backend,
+        fmin_hz=fmin_hz,
+        fmax_hz=fmax_hz,
+        skip_silence_db=skip_silence_db,
     )
 
-    if f0 is None or len(f0) == 0:
-        return {"avg_pitch": None, "max_pitch": None, "pitch_std": None, "voiced_ratio": 0.0}
-
-    voiced = f0[~np.isnan(f0)]
-    if voiced.size == 0:
-        return {"avg_pitch": None, "max_pitch": None, "pitch_std": None, "voiced_ratio": 0.0}
-
-    avg = _safe_float(np.mean(voiced))
-    mx = _safe_float(np.max(voiced))
-    std = _safe_float(np.std(voiced))
-    voiced_ratio = float(voiced.size / float(len(f0)))
-
-    return {
-        "avg_pitch": avg,
-        "max_pitch": mx,
-        "pitch_std": std,
-        "voiced_ratio": voiced_ratio,
-    }
-
 
 # -------------------------
 # speed (CPS/CPM)
@@ -225,78 +199,144 @@ def _compute_max_wpm(stt_segments: Optional[List[Dict[str, Any]]]) -> Optional[i
     return None if max_wpm is None else int(round(max_wpm))
 
 
+# -------------------------
+# metrics
+# -------------------------
+# 오디오에서만 나오는 지표 (STT 결과와 무관) - 녹화 중 VoiceAccumulator 가 미리 계산해 둘 수 있는 부분
+ACOUSTIC_KEYS = ("silence_count", "duration_sec", "avg_pitch", "max_pitch", "pitch_std", "voiced_ratio", "pitch_backend")
+
+
+def _acoustic_metrics(
+    features: VoiceFeatureFrame,
+    pitch: Dict[str, Optional[float]],
+    *,
+    silence_top_db: int,
+    min_silence_sec: float,
+    pitch_backend: Optional[str] = None,
+) -> Dict[str, Any]:
+    duration_sec = features.duration_sec
+    silence_count = _count_silence_intervals(features, top_db=silence_top_db, min_silence_sec=min_silence_sec)
+    silence_rate_30s = silence_count / max(duration_sec, 1e-6) * 30.0
+    return {
+        "silence_count": int(silence_rate_30s),
+        "duration_sec": duration_sec,
+        "avg_pitch": pitch["avg_pitch"],
+        "max_pitch": pitch["max_pitch"],
+        "pitch_std": pitch["pitch_std"],
+        "voiced_ratio": pitch["voiced_ratio"],
+        "pitch_backend": resolve_backend(pitch_backend),
+    }
+
+
+def _voice_metrics(
+    acoustic: Dict[str, Any],
+    stt_text: Optional[str],
+    stt_segments: Optional[List[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    duration_sec = float(acoustic["duration_sec"])
+
+    # legacy WPM (호환)
+    avg_wpm = _compute_avg_wpm(stt_text, duration_sec)
+    max_wpm = _compute_max_wpm(stt_segments)
+
+    # CPS/CPM (한국어 친화)
+    avg_cps, avg_cpm, char_count = _compute_avg_cps_cpm(stt_text, duration_sec)
+
+    # 불안정(세그먼트 기반)
+    inst = _compute_instability_from_segments(stt_segments)
+
+    return {
+        # compatibility
+        "avg_wpm": avg_wpm,
+        "max_wpm": max_wpm,
+        "silence_count": acoustic["silence_count"],
+        "duration_sec": duration_sec,
+        # "duration": duration_sec,  # AnalysisService 호환
+
+        # pitch core
+        "avg_pitch": acoustic["avg_pitch"],
+        "max_pitch": acoustic["max_pitch"],
+        "pitch_std": acoustic["pitch_std"],
+        "voiced_ratio": acoustic["voiced_ratio"],
+        "pitch_backend": acoustic["pitch_backend"],
+
+        # speed core
+        "char_count": char_count,
+        "avg_cps": avg_cps,
+        "avg_cpm": avg_cpm,
+
+        # instability core
+        "burst_ratio": inst["burst_ratio"],
+        "high_speed_share": inst["high_speed_share"],
+        "cv_cps": inst["cv_cps"],
+    }
+
+
 # -------------------------
 # main
 # -------------------------
 def run_voice(
-    audio_path: str,
+    audio_path: Optional[str],
     stt_text: Optional[str] = None,
     stt_segments: Optional[List[Dict[str, Any]]] = None,
     *,
+    # 이미 디코드된 16kHz mono float32 PCM (있으면 audio_path 대신 사용)
+    audio: Optional[np.ndarray] = None,
+    # 녹화 중 미리 계산한 오디오 지표 (ACOUSTIC_KEYS, 있으면 오디오를 읽지 않고 STT 기반 지표만 계산)
+    acoustic: Optional[Dict[str, Any]] = None,
     # silence params
     silence_top_db: int = 35,
     min_silence_sec: float = 0.25,
-    # pyin params
-    fmin_hz: float = 65.0,
-    fmax_hz: float = 2093.0,
+    # pitch params (범위 None = 백엔드 기본값: pyin 65~2093Hz / yin 65~500Hz)
+    pitch_backend: Optional[str] = None,
+    pitch_skip_silence: Optional[bool] = None,
+    pitch_workers: Optional[int] = None,
+    fmin_hz: Optional[float] = None,
+    fmax_hz: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Voice 엔진 (MVP: raw 측정만)
     - 서비스 호환을 위해 avg_wpm/max_wpm/duration 키는 유지
     - 한국어 속도 평가는 avg_cpm + 불안정(burst/share/cv) 중심
+    - audio 가 주어지면 파일을 다시 디코드하지 않음 (16kHz mono float32 가정)
+    - pitch_skip_silence(기본 settings.VOICE_PITCH_SKIP_SILENCE, 미설정이면 yin 에서만): 침묵 구간은 F0 추정 없이 무성 처리
     """
     try:
-        if not audio_path:
-            raise ValueError("audio_path is required")
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"audio file not found: {audio_path}")
-
-        y, sr = librosa.load(audio_path, sr=16000, mono=True)
+        if acoustic is not None:
+            return ok_result("voice", metrics=_voice_metrics(acoustic, stt_text, stt_segments), events=[])
+
+        if audio is not None:
+            y, sr = np.asarray(audio, dtype=np.float32), 16000
+        else:
+            if not audio_path:
+                raise ValueError("audio_path is required")
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError(f"audio file not found: {audio_path}")
+
+            # librosa.load(sr=16000) 와 같은 값 (16kHz WAV 는 리샘플 없이 바로 읽음)
+            y, sr = load_pcm(audio_path), 16000
         if y is None or len(y) == 0:
             raise ValueError("audio is empty or could not be loaded")
 
-        duration_sec = float(len(y) / sr)
-
-        pitch = _compute_pitch_stats_hz(y, sr, fmin_hz=fmin_hz, fmax_hz=fmax_hz)
-        silence_count = _count_silence_intervals(y, sr, top_db=silence_top_db, min_silence_sec=min_silence_sec)
-        silence_rate_30s = silence_count / max(duration_sec, 1e-6) * 30.0
-
-        # legacy WPM (호환)
-        avg_wpm = _compute_avg_wpm(stt_text, duration_sec)
-        max_wpm = _compute_max_wpm(stt_segments)
-
-        # CPS/CPM (한국어 친화)
-        avg_cps, avg_cpm, char_count = _compute_avg_cps_cpm(stt_text, duration_sec)
-
-        # 불안정(세그먼트 기반)
-        inst = _compute_instability_from_segments(stt_segments)
-
-        metrics: Dict[str, Any] = {
-            # compatibility
-            "avg_wpm": avg_wpm,
-            "max_wpm": max_wpm,
-            "silence_count": int(silence_rate_30s),
-            "duration_sec": duration_sec,
-            # "duration": duration_sec,  # AnalysisService 호환
-
-            # pitch core
-            "avg_pitch": pitch["avg_pitch"],
-            "max_pitch": pitch["max_pitch"],
-            "pitch_std": pitch["pitch_std"],
-            "voiced_ratio": pitch["voiced_ratio"],
-
-            # speed core
-            "char_count": char_count,
-            "avg_cps": avg_cps,
-            "avg_cpm": avg_cpm,
-
-            # instability core
-            "burst_ratio": inst["burst_ratio"],
-            "high_speed_share": inst["high_speed_share"],
-            "cv_cps": inst["cv_cps"],
-        }
-
-        return ok_result("voice", metrics=metrics, events=[])
+        # 프레임/에너지/발화 구간은 한 번만 계산해서 침묵 카운트와 pitch 가 같이 사용
+        features = VoiceFeatureFrame(y, sr)
+        pitch_skip_silence = resolve_skip_silence(pitch_skip_silence, pitch_backend)
+
+        pitch = _compute_pitch_stats_hz(
+            features,
+            backend=pitch_backend,
+            fmin_hz=fmin_hz,
+            fmax_hz=fmax_hz,
+            skip_silence_db=silence_top_db if pitch_skip_silence else None,
+            workers=pitch_workers,
+        )
+        acoustic = _acoustic_metrics(
+            features, pitch,
+            silence_top_db=silence_top_db,
+            min_silence_sec=min_silence_sec,
+            pitch_backend=pitch_backend,
+        )
+        return ok_result("voice", metrics=_voice_metrics(acoustic, stt_text, stt_segments), events=[])
 
     except Exception as e:
         return error_result("voice", error_type="VOICE_ERROR", message=str(e))
@@ -0,0 +1,186 @@
+"""
+답변 1개의 공용 음성 feature frame
+
+기존에는 침묵 검출(librosa.effects.split: RMS, hop 256)과 pitch(pyin: hop 512)가 각자 신호를 프레임으로 나누고 창을 씌웠음
+VoiceFeatureFrame 은 한 번만 프레임을 나누고(frame 2048 / hop 256, center) 아래 값을 연속 배열로 보관/공유
+
+- rms / energy_db: 프레임 에너지 (누적합으로 한 번에 계산, librosa.feature.rms 와 같은 값)
+- non_silent(top_db): 발화 구간 (librosa.effects.split 과 같은 규칙, top_db 별 캐시)
+- pitch 프레임: hop 512 격자 = hop 256 격자의 짝수 번째 프레임 (같은 view 를 건너뛰며 사용, 복사 없음)
+- magnitude: STFT 크기 (처음 쓸 때만 계산, 새 운율 지표용)
+
+새 지표는 이 객체에서 필요한 배열을 꺼내 쓰면 신호를 다시 읽거나 프레임을 다시 나누지 않아도 됨
+"""
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import librosa
+
+from app.engines.voice.pitch import (
+    default_range,
+    estimate_f0_spans,
+    frame_spans,
+    pitch_stats,
+    resolve_backend,
+)
+
+FEATURE_FRAME_LENGTH = 2048
+FEATURE_HOP_LENGTH = 256
+PITCH_HOP_LENGTH = 512
+# librosa.amplitude_to_db 기본 amin
+_AMIN = 1e-5
+
+
+class VoiceFeatureFrame:
+    def __init__(
+        self,
+        y: np.ndarray,
+        sr: int = 16000,
+        *,
+        frame_length: int = FEATURE_FRAME_LENGTH,
+        hop_length: int = FEATURE_HOP_LENGTH,
+        pitch_hop_length: int = PITCH_HOP_LENGTH,
+    ):
+        if pitch_hop_length % hop_length != 0:
+            raise ValueError("pitch_hop_length must be a multiple of hop_length")
+        self.y = np.ascontiguousarray(y, dtype=np.float32)
+        self.sr = int(sr)
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.pitch_hop_length = pitch_hop_length
+
+        pad = frame_length // 2
+        self.y_pad = np.pad(self.y, (pad, pad))
+        # (n_frames, frame_length) view - 프레임 단위 계산은 전부 이 view 를 공유
+        self.frames = librosa.util.frame(self.y_pad, frame_length=frame_length, hop_length=hop_length, axis=0)
+
+        self._non_silent: Dict[float, np.ndarray] = {}
+        self._f0: Dict[Tuple, np.ndarray] = {}
+
+    # ---------------------------------------------------------
+    # 기본 값
+    # ---------------------------------------------------------
+    @property
+    def n_samples(self) -> int:
+        return len(self.y)
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.frames)
+
+    @property
+    def duration_sec(self) -> float:
+        return float(self.n_samples / self.sr)
+
+    @cached_property
+    def rms(self) -> np.ndarray:
+        """프레임별 RMS (float32). 패딩 신호 제곱 누적합 차이로 계산 -> 프레임 수와 무관하게 O(n)"""
+        power = np.concatenate([[0.0], np.cumsum(np.square(self.y_pad, dtype=np.float64))])
+        starts = np.arange(self.n_frames) * self.hop_length
+        mean_sq = (power[starts + self.frame_length] - power[starts]) / self.frame_length
+        return np.sqrt(np.maximum(mean_sq, 0.0)).astype(np.float32)
+
+    @cached_property
+    def energy_db(self) -> np.ndarray:
+        """최대 RMS 기준 dB (0 = 가장 큰 프레임)"""
+        rms = np.maximum(_AMIN, self.rms.astype(np.float64))
+        ref = max(_AMIN, float(np.max(self.rms))) if self.n_frames else 1.0
+        return (20.0 * np.log10(rms) - 20.0 * np.log10(ref)).astype(np.float32)
+
+    @cached_property
+    def magnitude(self) -> np.ndarray:
+        """STFT 크기 (n_frames, frame_length // 2 + 1), hann 창. 처음 접근할 때만 계산"""
+        window = librosa.filters.get_window("hann", self.frame_length, fftbins=True).astype(np.float32)
+        out = np.empty((self.n_frames, self.frame_length // 2 + 1), dtype=np.float32)
+        block = 512
+        for start in range(0, self.n_frames, block):
+            chunk = self.frames[start:start + block] * window
+            out[start:start + len(chunk)] = np.abs(np.fft.rfft(chunk, axis=1))
+        return out
+
+    # ---------------------------------------------------------
+    # 침묵
+    # ---------------------------------------------------------
+    def non_silent(self, top_db: float) -> np.ndarray:
+        """발화 구간 [(start, end), ...] (샘플 단위) - librosa.effects.split(top_db, frame/hop 동일) 과 같은 규칙"""
+        key = float(top_db)
+        if key not in self._non_silent:
+            self._non_silent[key] = self._split(self.energy_db > -top_db)
+        return self._non_silent[key]
+
+    def _split(self, voiced: np.ndarray) -> np.ndarray:
+        if voiced.size == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        edges: List[np.ndarray] = [np.flatnonzero(np.diff(voiced.astype(np.int8))) + 1]
+        if voiced[0]:
+            edges.insert(0, np.array([0]))
+        if voiced[-1]:
+            edges.append(np.array([len(voiced)]))
+        samples = np.minimum(np.concatenate(edges) * self.hop_length, self.n_samples)
+        return samples.reshape((-1, 2)).astype(np.int64)
+
+    def silence_count(self, top_db: float, min_silence_sec: float = 0.25) -> int:
+        """min_silence_sec 이상 침묵 구간 수 (앞/뒤 침묵 포함)"""
+        min_len = min_silence_sec * self.sr
+        cur = 0
+        cnt = 0
+        for start, end in self.non_silent(top_db):
+            if start > cur and start - cur >= min_len:
+                cnt += 1
+            cur = max(cur, int(end))
+        if cur < self.n_samples and self.n_samples - cur >= min_len:
+            cnt += 1
+        return int(cnt)
+
+    # ---------------------------------------------------------
+    # pitch
+    # ---------------------------------------------------------
+    @property
+    def pitch_frames(self) -> np.ndarray:
+        """pitch 격자(hop = pitch_hop_length) 프레임 view: 같은 프레임 행렬을 건너뛰며 사용"""
+        return self.frames[:: self.pitch_hop_length // self.hop_length]
+
+    def f0(
+        self,
+        *,
+        backend: Optional[str] = None,
+        fmin_hz: Optional[float] = None,
+        fmax_hz: Optional[float] = None,
+        skip_silence_db: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        pitch 격자의 프레임별 F0 (무성 = NaN), 같은 인자면 캐시
+        - skip_silence_db: 주면 non_silent(skip_silence_db) 와 겹치는 프레임만 추정
+        """
+        name = resolve_backend(backend)
+        lo, hi = default_range(name)
+        fmin_hz = lo if fmin_hz is None else fmin_hz
+        fmax_hz = hi if fmax_hz is None else fmax_hz
+        key = (name, fmin_hz, fmax_hz, skip_silence_db)
+        if key not in self._f0:
+            n_pitch = len(self.pitch_frames)
+            if skip_silence_db is None:
+                spans = [(0, n_pitch)]
+            else:
+                spans = frame_spans(
+                    self.non_silent(skip_silence_db), self.n_samples,
+                    frame_length=self.frame_length, hop_length=self.pitch_hop_length,
+                )
+            self._f0[key] = estimate_f0_spans(
+                self.y, self.sr, spans,
+                backend=name,
+                fmin_hz=fmin_hz,
+                fmax_hz=fmax_hz,
+                frame_length=self.frame_length,
+                hop_length=self.pitch_hop_length,
+                frames=self.pitch_frames,
+                y_pad=self.y_pad,
+            )
+        return self._f0[key]
+
+    def pitch_stats(self, **kwargs) -> Dict[str, Optional[float]]:
+        """avg_pitch, max_pitch, pitch_std, voiced_ratio (voiced_ratio 분모 = 전체 pitch 프레임 수)"""
+        return pitch_stats(self.f0(**kwargs))
@@ -0,0 +1,238 @@
+"""
+긴 답변용 청크 병렬 pitch 분석
+
+- 부모: VoiceFeatureFrame 으로 에너지 / 발화 구간을 계산 (누적합 한 번이라 가벼움)
+        -> F0 프레임 범위를 침묵 지점에서 끊어 워커 수만큼 청크로 묶음
+- 워커: 패딩 신호를 공유 메모리에서 복사 없이 붙여 자기 청크의 F0 만 추정하고 PitchMoments(개수/평균/편차 제곱합/최댓값)만 반환
+        (오디오 배열도 F0 배열도 pickle 하지 않음)
+- 부모: PitchMoments 를 Chan 병합식으로 합침 -> 순차 실행과 같은 avg/max/std/voiced_ratio (부동소수 반올림 오차 수준)
+
+순차 실행과 결과가 같은 경우에만 병렬로 실행
+- yin: 프레임끼리 독립이라 어디서 끊어도 같음
+- pyin: 침묵 건너뛰기가 켜져 있으면 순차 실행도 발화 구간마다 따로 호출하므로 구간 단위로 나누면 같음
+        (건너뛰기가 꺼진 pyin 은 전체 신호 Viterbi 라 나눌 수 없음 -> 순차 실행)
+"""
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import librosa
+
+from app.core.concurrency import inner_pool_workers
+from app.core.config import settings
+from app.engines.voice.features import VoiceFeatureFrame
+from app.engines.voice.pitch import (
+    PitchMoments,
+    default_range,
+    estimate_f0_spans,
+    frame_spans,
+    resolve_backend,
+)
+
+Span = Tuple[int, int]
+
+
+def plan_chunks(spans: Sequence[Span], chunks: int, *, splittable: bool) -> List[List[Span]]:
+    """
+    F0 프레임 범위들을 프레임 수가 비슷한 chunks 개 이하 묶음으로 나눔
+    - splittable=False (pyin): 범위 하나는 쪼개지 않고 범위 사이(침묵)에서만 끊음
+    - splittable=True (yin): 긴 범위도 목표 크기로 잘라서 배분
+    """
+    spans = [(int(j0), int(j1)) for j0, j1 in spans if j1 > j0]
+    if not spans:
+        return []
+    total = sum(j1 - j0 for j0, j1 in spans)
+    target = max(1, math.ceil(total / max(1, chunks)))
+
+    if splittable:
+        pieces: List[Span] = []
+        for j0, j1 in spans:
+            for s in range(j0, j1, target):
+                pieces.append((s, min(j1, s + target)))
+        spans = pieces
+
+    groups: List[List[Span]] = []
+    cur: List[Span] = []
+    size = 0
+    for j0, j1 in spans:
+        if cur and size + (j1 - j0) > target and len(groups) < chunks - 1:
+            groups.append(cur)
+            cur, size = [], 0
+        cur.append((j0, j1))
+        size += j1 - j0
+    if cur:
+        groups.append(cur)
+    return groups
+
+
+# =========================================================
+# 워커 프로세스 쪽 함수 (spawn 된 프로세스에서 실행, pickle 가능하도록 최상위 함수)
+# =========================================================
+def _f0_chunk(
+    shm_name: str,
+    pad_len: int,
+    sr: int,
+    spans: List[Span],
+    backend: str,
+    fmin_hz: float,
+    fmax_hz: float,
+    frame_length: int,
+    hop_length: int,
+) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    # spawn 워커는 부모와 같은 resource tracker 를 쓰므로 붙기만 하고 unlink 는 부모가 함
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        y_pad = np.ndarray((pad_len,), dtype=np.float32, buffer=shm.buf)
+        pad = frame_length // 2
+        y = y_pad[pad:pad_len - pad]
+        frames = librosa.util.frame(y_pad, frame_length=frame_length, hop_length=hop_length, axis=0)
+        f0 = estimate_f0_spans(
+            y, sr, spans,
+            backend=backend,
+            fmin_hz=fmin_hz,
+            fmax_hz=fmax_hz,
+            frame_length=frame_length,
+            hop_length=hop_length,
+            frames=frames,
+            y_pad=y_pad,
+        )
+        idx = np.concatenate([np.arange(j0, j1) for j0, j1 in spans])
+        moments = PitchMoments.from_f0(f0[idx], frames=0)
+        del y_pad, y, frames
+    finally:
+        shm.close()
+    return {
+        "moments": moments,
+        "frames": int(len(idx)),
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
+    }
+
+
+# =========================================================
+# 부모 프로세스: 워커 풀 (librosa / numba 초기화를 재사용하도록 유지)
+# =========================================================
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # fork 는 Whisper / DB 풀 스레드까지 복제하므로 spawn 사용
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+
+
+def chunk_count(duration_sec: float, workers: int, *, min_chunk_sec: Optional[float] = None) -> int:
+    """청크 하나가 min_chunk_sec 보다 짧아지지 않는 선에서 workers 개 이하"""
+    if min_chunk_sec is None:
+        min_chunk_sec = settings.VOICE_PARALLEL_MIN_CHUNK_SEC
+    return max(1, min(int(workers), int(duration_sec // max(min_chunk_sec, 1e-3))))
+
+
+def should_run_parallel(
+    duration_sec: float,
+    *,
+    backend: Optional[str] = None,
+    skip_silence: bool = True,
+    workers: Optional[int] = None,
+) -> bool:
+    """
+    워커가 2개 이상이고, 청크 2개 이상으로 나뉠 만큼 길고, 나눠도 순차 결과와 같은 설정인지
+    (워커 수는 CPU 예산으로 제한, 세션 워커 프로세스 안에서는 항상 순차)
+    """
+    workers = inner_pool_workers(settings.VOICE_PARALLEL_WORKERS if workers is None else workers)
+    if workers <= 1 or chunk_count(duration_sec, workers) <= 1:
+        return False
+    return resolve_backend(backend) == "yin" or skip_silence
+
+
+def parallel_pitch_stats(
+    features: VoiceFeatureFrame,
+    *,
+    backend: Optional[str] = None,
+    fmin_hz: Optional[float] = None,
+    fmax_hz: Optional[float] = None,
+    skip_silence_db: Optional[float] = None,
+    workers: Optional[int] = None,
+    chunks: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    VoiceFeatureFrame.pitch_stats 와 같은 결과를 청크 병렬로 계산
+    - chunks: 청크 수 직접 지정 (비교 스크립트용, 기본은 chunk_count)
+    반환: pitch_stats 키 + "parallel" (청크 수 / 청크별 시간)
+    """
+    workers = inner_pool_workers(settings.VOICE_PARALLEL_WORKERS if workers is None else workers)
+    name = resolve_backend(backend)
+    lo, hi = default_range(name)
+    fmin_hz = lo if fmin_hz is None else fmin_hz
+    fmax_hz = hi if fmax_hz is None else fmax_hz
+
+    n_pitch = len(features.pitch_frames)
+    if skip_silence_db is None:
+        spans: List[Span] = [(0, n_pitch)]
+    else:
+        spans = frame_spans(
+            features.non_silent(skip_silence_db), features.n_samples,
+            frame_length=features.frame_length, hop_length=features.pitch_hop_length,
+        )
+    if chunks is None:
+        chunks = chunk_count(features.duration_sec, workers)
+    groups = plan_chunks(spans, chunks, splittable=name == "yin")
+
+    total = PitchMoments(frames=n_pitch)
+    parts: List[Dict[str, Any]] = []
+    if groups:
+        y_pad = features.y_pad
+        shm = shared_memory.SharedMemory(create=True, size=y_pad.nbytes)
+        try:
+            np.ndarray(y_pad.shape, dtype=np.float32, buffer=shm.buf)[:] = y_pad
+            executor = _get_executor(max(1, int(workers)))
+            try:
+                futures = [
+                    executor.submit(
+                        _f0_chunk, shm.name, len(y_pad), features.sr, group, name, fmin_hz, fmax_hz,
+                        features.frame_length, features.pitch_hop_length,
+                    )
+                    for group in groups
+                ]
+                parts = [f.result() for f in futures]
+            except BrokenProcessPool:
+                # 워커 프로세스가 죽으면 다음 호출에서 풀을 새로 만듦
+                _reset_executor()
+                raise
+        finally:
+            shm.close()
+            shm.unlink()
+
+    for part in parts:
+        total = total.merge(part["moments"])
+
+    out: Dict[str, Any] = total.stats()
+    out["parallel"] = {
+        "chunks": len(groups),
+        "workers": int(workers),
+        "frames": [p["frames"] for p in parts],
+        "chunk_elapsed_sec": [p["elapsed_sec"] for p in parts],
+    }
+    return out
@@ -0,0 +1,346 @@
+"""
+Voice 엔진 F0(pitch) 추정 백엔드
+
+- "pyin": librosa.pyin (확률 YIN + Viterbi). 기존 기본값이지만 run_voice 에서 가장 느린 단계
+- "yin":  벡터화 YIN. 프레임별 차이 함수를 FFT 로 한 번에 계산하고 말소리 F0 범위(65~500Hz)만 탐색
+          프레임끼리 독립이라 Viterbi 가 없고, 긴 답변에서도 수십 배 빠름
+
+두 백엔드 모두 librosa 와 같은 프레임 격자(center=True, frame_length, hop_length)에서
+F0 배열(무성 프레임은 NaN)을 반환하므로 통계(avg/max/std/voiced_ratio)는 같은 함수로 계산
+백엔드 간 차이는 scripts/bench_voice_pitch.py 로 측정 (scripts/VOICE_PITCH_BENCHMARK.md)
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import librosa
+from scipy import fft as sp_fft
+
+from app.core.config import settings
+
+PITCH_BACKENDS = ("pyin", "yin")
+
+# 백엔드별 기본 탐색 범위 (Hz)
+# - pyin: 기존 값 유지 (C2 ~ C7)
+# - yin: 말소리 F0 범위 (남성 저음 ~ 여성 고음/강조 구간)
+PYIN_FMIN_HZ, PYIN_FMAX_HZ = 65.0, 2093.0
+SPEECH_FMIN_HZ, SPEECH_FMAX_HZ = 65.0, 500.0
+
+# YIN 누적 평균 정규화 차이(cmnd) 임계값: 이보다 낮은 골이 없으면 무성 프레임
+YIN_THRESHOLD = 0.2
+# 한 번에 FFT 하는 프레임 수 (메모리 상한: block x frame_length)
+YIN_BLOCK_FRAMES = 512
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    name = (backend or settings.VOICE_PITCH_BACKEND or "pyin").lower()
+    if name not in PITCH_BACKENDS:
+        raise ValueError(f"unknown pitch backend: {name} (choose from {', '.join(PITCH_BACKENDS)})")
+    return name
+
+
+def resolve_skip_silence(skip: Optional[bool] = None, backend: Optional[str] = None) -> bool:
+    """
+    침묵 구간 F0 건너뛰기 여부 (None 이면 settings.VOICE_PITCH_SKIP_SILENCE, 그것도 None 이면 yin 에서만 켬)
+    - yin: 프레임끼리 독립이라 발화 구간 안의 값은 그대로 (공개 음성 18개에서 voiced_ratio 최대 0.009 차이)
+    - pyin: 구간마다 Viterbi 가 끊기고 잡음 유성 프레임이 빠져 voiced_ratio / avg_pitch 가 바뀜 (최대 0.26 / 12Hz)
+    """
+    if skip is None:
+        skip = settings.VOICE_PITCH_SKIP_SILENCE
+    if skip is None:
+        return resolve_backend(backend) == "yin"
+    return bool(skip)
+
+
+def default_range(backend: str) -> Tuple[float, float]:
+    return (PYIN_FMIN_HZ, PYIN_FMAX_HZ) if backend == "pyin" else (SPEECH_FMIN_HZ, SPEECH_FMAX_HZ)
+
+
+def estimate_f0(
+    y: np.ndarray,
+    sr: int,
+    *,
+    backend: Optional[str] = None,
+    fmin_hz: Optional[float] = None,
+    fmax_hz: Optional[float] = None,
+    frame_length: int = 2048,
+    hop_length: int = 512,
+) -> np.ndarray:
+    """전체 신호의 프레임별 F0 (Hz, 무성 = NaN). 길이 = 1 + len(y) // hop_length"""
+    name = resolve_backend(backend)
+    lo, hi = default_range(name)
+    fmin_hz = lo if fmin_hz is None else fmin_hz
+    fmax_hz = hi if fmax_hz is None else fmax_hz
+
+    if name == "pyin":
+        f0, _, _ = librosa.pyin(
+            y=y,
+            fmin=fmin_hz,
+            fmax=fmax_hz,
+            sr=sr,
+            frame_length=frame_length,
+            hop_length=hop_length,
+        )
+        return f0
+    return yin_f0(y, sr, fmin_hz=fmin_hz, fmax_hz=fmax_hz, frame_length=frame_length, hop_length=hop_length)
+
+
+def frame_spans(
+    intervals,
+    n_samples: int,
+    *,
+    frame_length: int = 2048,
+    hop_length: int = 512,
+    merge_gap_frames: int = 4,
+) -> List[Tuple[int, int]]:
+    """
+    샘플 구간 [(start, end), ...] -> 창이 구간과 겹치는 F0 프레임 범위 [(j0, j1), ...] (j1 미포함)
+    - 가까운 범위(merge_gap_frames 이하 간격)는 합쳐서 pyin 호출 수를 줄임
+    """
+    n_frames = 1 + n_samples // hop_length
+    half = frame_length // 2
+    spans: List[Tuple[int, int]] = []
+    for start, end in intervals:
+        j0 = max(0, (int(start) - half) // hop_length)
+        j1 = min(n_frames, (int(end) + half) // hop_length + 1)
+        if j1 <= j0:
+            continue
+        if spans and j0 - spans[-1][1] <= merge_gap_frames:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], j1))
+        else:
+            spans.append((j0, j1))
+    return spans
+
+
+def estimate_f0_spans(
+    y: np.ndarray,
+    sr: int,
+    spans: List[Tuple[int, int]],
+    *,
+    backend: Optional[str] = None,
+    fmin_hz: Optional[float] = None,
+    fmax_hz: Optional[float] = None,
+    frame_length: int = 2048,
+    hop_length: int = 512,
+    frames: Optional[np.ndarray] = None,
+    y_pad: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    지정한 프레임 범위에서만 F0 추정 -> 전체 신호 길이의 F0 배열 (범위 밖은 NaN = 무성)
+    - 프레임 번호/창 위치는 estimate_f0 와 같음 (범위 안 프레임은 실제 앞뒤 샘플을 그대로 봄)
+    - yin: 범위 안 프레임만 모아서 한 번에 계산 (프레임 독립이라 전체 계산과 값이 같음)
+    - pyin: 범위마다 center=False 로 호출 (Viterbi 평활이 범위 단위로 끊기는 것만 다름)
+    - frames / y_pad: 이미 나눠 둔 프레임 view / 패딩 신호가 있으면 재사용 (VoiceFeatureFrame)
+    """
+    name = resolve_backend(backend)
+    lo, hi = default_range(name)
+    fmin_hz = lo if fmin_hz is None else fmin_hz
+    fmax_hz = hi if fmax_hz is None else fmax_hz
+
+    f0 = np.full(1 + len(y) // hop_length, np.nan, dtype=np.float64)
+    if not spans:
+        return f0
+
+    if name == "yin":
+        if frames is None:
+            frames = frame_signal(y, frame_length, hop_length)
+        idx = np.concatenate([np.arange(j0, j1) for j0, j1 in spans])
+        f0[idx] = yin_frames(frames[idx], sr, fmin_hz=fmin_hz, fmax_hz=fmax_hz)
+        return f0
+
+    # center=True 와 같은 패딩 신호에서 범위에 해당하는 구간을 그대로 넘김
+    if y_pad is None:
+        pad = frame_length // 2
+        y_pad = np.pad(np.asarray(y, dtype=np.float32), (pad, pad))
+    for j0, j1 in spans:
+        seg = y_pad[j0 * hop_length:(j1 - 1) * hop_length + frame_length]
+        part, _, _ = librosa.pyin(
+            y=seg,
+            fmin=fmin_hz,
+            fmax=fmax_hz,
+            sr=sr,
+            frame_length=frame_length,
+            hop_length=hop_length,
+            center=False,
+        )
+        f0[j0:j0 + len(part)] = part
+    return f0
+
+
+# -------------------------
+# vectorized YIN
+# -------------------------
+def frame_signal(y: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """librosa center=True(constant pad) 와 같은 프레임 격자 -> (n_frames, frame_length) view (복사 없음)"""
+    pad = frame_length // 2
+    y_pad = np.pad(np.asarray(y, dtype=np.float32), (pad, pad))
+    return librosa.util.frame(y_pad, frame_length=frame_length, hop_length=hop_length, axis=0)
+
+
+def yin_f0(
+    y: np.ndarray,
+    sr: int,
+    *,
+    fmin_hz: float = SPEECH_FMIN_HZ,
+    fmax_hz: float = SPEECH_FMAX_HZ,
+    frame_length: int = 2048,
+    hop_length: int = 512,
+    threshold: float = YIN_THRESHOLD,
+) -> np.ndarray:
+    frames = frame_signal(y, frame_length, hop_length)
+    return yin_frames(frames, sr, fmin_hz=fmin_hz, fmax_hz=fmax_hz, threshold=threshold)
+
+
+def yin_frames(
+    frames: np.ndarray,
+    sr: int,
+    *,
+    fmin_hz: float = SPEECH_FMIN_HZ,
+    fmax_hz: float = SPEECH_FMAX_HZ,
+    threshold: float = YIN_THRESHOLD,
+) -> np.ndarray:
+    """
+    (n_frames, frame_length) 프레임 행렬 -> 프레임별 F0 (무성 = NaN)
+    - 적분 구간 W = frame_length // 2, lag 는 [sr/fmax, sr/fmin] 만 탐색
+    - 프레임끼리 독립: 임의의 프레임 부분집합만 넘겨도 결과가 같음 (무음 건너뛰기/청크 병렬에서 사용)
+    """
+    n, length = frames.shape
+    out = np.full(n, np.nan, dtype=np.float64)
+    if n == 0:
+        return out
+
+    win = length // 2
+    min_lag = max(2, int(math.floor(sr / fmax_hz)))
+    max_lag = min(length - win, int(math.ceil(sr / fmin_hz)))
+    if max_lag <= min_lag + 1:
+        raise ValueError(f"frame_length {length} is too short for fmin {fmin_hz}Hz at {sr}Hz")
+
+    for start in range(0, n, YIN_BLOCK_FRAMES):
+        block = np.ascontiguousarray(frames[start:start + YIN_BLOCK_FRAMES], dtype=np.float32)
+        out[start:start + len(block)] = _yin_block(block, sr, win, min_lag, max_lag, threshold)
+    return out
+
+
+def _yin_block(x: np.ndarray, sr: int, win: int, min_lag: int, max_lag: int, threshold: float) -> np.ndarray:
+    n, length = x.shape
+    lags = np.arange(max_lag + 1)
+
+    # r[tau] = sum_{j<W} x[j] * x[j+tau]  (j+tau < length 이므로 길이 length FFT 로도 순환이 섞이지 않음)
+    spec_w = sp_fft.rfft(x[:, :win], n=length, axis=1)
+    spec_x = sp_fft.rfft(x, n=length, axis=1)
+    r = sp_fft.irfft(np.conj(spec_w) * spec_x, n=length, axis=1)[:, :max_lag + 1].astype(np.float64)
+
+    # 차이 함수 d[tau] = E(x[0:W]) + E(x[tau:tau+W]) - 2 r[tau]
+    power = np.cumsum(np.square(x, dtype=np.float64), axis=1)
+    power = np.concatenate([np.zeros((n, 1)), power], axis=1)
+    energy = power[:, lags + win] - power[:, lags]
+    diff = energy[:, :1] + energy - 2.0 * r
+    np.maximum(diff, 0.0, out=diff)
+
+    # 누적 평균 정규화 (cmnd[0] = 1)
+    cum = np.cumsum(diff[:, 1:], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cmnd = diff[:, 1:] * lags[1:] / cum
+    cmnd = np.concatenate([np.ones((n, 1)), cmnd], axis=1)
+    cmnd[~np.isfinite(cmnd)] = 1.0   # 디지털 무음 (d 가 전부 0)
+
+    # 탐색 구간에서 임계값 아래 첫 골(local minimum)
+    seg = cmnd[:, min_lag:max_lag + 1]
+    below = seg < threshold
+    trough = np.ones_like(below)
+    trough[:, :-1] = seg[:, :-1] <= seg[:, 1:]
+    cand = below & trough
+    voiced = cand.any(axis=1)
+    tau = np.argmax(cand, axis=1) + min_lag
+
+    # 포물선 보간으로 lag 소수점 보정
+    rows = np.arange(n)
+    left = cmnd[rows, tau - 1]
+    mid = cmnd[rows, tau]
+    right = cmnd[rows, np.minimum(tau + 1, max_lag)]
+    denom = left - 2.0 * mid + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / denom, 0.0)
+    shift = np.clip(shift, -1.0, 1.0)
+
+    f0 = sr / (tau + shift)
+    f0[~voiced] = np.nan
+    return f0
+
+
+# -------------------------
+# stats
+# -------------------------
+@dataclass
+class PitchMoments:
+    """
+    유성 F0 의 누적 통계 (개수 / 평균 / 편차 제곱합 / 최댓값)
+    - 청크별 값을 merge 하면 전체 배열로 한 번에 계산한 것과 같은 평균/표준편차 (Chan 병합식)
+    - frames: voiced_ratio 분모 (무성 포함 전체 프레임 수)
+    """
+    frames: int = 0
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    max: float = -math.inf
+
+    @classmethod
+    def from_f0(cls, f0: np.ndarray, frames: Optional[int] = None) -> "PitchMoments":
+        voiced = f0[~np.isnan(f0)]
+        out = cls(frames=len(f0) if frames is None else int(frames))
+        if voiced.size:
+            out.count = int(voiced.size)
+            out.mean = float(np.mean(voiced))
+            out.m2 = float(np.sum(np.square(voiced - out.mean)))
+            out.max = float(np.max(voiced))
+        return out
+
+    def merge(self, other: "PitchMoments") -> "PitchMoments":
+        if other.count == 0:
+            return PitchMoments(self.frames + other.frames, self.count, self.mean, self.m2, self.max)
+        if self.count == 0:
+            return PitchMoments(self.frames + other.frames, other.count, other.mean, other.m2, other.max)
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        return PitchMoments(
+            frames=self.frames + other.frames,
+            count=n,
+            mean=self.mean + delta * other.count / n,
+            m2=self.m2 + other.m2 + delta * delta * self.count * other.count / n,
+            max=max(self.max, other.max),
+        )
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """pitch_stats 와 같은 키/의미"""
+        if self.count == 0 or self.frames == 0:
+            return {"avg_pitch": None, "max_pitch": None, "pitch_std": None, "voiced_ratio": 0.0}
+        return {
+            "avg_pitch": float(self.mean),
+            "max_pitch": float(self.max),
+            "pitch_std": float(math.sqrt(max(self.m2, 0.0) / self.count)),
+            "voiced_ratio": float(self.count / float(self.frames)),
+        }
+
+
+def pitch_stats(f0: Optional[np.ndarray], total_frames: Optional[int] = None) -> Dict[str, Optional[float]]:
+    """
+    F0 배열 -> avg_pitch, max_pitch, pitch_std, voiced_ratio
+    - total_frames: voiced_ratio 분모 (기본: len(f0))
+    """
+    if f0 is None or len(f0) == 0:
+        return {"avg_pitch": None, "max_pitch": None, "pitch_std": None, "voiced_ratio": 0.0}
+
+    voiced = f0[~np.isnan(f0)]
+    if voiced.size == 0:
+        return {"avg_pitch": None, "max_pitch": None, "pitch_std": None, "voiced_ratio": 0.0}
+
+    total = len(f0) if total_frames is None else total_frames
+    return {
+        "avg_pitch": float(np.mean(voiced)),
+        "max_pitch": float(np.max(voiced)),
+        "pitch_std": float(np.std(voiced)),
+        "voiced_ratio": float(voiced.size / float(total)),
+    }
@@ -0,0 +1,240 @@
+"""
+녹화 중 실시간 Voice 지표 누적 (WebRTC 오디오 프로세서에서 사용)
+
+- push(): 16kHz mono PCM 청크를 이어 붙이면서, 창이 다 찬 프레임만 바로 처리
+  - 침묵: hop 256 프레임 RMS 를 누적 (스냅샷은 지금까지의 최대 RMS 기준)
+  - pitch: hop 512 프레임 F0 를 yin 으로 바로 추정하고 유성 F0 누적 통계(PitchMoments)를 갱신
+- finalize(): 남은 꼬리 프레임만 처리하고 run_voice 와 같은 v0 결과를 반환
+  - 침묵 구간은 최종 최대 RMS 가 정해진 뒤에 결정되므로, 저장해 둔 신호로 VoiceFeatureFrame 을 한 번 만듦 (누적합 한 번)
+  - 침묵 건너뛰기가 켜져 있으면 녹화 중 구한 F0 중 발화 구간 밖 프레임만 무성 처리 -> run_voice(yin) 와 같은 값
+  - pyin 백엔드는 Viterbi 때문에 나눠 계산할 수 없어 녹화 중 F0 는 스냅샷용으로만 쓰고 finalize 에서 pyin 을 실행
+
+STT 결과가 없는 시점이라 속도(CPS/WPM) 지표는 비어 있음
+업로드 후 분석에서 acoustic(ACOUSTIC_KEYS) 만 run_voice(acoustic=...) 로 넘기면 STT 기반 지표만 계산함
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.engines.common.result import ok_result, error_result
+from app.engines.voice.engine import ACOUSTIC_KEYS, _acoustic_metrics, _voice_metrics
+from app.engines.voice.features import (
+    FEATURE_FRAME_LENGTH,
+    FEATURE_HOP_LENGTH,
+    PITCH_HOP_LENGTH,
+    VoiceFeatureFrame,
+)
+from app.engines.voice.pitch import (
+    PitchMoments,
+    SPEECH_FMAX_HZ,
+    SPEECH_FMIN_HZ,
+    frame_spans,
+    pitch_stats,
+    resolve_backend,
+    resolve_skip_silence,
+    yin_frames,
+)
+
+SAMPLE_RATE = 16000
+# F0 를 한 번에 계산할 최소 프레임 수 (너무 자주 FFT 를 부르지 않도록)
+_PITCH_BATCH_FRAMES = 16
+
+
+class VoiceAccumulator:
+    def __init__(
+        self,
+        *,
+        backend: Optional[str] = None,
+        skip_silence: Optional[bool] = None,
+        silence_top_db: int = 35,
+        min_silence_sec: float = 0.25,
+        initial_sec: float = 60.0,
+    ):
+        self.backend = resolve_backend(backend)
+        self.skip_silence = resolve_skip_silence(skip_silence, self.backend)
+        self.silence_top_db = silence_top_db
+        self.min_silence_sec = min_silence_sec
+
+        self._pad = FEATURE_FRAME_LENGTH // 2
+        # center=True 와 같은 격자: 앞쪽 패딩(0) 뒤에 샘플을 이어 붙임
+        self._buf = np.zeros(self._pad + int(initial_sec * SAMPLE_RATE), dtype=np.float32)
+        self._n = 0                     # 받은 샘플 수
+        self._power = [0.0]             # 패딩 신호 제곱 누적합 (hop 단위로만 보관)
+        self._rms: List[float] = []
+        self._f0 = np.full(64, np.nan)  # pitch 프레임별 F0 (yin)
+        self._f0_done = 0
+        self.moments = PitchMoments()   # 녹화 중 누적 (침묵 구분 없이 계산된 프레임 전체)
+
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # ---------------------------------------------------------
+    # 입력
+    # ---------------------------------------------------------
+    def push(self, pcm: np.ndarray) -> None:
+        """16kHz mono PCM 청크 (float32 [-1, 1] 또는 int16)"""
+        if self._closed:
+            return
+        chunk = np.asarray(pcm)
+        if chunk.dtype == np.int16:
+            chunk = chunk.astype(np.float32) / 32768.0
+        chunk = chunk.astype(np.float32, copy=False).reshape(-1)
+        if chunk.size == 0:
+            return
+        with self._lock:
+            self._append(chunk)
+            self._advance_rms()
+            self._advance_pitch(final=False)
+
+    def _append(self, chunk: np.ndarray) -> None:
+        end = self._pad + self._n + chunk.size
+        if end > self._buf.size:
+            grown = np.zeros(max(end, self._buf.size * 2), dtype=np.float32)
+            grown[:self._pad + self._n] = self._buf[:self._pad + self._n]
+            self._buf = grown
+        self._buf[self._pad + self._n:end] = chunk
+        self._n += chunk.size
+
+    def _advance_rms(self) -> None:
+        """창(2048)이 다 찬 hop 256 프레임의 RMS (스냅샷 전용)"""
+        hop, length = FEATURE_HOP_LENGTH, FEATURE_FRAME_LENGTH
+        avail = self._pad + self._n
+        while len(self._power) * hop <= avail:
+            k = len(self._power) - 1
+            seg = self._buf[k * hop:(k + 1) * hop].astype(np.float64)
+            self._power.append(self._power[-1] + float(np.dot(seg, seg)))
+        steps = length // hop
+        while len(self._rms) + steps < len(self._power):
+            k = len(self._rms)
+            self._rms.append(float(np.sqrt(max(self._power[k + steps] - self._power[k], 0.0) / length)))
+
+    def _advance_pitch(self, *, final: bool) -> None:
+        """창이 다 찬 hop 512 프레임의 F0 (final 이면 꼬리 프레임까지, 뒤쪽은 0 패딩)"""
+        hop, length = PITCH_HOP_LENGTH, FEATURE_FRAME_LENGTH
+        if final:
+            total = 1 + self._n // hop
+            end_sample = (total - 1) * hop + length
+            if end_sample > self._buf.size:
+                self._buf = np.concatenate([self._buf, np.zeros(end_sample - self._buf.size, dtype=np.float32)])
+            self._buf[self._pad + self._n:end_sample] = 0.0
+        else:
+            avail = self._pad + self._n
+            total = max(0, (avail - length) // hop + 1)
+            if total - self._f0_done < _PITCH_BATCH_FRAMES:
+                return
+        if total <= self._f0_done:
+            return
+
+        j0 = self._f0_done
+        seg = self._buf[j0 * hop:(total - 1) * hop + length]
+        frames = np.lib.stride_tricks.sliding_window_view(seg, length)[::hop]
+        f0 = yin_frames(frames, SAMPLE_RATE, fmin_hz=SPEECH_FMIN_HZ, fmax_hz=SPEECH_FMAX_HZ)
+        if total > self._f0.size:
+            self._f0 = np.concatenate([self._f0, np.full(max(total, self._f0.size * 2) - self._f0.size, np.nan)])
+        self._f0[j0:total] = f0
+        self._f0_done = total
+        self.moments = self.moments.merge(PitchMoments.from_f0(f0))
+
+    # ---------------------------------------------------------
+    # 조회 / 종료
+    # ---------------------------------------------------------
+    @property
+    def duration_sec(self) -> float:
+        return self._n / float(SAMPLE_RATE)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """녹화 중 누적 상태 (UI 표시용, 최종 값과는 침묵 기준 RMS 가 다를 수 있음)"""
+        with self._lock:
+            rms = np.asarray(self._rms, dtype=np.float64)
+            silence_count = 0
+            if rms.size:
+                ref = max(1e-5, float(rms.max()))
+                voiced = 20.0 * np.log10(np.maximum(rms, 1e-5) / ref) > -self.silence_top_db
+                silence_count = _count_runs(~voiced, int(self.min_silence_sec * SAMPLE_RATE / FEATURE_HOP_LENGTH))
+            stats = self.moments.stats()
+            return {
+                "elapsed_sec": round(self.duration_sec, 1),
+                "avg_pitch": stats["avg_pitch"],
+                "pitch_std": stats["pitch_std"],
+                "voiced_ratio": stats["voiced_ratio"],
+                "silence_count": silence_count,
+            }
+
+    def finalize(
+        self,
+        stt_text: Optional[str] = None,
+        stt_segments: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """녹화 종료: run_voice 와 같은 v0 결과 (STT 를 안 넘기면 속도 지표는 None)"""
+        try:
+            with self._lock:
+                self._closed = True
+                if self._n == 0:
+                    raise ValueError("audio is empty or could not be loaded")
+                if self.backend == "yin":
+                    self._advance_pitch(final=True)
+                y = self._buf[self._pad:self._pad + self._n]
+
+            features = VoiceFeatureFrame(y, SAMPLE_RATE)
+            if self.backend == "yin":
+                f0 = self._f0[:self._f0_done].copy()
+                if self.skip_silence:
+                    keep = np.zeros(f0.size, dtype=bool)
+                    for j0, j1 in frame_spans(features.non_silent(self.silence_top_db), features.n_samples):
+                        keep[j0:j1] = True
+                    f0[~keep] = np.nan
+                pitch = pitch_stats(f0)
+            else:
+                pitch = features.pitch_stats(
+                    backend=self.backend,
+                    skip_silence_db=self.silence_top_db if self.skip_silence else None,
+                )
+            acoustic = _acoustic_metrics(
+                features, pitch,
+                silence_top_db=self.silence_top_db,
+                min_silence_sec=self.min_silence_sec,
+                pitch_backend=self.backend,
+            )
+            return ok_result("voice", metrics=_voice_metrics(acoustic, stt_text, stt_segments), events=[])
+        except Exception as e:
+            return error_result("voice", error_type="VOICE_ERROR", message=str(e))
+
+
+def acoustic_from_result(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """finalize() 결과 -> run_voice(acoustic=...) 에 넘길 오디오 지표 (형식이 안 맞으면 None)"""
+    if not isinstance(result, dict) or result.get("module") != "voice" or result.get("error"):
+        return None
+    metrics = result.get("metrics")
+    if not isinstance(metrics, dict) or any(k not in metrics for k in ACOUSTIC_KEYS):
+        return None
+    if not isinstance(metrics["duration_sec"], (int, float)) or metrics["duration_sec"] <= 0:
+        return None
+    return {k: metrics[k] for k in ACOUSTIC_KEYS}
+
+
+def live_duration_matches(acoustic: Dict[str, Any], duration_sec: Optional[float]) -> bool:
+    """
+    실시간 지표의 duration_sec 가 서버에서 잰 길이와 허용 범위 안인지 (다른 녹음의 지표 / 조작된 값 방지)
+    서버 길이를 모르면 확인할 수 없으므로 False
+    """
+    if duration_sec is None or duration_sec <= 0:
+        return False
+    tolerance = max(
+        settings.VOICE_LIVE_DURATION_TOLERANCE_SEC,
+        duration_sec * settings.VOICE_LIVE_DURATION_TOLERANCE_RATIO,
+    )
+    return abs(float(acoustic["duration_sec"]) - duration_sec) <= tolerance
+
+
+def _count_runs(mask: np.ndarray, min_len: int) -> int:
+    """True 가 min_len 이상 이어진 구간 수"""
+    if not mask.any():
+        return 0
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    lengths = edges[1::2] - edges[::2]
+    return int(np.count_nonzero(lengths >= max(1, min_len)))
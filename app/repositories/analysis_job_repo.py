@@ -0,0 +1,173 @@
+from typing import Optional
+from psycopg2.extras import RealDictCursor
+
+JOB_KIND_ANSWER = "ANSWER"
+JOB_KIND_SESSION_REPORT = "SESSION_REPORT"
+
+
+class AnalysisJobRepository:
+
+    def enqueue_answer(self, conn, session_id: int, answer_id: int, max_attempts: int = 3):
+        """
+        답변 분석 작업 등록
+        - 같은 답변에 대해 QUEUED/RUNNING 작업이 이미 있으면 아무것도 하지 않고 None 반환
+        """
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                INSERT INTO analysis_jobs (kind, session_id, answer_id, max_attempts)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+                RETURNING *
+                """,
+                (JOB_KIND_ANSWER, session_id, answer_id, max_attempts)
+            )
+            return cur.fetchone()
+
+    def enqueue_session_report(self, conn, session_id: int, max_attempts: int = 3):
+        """
+        세션 종합 리포트 작업 등록
+        - QUEUED/RUNNING/DONE 작업이 이미 있으면 None (006 migration 의 unique index, 리포트는 세션당 한 번)
+        """
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                INSERT INTO analysis_jobs (kind, session_id, max_attempts)
+                VALUES (%s, %s, %s)
+                ON CONFLICT DO NOTHING
+                RETURNING *
+                """,
+                (JOB_KIND_SESSION_REPORT, session_id, max_attempts)
+            )
+            return cur.fetchone()
+
+    def claim(self, conn, worker_id: str, lease_sec: int):
+        """
+        실행할 작업 1개를 가져와 RUNNING 으로 바꿉니다.
+        - QUEUED 작업, 또는 lease가 만료된 RUNNING 작업(워커 사망)이 대상
+        - FOR UPDATE SKIP LOCKED: 여러 워커가 동시에 호출해도 같은 작업을 가져가지 않음
+        """
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                WITH next_job AS (
+                    SELECT job_id
+                    FROM analysis_jobs
+                    WHERE (status = 'QUEUED' AND run_after <= now())
+                       OR (status = 'RUNNING' AND lease_expires_at < now()
+                           AND attempts < max_attempts)
+                    ORDER BY job_id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                UPDATE analysis_jobs j
+                SET status = 'RUNNING',
+                    locked_by = %s,
+                    attempts = j.attempts + 1,
+                    lease_expires_at = now() + make_interval(secs => %s),
+                    heartbeat_at = now(),
+                    started_at = now(),
+                    updated_at = now()
+                FROM next_job
+                WHERE j.job_id = next_job.job_id
+                RETURNING j.*
+                """,
+                (worker_id, lease_sec)
+            )
+            return cur.fetchone()
+
+    def heartbeat(self, conn, job_id: int, worker_id: str, lease_sec: int) -> bool:
+        """lease 연장. 작업을 더 이상 소유하지 않으면(다른 워커가 가져감) False"""
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE analysis_jobs
+                SET lease_expires_at = now() + make_interval(secs => %s),
+                    heartbeat_at = now(),
+                    updated_at = now()
+                WHERE job_id = %s AND locked_by = %s AND status = 'RUNNING'
+                """,
+                (lease_sec, job_id, worker_id)
+            )
+            return cur.rowcount == 1
+
+    def complete(self, conn, job_id: int, worker_id: str) -> bool:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE analysis_jobs
+                SET status = 'DONE',
+                    lease_expires_at = NULL,
+                    finished_at = now(),
+                    updated_at = now()
+                WHERE job_id = %s AND locked_by = %s AND status = 'RUNNING'
+                """,
+                (job_id, worker_id)
+            )
+            return cur.rowcount == 1
+
+    def fail(self, conn, job_id: int, worker_id: str, error: str, retry_delay_sec: int = 10) -> bool:
+        """
+        실패 처리
+        - 남은 시도 횟수가 있으면 QUEUED 로 되돌려 재시도 (대기: retry_delay_sec x 2^(attempts-1))
+        - 없으면 FAILED
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE analysis_jobs
+                SET status = CASE WHEN attempts < max_attempts THEN 'QUEUED' ELSE 'FAILED' END,
+                    run_after = now() + make_interval(secs => %s * power(2, GREATEST(attempts - 1, 0))),
+                    last_error = %s,
+                    locked_by = NULL,
+                    lease_expires_at = NULL,
+                    finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE now() END,
+                    updated_at = now()
+                WHERE job_id = %s AND locked_by = %s AND status = 'RUNNING'
+                """,
+                (retry_delay_sec, error, job_id, worker_id)
+            )
+            return cur.rowcount == 1
+
+    def fail_exhausted_leases(self, conn):
+        """
+        lease가 만료됐고 재시도 횟수도 다 쓴 RUNNING 작업을 FAILED 로 정리
+        (재시도 가능한 작업은 claim()이 다시 가져감)
+        """
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                UPDATE analysis_jobs
+                SET status = 'FAILED',
+                    last_error = COALESCE(last_error, 'lease expired'),
+                    lease_expires_at = NULL,
+                    finished_at = now(),
+                    updated_at = now()
+                WHERE status = 'RUNNING'
+                  AND lease_expires_at < now()
+                  AND attempts >= max_attempts
+                RETURNING *
+                """
+            )
+            return cur.fetchall()
+
+    def get_by_id(self, conn, job_id: int):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT * FROM analysis_jobs WHERE job_id = %s", (job_id,))
+            return cur.fetchone()
+
+    def get_all_by_session_id(self, conn, session_id: int, kind: Optional[str] = None):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            if kind:
+                cur.execute(
+                    "SELECT * FROM analysis_jobs WHERE session_id = %s AND kind = %s ORDER BY job_id",
+                    (session_id, kind)
+                )
+            else:
+                cur.execute(
+                    "SELECT * FROM analysis_jobs WHERE session_id = %s ORDER BY job_id",
+                    (session_id,)
+                )
+            return cur.fetchall()
+
+analysis_job_repo = AnalysisJobRepository()
@@ -52,6 +52,29 @@ class AnswerRepository:
                 (status, answer_id)
             )
 
+    def claim_for_analysis(self, conn, answer_id: int, from_statuses=None) -> bool:
+        """
+        분석 시작: 상태를 PROCESSING 으로 바꾸고 성공 여부 반환
+        - from_statuses 를 주면 그 상태일 때만 바꿈 (UPDATE ... WHERE 한 번이라 동시에 호출해도 한 곳만 성공)
+        - None 이면 상태와 무관하게 바꿈 (작업 lease 로 이미 단독 실행이 보장된 경우)
+        """
+        with conn.cursor() as cur:
+            if from_statuses is None:
+                cur.execute(
+                    "UPDATE answers SET analysis_status = 'PROCESSING' WHERE answer_id = %s",
+                    (answer_id,)
+                )
+            else:
+                cur.execute(
+                    """
+                    UPDATE answers
+                    SET analysis_status = 'PROCESSING'
+                    WHERE answer_id = %s AND analysis_status = ANY(%s)
+                    """,
+                    (answer_id, list(from_statuses))
+                )
+            return cur.rowcount == 1
+
     def update_stt_result(self, conn, answer_id: int, stt_text: str):
         with conn.cursor() as cur:
             cur.execute(
@@ -63,12 +86,54 @@ class AnswerRepository:
                 (stt_text, answer_id)
             )
 
+    def update_live_metrics(self, conn, answer_id: int, live_metrics_json: str):
+        """녹화 중 실시간 Visual 분석 결과 저장 (JSON 문자열)"""
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE answers
+                SET live_metrics_json = %s
+                WHERE answer_id = %s
+                """,
+                (live_metrics_json, answer_id)
+            )
+
+    def get_live_metrics(self, conn, answer_id: int):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT live_metrics_json FROM answers WHERE answer_id = %s",
+                (answer_id,)
+            )
+            row = cur.fetchone()
+            return row["live_metrics_json"] if row else None
+
+    def update_live_voice(self, conn, answer_id: int, live_voice_json: str):
+        """녹화 중 실시간 Voice 지표 저장 (JSON 문자열)"""
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE answers
+                SET live_voice_json = %s
+                WHERE answer_id = %s
+                """,
+                (live_voice_json, answer_id)
+            )
+
+    def get_live_voice(self, conn, answer_id: int):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT live_voice_json FROM answers WHERE answer_id = %s",
+                (answer_id,)
+            )
+            row = cur.fetchone()
+            return row["live_voice_json"] if row else None
+
     def get_all_by_session_id(self, conn, session_id: int):
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
                 SELECT 
-                    a.answer_id, a.video_path, a.created_at, a.stt_text, 
+                    a.answer_id, a.video_path, a.created_at, a.stt_text, a.analysis_status,
                     q.question_id, q.content as question_content
                 FROM answers a
                 JOIN questions q ON a.question_id = q.question_id
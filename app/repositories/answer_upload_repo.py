@@ -0,0 +1,91 @@
+from typing import Optional
+from psycopg2.extras import RealDictCursor
+
+
+class AnswerUploadRepository:
+
+    def create(
+        self,
+        conn,
+        upload_id: str,
+        user_id: int,
+        question_id: int,
+        tmp_path: str,
+        *,
+        filename: Optional[str] = None,
+        ext: str = ".mp4",
+        total_bytes: Optional[int] = None,
+        duration_sec: Optional[float] = None,
+    ):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                INSERT INTO answer_uploads
+                    (upload_id, user_id, question_id, filename, ext,
+                     total_bytes, duration_sec, tmp_path)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING *
+                """,
+                (upload_id, user_id, question_id, filename, ext,
+                 total_bytes, duration_sec, tmp_path)
+            )
+            return cur.fetchone()
+
+    def get_by_id(self, conn, upload_id: str, *, for_update: bool = False):
+        """for_update=True: 같은 업로드에 대한 동시 PUT/complete 를 직렬화"""
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT * FROM answer_uploads WHERE upload_id = %s"
+                + (" FOR UPDATE" if for_update else ""),
+                (upload_id,)
+            )
+            return cur.fetchone()
+
+    def advance(self, conn, upload_id: str, expected_offset: int, received_bytes: int) -> bool:
+        """
+        청크 저장 후 received_bytes 갱신
+        - 다른 요청이 먼저 같은 offset 을 처리했다면 False
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE answer_uploads
+                SET received_bytes = %s,
+                    updated_at = now()
+                WHERE upload_id = %s AND received_bytes = %s AND status = 'UPLOADING'
+                """,
+                (received_bytes, upload_id, expected_offset)
+            )
+            return cur.rowcount == 1
+
+    def mark_completed(self, conn, upload_id: str, digest: str, answer_id: int):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                UPDATE answer_uploads
+                SET status = 'COMPLETED',
+                    digest = %s,
+                    answer_id = %s,
+                    updated_at = now()
+                WHERE upload_id = %s
+                RETURNING *
+                """,
+                (digest, answer_id, upload_id)
+            )
+            return cur.fetchone()
+
+    def mark_aborted(self, conn, upload_id: str):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                UPDATE answer_uploads
+                SET status = 'ABORTED',
+                    updated_at = now()
+                WHERE upload_id = %s AND status = 'UPLOADING'
+                RETURNING *
+                """,
+                (upload_id,)
+            )
+            return cur.fetchone()
+
+answer_upload_repo = AnswerUploadRepository()
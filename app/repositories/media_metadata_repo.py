@@ -0,0 +1,61 @@
+from typing import Dict, Any
+from psycopg2.extras import RealDictCursor
+
+
+class MediaMetadataRepository:
+
+    def upsert(self, conn, payload: Dict[str, Any]):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                INSERT INTO answer_media_metadata
+                    (answer_id, duration_sec, container, size_bytes, bitrate,
+                     video_codec, width, height, fps, pix_fmt, video_bitrate,
+                     audio_codec, audio_sample_rate, audio_channels,
+                     transcode_action, transcode_reasons, playback_path)
+                VALUES
+                    (%(answer_id)s, %(duration_sec)s, %(container)s, %(size_bytes)s, %(bitrate)s,
+                     %(video_codec)s, %(width)s, %(height)s, %(fps)s, %(pix_fmt)s, %(video_bitrate)s,
+                     %(audio_codec)s, %(audio_sample_rate)s, %(audio_channels)s,
+                     %(transcode_action)s, %(transcode_reasons)s, %(playback_path)s)
+                ON CONFLICT (answer_id)
+                DO UPDATE SET
+                    duration_sec = EXCLUDED.duration_sec,
+                    container = EXCLUDED.container,
+                    size_bytes = EXCLUDED.size_bytes,
+                    bitrate = EXCLUDED.bitrate,
+                    video_codec = EXCLUDED.video_codec,
+                    width = EXCLUDED.width,
+                    height = EXCLUDED.height,
+                    fps = EXCLUDED.fps,
+                    pix_fmt = EXCLUDED.pix_fmt,
+                    video_bitrate = EXCLUDED.video_bitrate,
+                    audio_codec = EXCLUDED.audio_codec,
+                    audio_sample_rate = EXCLUDED.audio_sample_rate,
+                    audio_channels = EXCLUDED.audio_channels,
+                    transcode_action = EXCLUDED.transcode_action,
+                    transcode_reasons = EXCLUDED.transcode_reasons,
+                    playback_path = COALESCE(EXCLUDED.playback_path, answer_media_metadata.playback_path),
+                    probed_at = now()
+                RETURNING *
+                """,
+                payload
+            )
+            return cur.fetchone()
+
+    def update_playback_path(self, conn, answer_id: int, playback_path: str):
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE answer_media_metadata SET playback_path = %s WHERE answer_id = %s",
+                (playback_path, answer_id)
+            )
+
+    def get_by_answer_id(self, conn, answer_id: int):
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT * FROM answer_media_metadata WHERE answer_id = %s",
+                (answer_id,)
+            )
+            return cur.fetchone()
+
+media_metadata_repo = MediaMetadataRepository()
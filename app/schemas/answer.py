@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 from enum import Enum
 
 class AnalysisStatus(str, Enum):
@@ -19,4 +19,32 @@ class AnswerResponse(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# =========================================================
+# 이어받기 가능한 청크 업로드 (/api/v1/answer/uploads)
+# =========================================================
+class UploadInitRequest(BaseModel):
+    """업로드 시작 요청"""
+    question_id: int
+    filename: Optional[str] = None
+    total_bytes: Optional[int] = Field(None, ge=0, description="전체 파일 크기 (알면 미리 제한 검사)")
+    duration_sec: Optional[float] = Field(None, ge=0, description="녹화 길이 (알면 미리 제한 검사)")
+
+
+class UploadStatusResponse(BaseModel):
+    """업로드 진행 상태 (received_bytes 부터 이어서 PUT)"""
+    upload_id: str
+    question_id: int
+    status: str
+    received_bytes: int
+    total_bytes: Optional[int] = None
+    chunk_bytes: int = Field(..., description="권장/최대 청크 크기")
+    answer_id: Optional[int] = None
+
+
+class UploadCompleteRequest(BaseModel):
+    """업로드 완료 요청"""
+    analyze: Optional[bool] = Field(None, description="완료 직후 분석 시작 여부 (기본: ANALYSIS_EAGER)")
+    live_visual: Optional[Dict[str, Any]] = Field(None, description="녹화 중 실시간 Visual 분석 결과 (v0 형식)")
+    live_voice: Optional[Dict[str, Any]] = Field(None, description="녹화 중 실시간 Voice 지표 (v0 형식)")
@@ -0,0 +1,29 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class MediaMetadataDBPayload(BaseModel):
+    """
+    answer_media_metadata 테이블 저장용 (ffprobe 결과 + 재생용 파일 생성 방식)
+    """
+    answer_id: int
+
+    duration_sec: Optional[float] = None
+    container: Optional[str] = None
+    size_bytes: Optional[int] = None
+    bitrate: Optional[int] = None
+
+    video_codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    pix_fmt: Optional[str] = None
+    video_bitrate: Optional[int] = None
+
+    audio_codec: Optional[str] = None
+    audio_sample_rate: Optional[int] = None
+    audio_channels: Optional[int] = None
+
+    transcode_action: Optional[str] = None
+    transcode_reasons: List[str] = Field(default_factory=list)
+    playback_path: Optional[str] = None
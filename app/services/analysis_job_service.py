@@ -0,0 +1,144 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from psycopg2.extensions import connection
+
+from app.core.config import settings
+from app.core.exceptions import AnalysisCancelled
+from app.repositories.analysis_job_repo import (
+    analysis_job_repo,
+    JOB_KIND_ANSWER,
+    JOB_KIND_SESSION_REPORT,
+)
+from app.repositories.answer_repo import answer_repo
+from app.repositories.session_repo import session_repo
+from app.services.analysis_service import analysis_service
+from app.services.session_analysis_service import session_analysis_service, TERMINAL_STATUSES
+
+
+class AnalysisJobService:
+    """
+    analysis_jobs 큐 기반 분석 흐름
+    - API: enqueue_session() 으로 작업만 등록
+    - 워커: process_job() 으로 실제 분석 수행
+    - 세션이 ANALYZING 상태이고 모든 답변이 종료 상태가 되면 SESSION_REPORT 작업을 등록
+    """
+
+    # =========================================================================
+    # API 쪽: 작업 등록
+    # =========================================================================
+    def enqueue_session(
+        self,
+        conn: connection,
+        session_id: int,
+        answers: List[Dict[str, Any]],
+        *,
+        skip_finished: bool = False,
+    ) -> int:
+        """
+        세션의 답변 분석 작업을 등록하고 새로 등록된 작업 수를 반환합니다.
+        (이미 진행 중인 답변 작업은 unique index 덕분에 중복 등록되지 않음)
+        - skip_finished=True: 업로드 직후(eager) 이미 분석이 끝난 답변(DONE/FAILED)은 건너뜀
+        호출 전에 세션 상태가 ANALYZING 으로 바뀌어 있어야 리포트 작업이 이어서 등록됩니다.
+        """
+        queued = 0
+        for ans in answers:
+            if not ans.get("video_path"):
+                continue
+            if skip_finished and ans.get("analysis_status") in TERMINAL_STATUSES:
+                continue
+            job = analysis_job_repo.enqueue_answer(
+                conn, session_id, ans["answer_id"], max_attempts=settings.ANALYSIS_JOB_MAX_ATTEMPTS
+            )
+            if job:
+                queued += 1
+
+        # 분석할 답변이 없거나 이미 모두 끝난 경우 바로 리포트 작업 등록
+        self.maybe_enqueue_session_report(conn, session_id)
+        return queued
+
+    def enqueue_answer(self, conn: connection, answer_id: int) -> bool:
+        """업로드 직후(eager) 답변 1개 분석 작업 등록. 세션이 아직 진행 중이면 리포트는 만들지 않음"""
+        session_id = answer_repo.get_session_id(conn, answer_id)
+        if session_id is None:
+            return False
+        job = analysis_job_repo.enqueue_answer(
+            conn, session_id, answer_id, max_attempts=settings.ANALYSIS_JOB_MAX_ATTEMPTS
+        )
+        return job is not None
+
+    def maybe_enqueue_session_report(self, conn: connection, session_id: int) -> bool:
+        """세션이 리포트를 요청한 상태(ANALYZING)이고 모든 답변이 DONE/FAILED 이면 리포트 작업 등록"""
+        session = session_repo.get_by_id(conn, session_id)
+        if not session or session.get("status") != "ANALYZING":
+            return False
+        if not session_analysis_service.all_terminal(conn, session_id):
+            return False
+        job = analysis_job_repo.enqueue_session_report(
+            conn, session_id, max_attempts=settings.ANALYSIS_JOB_MAX_ATTEMPTS
+        )
+        if job:
+            print(f"📬 [Job Queue] Session {session_id} 리포트 작업 등록 (job {job['job_id']})")
+        return job is not None
+
+    # =========================================================================
+    # 워커 쪽: 작업 실행
+    # =========================================================================
+    def process_job(self, conn: connection, job: Dict[str, Any], cancel: Optional[threading.Event] = None) -> None:
+        """
+        작업 1개 실행
+        - 재시도할 만한 예외는 그대로 올라가 워커가 fail() (max_attempts / 재시도 대기 적용)
+        - cancel 이 set 되면 (lease 상실) AnalysisCancelled 로 중단, 결과를 커밋하지 않음
+        """
+        kind = job["kind"]
+        if kind == JOB_KIND_ANSWER:
+            self._process_answer_job(conn, job, cancel)
+        elif kind == JOB_KIND_SESSION_REPORT:
+            self._process_session_report_job(conn, job, cancel)
+        else:
+            raise ValueError(f"unknown analysis job kind: {kind}")
+
+    def _process_answer_job(self, conn: connection, job: Dict[str, Any], cancel: Optional[threading.Event]) -> None:
+        answer = answer_repo.get_by_id(conn, job["answer_id"])
+        if not answer or not answer.get("video_path"):
+            print(f"⚠️ [Job {job['job_id']}] Answer ID {job['answer_id']} 영상 없음 -> 건너뜀")
+            return
+
+        # 작업 lease 가 단독 실행을 보장하므로 PROCESSING(이전 워커 사망)도 가져감
+        # eager 모드에서는 이미 끝난 답변(DONE/FAILED)을 다시 분석하지 않음
+        claim_from = ("PENDING", "PROCESSING") if settings.ANALYSIS_EAGER else None
+        analysis_service.run_answer_analysis(
+            conn, answer["answer_id"], answer["video_path"],
+            raise_errors=True, cancel=cancel, claim_from=claim_from,
+        )
+        self._check_cancel(cancel, job)
+        session_analysis_service.finalize_statuses(conn, [answer["answer_id"]])
+
+        self.maybe_enqueue_session_report(conn, job["session_id"])
+        conn.commit()
+
+    def _process_session_report_job(self, conn: connection, job: Dict[str, Any], cancel: Optional[threading.Event]) -> None:
+        session_id = job["session_id"]
+        report = analysis_service.generate_session_report(conn, session_id)
+        if report is None:
+            raise RuntimeError(f"session {session_id} report generation failed")
+        self._check_cancel(cancel, job)
+
+        session_repo.update_status(conn, session_id, "COMPLETED")
+        conn.commit()
+        print(f"✅ [Job {job['job_id']}] Session {session_id} 모든 작업 완료")
+
+    @staticmethod
+    def _check_cancel(cancel: Optional[threading.Event], job: Dict[str, Any]) -> None:
+        if cancel is not None and cancel.is_set():
+            raise AnalysisCancelled(f"job {job['job_id']} lease lost")
+
+    def handle_exhausted_job(self, conn: connection, job: Dict[str, Any]) -> None:
+        """재시도를 모두 소진한 작업 정리: 답변을 FAILED 로 두고 리포트 진행 여부 재확인"""
+        if job["kind"] == JOB_KIND_ANSWER and job.get("answer_id"):
+            session_analysis_service.finalize_statuses(conn, [job["answer_id"]])
+            self.maybe_enqueue_session_report(conn, job["session_id"])
+        conn.commit()
+
+
+analysis_job_service = AnalysisJobService()
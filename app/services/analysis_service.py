@@ -2,13 +2,30 @@ import traceback
 import json
 import math
 import os
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from psycopg2.extensions import connection
-from app.utils.media_utils import MediaUtils
+from app.core.config import settings
+from app.core.db import get_db_connection
+from app.core.concurrency import engine_slot, inner_pool_workers, ENGINE_VISUAL, ENGINE_STT
+from app.core.exceptions import AnalysisCancelled, ValidationException
+from app.utils.media_utils import MediaUtils, MediaProbe, TranscodePlan, TRANSCODE_REENCODE
+from app.utils.media_decode import ANALYSIS_SAMPLE_RATE, SinglePassMedia, analysis_frame_limits, analysis_frame_rate
+from app.utils.media_store import media_store
+from app.utils.audio_io import load_pcm
 
 # Engines
-from app.engines.visual.engine import run_visual
+from app.engines.visual.engine import run_visual, run_visual_frames, landmarker_pool
+from app.engines.visual.parallel import run_visual_parallel, should_run_parallel
+from app.engines.visual.sampling import FrameSampler, make_frame_sampler, source_filter
+from app.engines.visual.scoring import SUB_SCORE_MAX, clamp_sub_scores, compose_from_sub_scores, live_result_details
+from app.engines.common.result import ok_result
 from app.engines.voice.engine import run_voice
+from app.engines.voice.streaming import acoustic_from_result, live_duration_matches
 from app.engines.stt.engine import run_stt
 from app.engines.llm.engine import run_content
 
@@ -17,6 +34,7 @@ from app.repositories.answer_repo import answer_repo
 from app.repositories.visual_repo import visual_repo
 from app.repositories.voice_repo import voice_repo
 from app.repositories.content_repo import content_repo
+from app.repositories.media_metadata_repo import media_metadata_repo
 
 # Services
 from app.services.final_report_service import final_report_service
@@ -26,6 +44,13 @@ from app.utils.chart_utils import calculate_cps_flow
 from app.schemas.visual import VisualDBPayload
 from app.schemas.voice import VoiceDBPayload
 from app.schemas.content import ContentDBPayload
+from app.schemas.media import MediaMetadataDBPayload
+
+# 파생 파일 key 에 들어가는 변환 파라미터 (값을 바꾸면 새 파일을 만듦)
+# - MediaUtils 기본값과 맞춰 둘 것
+PLAYBACK_PARAMS = {"max_width": 1280, "max_height": 720, "crf": 28, "preset": "veryfast", "audio_bitrate": "96k"}
+ANALYSIS_PROXY_PARAMS = {"crf": 23, "preset": "ultrafast", "tune": "fastdecode", "gop_sec": 1}
+AUDIO_WAV_PARAMS = {"codec": "pcm_s16le", "sample_rate": 16000, "channels": 1}
 
 # 1. Speed Score (CPS 기반)
 def speed_score_from_cps(avg_cps: float) -> float:
@@ -117,26 +142,87 @@ def compute_final_voice_score(
     
     return int(round(max(0.0, min(100.0, final))))
 
+@dataclass
+class PreparedMedia:
+    """
+    전처리 결과 (엔진 입력)
+    - 파일 모드: video_path(재생용 압축본) + analysis_video_path(분석용 proxy) + audio_path(WAV)
+    - 단일 패스 모드: decoded(SinglePassMedia) 에서 PCM / 프레임을 바로 사용 (프레임은 proxy 해상도로 디코드)
+    - 어느 모드든 PCM 은 답변당 한 번만 디코드해서 STT / Voice 엔진에 같은 배열을 넘김
+    """
+    video_path: str
+    audio_path: Optional[str] = None
+    decoded: Optional[SinglePassMedia] = None
+    analysis_video_path: Optional[str] = None
+    audio_pcm: Optional[np.ndarray] = None   # 파일 모드: WAV 를 한 번 읽은 16kHz PCM
+    side_tasks: List[threading.Thread] = field(default_factory=list)
+
+    @property
+    def visual_path(self) -> str:
+        """Visual 엔진이 읽을 파일 (proxy 가 있으면 proxy)"""
+        return self.analysis_video_path or self.video_path
+
+    @property
+    def pcm(self):
+        return self.decoded.pcm if self.decoded is not None else self.audio_pcm
+
+    def close(self) -> None:
+        if self.decoded is not None:
+            self.decoded.close()
+        for t in self.side_tasks:
+            t.join()
+
+
+# run_answer_analysis 가 기본으로 가져갈 수 있는 답변 상태 (PROCESSING = 다른 곳에서 분석 중)
+CLAIMABLE_STATUSES: Tuple[str, ...] = ("PENDING", "DONE", "FAILED")
+
+
 class AnalysisService:
     # =========================================================================
     # 기능 1: 개별 답변 분석 (Visual, Voice, Content)
     # =========================================================================
-    def run_answer_analysis(self, conn: connection, answer_id: int, file_path: str):
+    def run_answer_analysis(
+        self,
+        conn: connection,
+        answer_id: int,
+        file_path: str,
+        *,
+        concurrent: Optional[bool] = None,
+        raise_errors: bool = False,
+        cancel: Optional[threading.Event] = None,
+        claim_from: Optional[Tuple[str, ...]] = CLAIMABLE_STATUSES,
+    ) -> Optional[Dict[str, float]]:
         """
         단일 답변 영상에 대해 3가지 엔진(Visual, Voice, Content)을 돌리고 결과를 저장합니다.
         (파이널 리포트는 생성하지 않습니다.)
+
+        - concurrent=True: 비주얼 브랜치와 오디오 브랜치(STT -> Voice -> Content)를
+          별도 워커에서 동시에 실행합니다. 각 브랜치는 풀에서 자기 커넥션을 받아 결과를 저장합니다.
+        - concurrent=None: settings.ANALYSIS_CONCURRENT_BRANCHES 값을 따릅니다.
+        - raise_errors=True (작업 큐 워커): 재시도할 만한 예외는 답변을 PENDING 으로 되돌리고 다시 던짐
+          (작업 레이어의 max_attempts / 재시도 대기가 적용됨, 재시도 소진 시 작업 레이어가 FAILED 처리)
+        - claim_from: 이 상태인 답변만 PROCESSING 으로 가져가서 분석 (기본: PROCESSING 이 아닌 모든 상태)
+          이미 다른 곳에서 가져간 답변이면 분석하지 않고 None (같은 답변이 동시에 두 번 분석되지 않음)
+          None 이면 상태와 무관하게 분석 (작업 큐 lease 가 단독 실행을 보장하는 경우)
+        - cancel: set 되면 (작업 lease 상실) 단계 사이에서 AnalysisCancelled 로 중단하고 DONE/FAILED 를 쓰지 않음
+        - 반환: 구간별 소요 시간(초) dict (media / visual / audio / total). 시작 전 실패 시 None
         """
+        if concurrent is None:
+            concurrent = settings.ANALYSIS_CONCURRENT_BRANCHES
+
         print(f"🎬 [Answer Analysis Start] Answer ID: {answer_id}")
+        t_start = time.perf_counter()
+        timings: Dict[str, float] = {}
 
         # 1. 답변 조회
         answer = answer_repo.get_by_id(conn, answer_id)
         if not answer:
             print(f"❌ [Error] Answer ID {answer_id} not found in DB.")
-            return
+            return None
 
-        # 2. 상태 변경 (PENDING -> PROCESSING) + ✅ commit
+        # 2. 상태 변경 (claim_from -> PROCESSING, 원자적) + ✅ commit
         try:
-            answer_repo.update_analysis_status(conn, answer_id, "PROCESSING")
+            claimed = answer_repo.claim_for_analysis(conn, answer_id, claim_from)
             conn.commit()
         except Exception as e:
             try:
@@ -144,250 +230,48 @@ class AnalysisService:
             except:
                 pass
             print(f"❌ [DB Error] Failed to set PROCESSING: {e}")
-            return
+            return None
+        if not claimed:
+            print(f"⏭️ [Answer Analysis Skip] Answer ID {answer_id} - 이미 다른 곳에서 분석 중 ({answer.get('analysis_status')})")
+            return None
 
+        media: Optional[PreparedMedia] = None
         try:
             # -------------------------------------------------
-            # 0. 미디어 전처리 (압축 + 오디오 추출)
+            # 0. 미디어 전처리 (단일 패스 디코드, 또는 압축 + 오디오 추출)
             # -------------------------------------------------
-            print(f"🔨 미디어 처리 중... (파일: {file_path})")
-
-            try:
-                # (1) 영상 압축
-                optimized_video_path = MediaUtils.compress_video(file_path, overwrite=True)
-
-                # (2) 오디오 추출
-                audio_path = MediaUtils.extract_audio(optimized_video_path, overwrite=True)
-
-                # (3) 경로 업데이트 + ✅ commit
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "UPDATE answers SET audio_path = %s WHERE answer_id = %s",
-                        (audio_path, answer_id),
-                    )
-                conn.commit()
-
-            except Exception as e:
-                try:
-                    conn.rollback()
-                except:
-                    pass
-                print(f"❌ [Media Error] 미디어 변환 중 실패: {e}")
-                raise  # 미디어 실패 시 분석 불가
+            t0 = time.perf_counter()
+            media = self._prepare_media(conn, answer_id, file_path)
+            timings["media"] = time.perf_counter() - t0
+            self._check_cancel(cancel, answer_id)
 
             # -------------------------------------------------
-            # 1. 비주얼 분석 (V3 적용)
+            # 1~3. 비주얼 브랜치 / 오디오 브랜치
             # -------------------------------------------------
-            print(f"👁️ 비주얼 분석 시작...")
-            
-            visual_output = run_visual(optimized_video_path)
-
-            if visual_output.get("error"):
-                print(f"❌ [Visual Engine Error] {visual_output['error']}")
-            else:
-                try:
-                    v_metrics = visual_output.get("metrics") or {}
-
-                    v_score = v_metrics.get("score", 0)
-                    v_feedback = v_metrics.get("feedback", "")
-                    v_details = (visual_output.get("metrics") or {}).get("details", {})
-
-                    details_str = json.dumps(v_details, default=str)
-
-                    visual_payload = VisualDBPayload(
-                        answer_id=answer_id,
-                        score=v_score,
-                        head_center_ratio=0.0,
-                        feedback=v_feedback,
-                        good_points_json=[details_str],
-                        bad_points_json=[],
+            if concurrent:
+                # 두 브랜치는 전처리된 미디어 외에는 공유하는 것이 없으므로 동시에 실행
+                with ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"answer{answer_id}") as pool:
+                    visual_future = pool.submit(
+                        self._timed_branch, self._run_visual_branch_pooled, answer_id, media
                     )
-
-                    v_data = visual_payload.model_dump()
-                    v_data["good_points_json"] = json.dumps(v_data["good_points_json"])
-                    v_data["bad_points_json"] = json.dumps(v_data["bad_points_json"])
-
-                    visual_repo.upsert_visual_result(conn, v_data)
-                    conn.commit()
-                    print(f"✅ 비주얼 분석 저장 완료")
-
-                except Exception as e:
-                    try: conn.rollback()
-                    except: pass
-                    print(f"❌ [Visual Save Error] 결과 저장 실패: {e}")
-                    traceback.print_exc()
-
-            # -------------------------------------------------
-            # 2. STT & 음성 분석
-            # -------------------------------------------------
-
-            print(f"🗣️ STT & 음성 분석 시작...")
-            stt_output = run_stt(audio_path)
-            stt_text = ""
-            stt_segments = []
-
-            if stt_output.get("error"):
-                print(f"❌ [STT Error] {stt_output['error']}")
-            else:
-                stt_text = (stt_output.get("metrics") or {}).get("text", "")
-                stt_segments = (stt_output.get("metrics") or {}).get("segments", [])
-                try:
-                    answer_repo.update_stt_result(conn, answer_id, stt_text)
-                    conn.commit()
-                    print("✅ STT 텍스트 저장 완료")
-                except Exception as e:
-                    try: conn.rollback()
-                    except: pass
-                    print(f"⚠️ [STT Save Warning] 텍스트 저장 실패: {e}")
-
-            # 차트 데이터
-            speed_flow_data = calculate_cps_flow(stt_segments)
-
-            voice_output = run_voice(audio_path, stt_text=stt_text, stt_segments=stt_segments)
-
-            if voice_output.get("error"):
-                print(f"❌ [Voice Engine Error] {voice_output['error']}")
-            else:
-                try:
-                    metrics = voice_output.get("metrics", {})
-                    
-                    # 🟢 [데이터 추출] 엔진에서 넘어온 Raw Metrics
-                    avg_cps = float(metrics.get("avg_cps") or 0.0)
-                    high_speed_share = metrics.get("high_speed_share") # None 가능
-                    voiced_ratio = float(metrics.get("voiced_ratio") or 0.0)
-                    silence_count = int(metrics.get("silence_count") or 0)
-                    duration_sec = float(metrics.get("duration_sec") or 1.0)
-
-                    # 🟢 [점수 계산] 새로운 로직 적용
-                    final_score = compute_final_voice_score(
-                        avg_cps=avg_cps,
-                        high_speed_share=high_speed_share,
-                        voiced_ratio=voiced_ratio,
-                        silence_count=silence_count
-                    )
-
-                    # 🟢 [피드백 생성] 점수 기반 피드백
-                    feedbacks = []
-                    
-                    # (1) 속도 피드백
-                    if avg_cps < 2.5: feedbacks.append("말하기 속도가 너무 느립니다.")
-                    elif 2.5 <= avg_cps < 4.8: feedbacks.append("말하기 속도가 다소 느린 편입니다.")
-                    elif 4.8 <= avg_cps <= 6.2: pass # 적정
-                    elif 6.2 < avg_cps <= 8.0: feedbacks.append("말하기 속도가 다소 빠릅니다.")
-                    else: feedbacks.append("말하기 속도가 너무 빠릅니다.")
-
-                    # (2) 급발진 피드백
-                    h_share = float(high_speed_share or 0.0)
-                    if h_share >= 0.05:
-                        feedbacks.append("중간중간 말이 급격히 빨라지는 구간이 있습니다.")
-
-                    # (3) 흐름(Flow) 피드백
-                    vr_score = score_voiced(voiced_ratio)
-                    sc_score = score_silence_30s(silence_count)
-                    
-                    if vr_score < 60: feedbacks.append("발화 사이의 공백이 길어 불안정해 보입니다.")
-                    if sc_score < 80: feedbacks.append("말 끊김이 잦아 전달력이 떨어질 수 있습니다.")
-
-                    feedback_text = " ".join(feedbacks) if feedbacks else "음성 전달력과 속도가 매우 훌륭합니다."
-
-                    # DB 저장
-                    voice_payload = VoiceDBPayload(
-                        answer_id=answer_id,
-                        score=final_score,
-                        feedback=feedback_text,
-                        
-                        # Raw Data 저장
-                        avg_wpm=int(metrics.get("avg_wpm") or 0),
-                        max_wpm=int(metrics.get("max_wpm") or 0),
-                        silence_count=silence_count,
-                        avg_silence_length=0.0,
-                        silence_timeline_json=[],
-                        duration_sec=duration_sec,
-                        avg_cps=avg_cps,
-                        avg_cpm=float(metrics.get("avg_cpm") or 0.0),
-                        avg_pitch=float(metrics.get("avg_pitch") or 0.0),
-                        max_pitch=float(metrics.get("max_pitch") or 0.0),
-                        pitch_std=float(metrics.get("pitch_std") or 0.0),
-                        voiced_ratio=voiced_ratio,
-                        burst_ratio=float(metrics.get("burst_ratio") or 0.0),
-                        high_speed_share=float(metrics.get("high_speed_share") or 0.0),
-                        cv_cps=float(metrics.get("cv_cps") or 0.0),
-                        
-                        good_points_json=[],
-                        bad_points_json=feedbacks,
-                        charts_json={"speed_flow": speed_flow_data}
+                    audio_future = pool.submit(
+                        self._timed_branch, self._run_audio_branch_pooled, answer, answer_id, media
                     )
-                    
-                    a_data = voice_payload.model_dump()
-                    a_data["charts_json"] = {'speed_flow': speed_flow_data}
-                    a_data["silence_timeline_json"] = json.dumps(a_data["silence_timeline_json"])
-                    a_data["good_points_json"] = json.dumps(a_data["good_points_json"])
-                    a_data["bad_points_json"] = json.dumps(a_data["bad_points_json"])
-
-                    voice_repo.upsert_voice_result(conn, a_data)
-                    conn.commit()
-                    print(f"✅ 음성 분석 저장 완료 (점수: {final_score})")
-
-                except Exception as e:
-                    try: conn.rollback()
-                    except: pass
-                    print(f"❌ [Voice Save Error] 결과 저장 실패: {e}")
-                    traceback.print_exc()
-            # -------------------------------------------------
-            # 3. 내용 분석
-            # -------------------------------------------------
-            print(f"📝 내용 분석 시작...")
-            question_text = answer.get("question_content", "")
-            duration_sec = stt_segments[-1]["end"] if stt_segments else 0.0
-
-            content_output = run_content(
-                answer_text=stt_text,
-                question_text=question_text,
-                duration_sec=duration_sec,
-            )
-
-            if content_output.get("error"):
-                print(f"❌ [Content Engine Error] {content_output['error']}")
+                    # 브랜치 내부의 예기치 못한 예외는 여기서 다시 올라와 FAILED 처리됨
+                    timings["visual"] = visual_future.result()
+                    timings["audio"] = audio_future.result()
             else:
-                try:
-                    c_metrics = content_output.get("metrics", {})
-                    l_score = c_metrics.get("logic_score", 0)
-                    j_score = c_metrics.get("job_fit_score", 0)
-                    t_score = c_metrics.get("time_management_score", 0)
-                    final_c_score = int((l_score + j_score + t_score) / 3)
-
-                    filler_count = stt_text.count("음") + stt_text.count("어")
-
-                    content_payload = ContentDBPayload(
-                        answer_id=answer_id,
-                        score=final_c_score,
-                        logic_score=l_score,
-                        job_fit_score=j_score,
-                        time_management_score=t_score,
-                        filler_count=filler_count,
-                        keywords_json=c_metrics.get("keywords", []),
-                        feedback=c_metrics.get("feedback", ""),
-                        model_answer=c_metrics.get("model_answer"),
-                        summarized_text=None,
-                    )
-                    c_data = content_payload.model_dump()
-                    c_data["keywords_json"] = json.dumps(c_data["keywords_json"])
-
-                    content_repo.upsert_content_result(conn, c_data)
-                    conn.commit()  # ✅ commit
-                    print(f"✅ 내용 분석 저장 완료")
-
-                except Exception as e:
-                    try:
-                        conn.rollback()
-                    except:
-                        pass
-                    print(f"❌ [Content Save Error] 결과 저장 실패: {e}")
-                    traceback.print_exc()
+                timings["visual"] = self._timed_branch(
+                    self._run_visual_branch, conn, answer_id, media
+                )
+                timings["audio"] = self._timed_branch(
+                    self._run_audio_branch, conn, answer, answer_id, media
+                )
 
             # -------------------------------------------------
             # 최종 완료 처리 + ✅ commit
             # -------------------------------------------------
+            self._check_cancel(cancel, answer_id)
             try:
                 answer_repo.update_analysis_status(conn, answer_id, "DONE")
                 conn.commit()
@@ -399,6 +283,17 @@ class AnalysisService:
                     pass
                 print(f"❌ [DB Error] Failed to set DONE: {e}")
 
+        except AnalysisCancelled:
+            # lease 를 잃음: 답변 상태는 새로 가져간 워커가 관리하므로 건드리지 않음
+            try:
+                conn.rollback()
+            except:
+                pass
+            if media is not None:
+                media.close()
+            print(f"🛑 [Analysis Cancelled] Answer ID {answer_id} - 작업 lease 상실, 결과를 버립니다.")
+            raise
+
         except Exception as e:
             # 전체 프로세스 중 잡히지 않은 에러 처리
             print(f"💥 [Critical Analysis Failed] Answer ID {answer_id}")
@@ -412,9 +307,10 @@ class AnalysisService:
             except:
                 pass
 
-            # ✅ FAILED 상태 반영 + commit
+            # ✅ FAILED 상태 반영 + commit (작업 큐에서 재시도할 예외면 PENDING 으로 되돌리고 다시 던짐)
+            retry = raise_errors and self._is_retryable(e)
             try:
-                answer_repo.update_analysis_status(conn, answer_id, "FAILED")
+                answer_repo.update_analysis_status(conn, answer_id, "PENDING" if retry else "FAILED")
                 conn.commit()
             except Exception as e2:
                 try:
@@ -423,6 +319,595 @@ class AnalysisService:
                     pass
                 print(f"   (DB Status Update Failed too): {e2}")
 
+            if retry:
+                if media is not None:
+                    media.close()
+                raise
+
+        # 디코더 해제 + 재생용 압축본 등 부가 작업 대기
+        if media is not None:
+            media.close()
+
+        timings["total"] = time.perf_counter() - t_start
+        print(
+            f"⏱️ [Answer Timing] Answer ID {answer_id} ({'concurrent' if concurrent else 'serial'}) "
+            + " ".join(f"{k}={v:.2f}s" for k, v in timings.items())
+        )
+        return timings
+
+    @staticmethod
+    def _check_cancel(cancel: Optional[threading.Event], answer_id: int) -> None:
+        if cancel is not None and cancel.is_set():
+            raise AnalysisCancelled(f"answer {answer_id} analysis cancelled (job lease lost)")
+
+    @staticmethod
+    def _is_retryable(e: Exception) -> bool:
+        """다시 실행해도 같은 결과인 입력 오류(파일 없음 / 검증 실패)는 재시도하지 않음"""
+        return not isinstance(e, (FileNotFoundError, ValidationException))
+
+    @staticmethod
+    def _timed_branch(fn, *args) -> float:
+        """브랜치 함수를 실행하고 소요 시간(초)을 반환"""
+        t0 = time.perf_counter()
+        fn(*args)
+        return time.perf_counter() - t0
+
+    # -------------------------------------------------------------------------
+    # 0. 미디어 전처리
+    # -------------------------------------------------------------------------
+    def _prepare_media(self, conn: connection, answer_id: int, file_path: str) -> "PreparedMedia":
+        print(f"🔨 미디어 처리 중... (파일: {file_path})")
+
+        # ffprobe 로 코덱/해상도/비트레이트를 확인하고 재생용 파일 생성 방식 결정
+        probe, plan = self._probe_and_plan(conn, answer_id, file_path)
+
+        if settings.MEDIA_SINGLE_PASS_DECODE:
+            # 원본을 한 번만 demux: 오디오는 바로 PCM으로, 비디오는 비주얼 브랜치에서 디코드
+            try:
+                max_width, max_height = analysis_frame_limits()
+                decoded = SinglePassMedia(
+                    file_path, max_width=max_width, max_height=max_height, max_fps=analysis_frame_rate(),
+                ).demux()
+            except Exception as e:
+                print(f"❌ [Media Error] 미디어 디코드 중 실패: {e}")
+                raise  # 미디어 실패 시 분석 불가
+
+            media = PreparedMedia(video_path=file_path, decoded=decoded)
+            if settings.MEDIA_PLAYBACK_TRANSCODE:
+                # 재생용 파일은 분석 경로 밖에서 별도로 생성 (선택)
+                media.side_tasks.append(
+                    self._start_side_task(self._prepare_playback, answer_id, file_path, probe, plan)
+                )
+            return media
+
+        try:
+            # (1) 재생/분석용 영상: 필요한 경우에만 재인코딩 (아니면 remux)
+            optimized_video_path = self._prepare_playback(answer_id, file_path, probe, plan)
+
+            # (2) 분석용 proxy (재생용 파일과 별개, 원본에서 바로 저해상도/저fps 로)
+            analysis_video_path = self._prepare_analysis_proxy(file_path) if settings.MEDIA_ANALYSIS_PROXY else None
+
+            # (3) 오디오 추출 (원본에서 바로 16kHz mono WAV, 같은 원본이면 재사용)
+            audio_path, reused = media_store.get_or_create_derived(
+                file_path, "audio", AUDIO_WAV_PARAMS, ".wav",
+                lambda out: MediaUtils.extract_audio(file_path, out, overwrite=True),
+            )
+            if reused:
+                print(f"♻️ [Media Store] WAV 재사용: {audio_path}")
+
+            # (4) 경로 업데이트 + ✅ commit
+            with conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE answers SET audio_path = %s WHERE answer_id = %s",
+                    (audio_path, answer_id),
+                )
+            conn.commit()
+
+        except Exception as e:
+            try:
+                conn.rollback()
+            except:
+                pass
+            print(f"❌ [Media Error] 미디어 변환 중 실패: {e}")
+            raise  # 미디어 실패 시 분석 불가
+
+        # (5) WAV 를 한 번만 읽어서 STT / Voice 가 공유 (실패하면 엔진이 경로로 각자 읽음)
+        try:
+            audio_pcm = load_pcm(audio_path)
+        except Exception as e:
+            print(f"⚠️ [Media] WAV 로드 실패 (엔진별로 다시 읽음): {e}")
+            audio_pcm = None
+
+        return PreparedMedia(
+            video_path=optimized_video_path,
+            audio_path=audio_path,
+            analysis_video_path=analysis_video_path,
+            audio_pcm=audio_pcm,
+        )
+
+    def _probe_and_plan(
+        self, conn: connection, answer_id: int, file_path: str
+    ) -> Tuple[Optional[MediaProbe], Optional[TranscodePlan]]:
+        """
+        업로드 영상 메타데이터 + 변환 계획을 answer_media_metadata 에 기록
+        (probe 실패는 분석을 막지 않음 -> 기존처럼 재인코딩)
+        """
+        try:
+            probe = MediaUtils.probe(file_path)
+            plan = MediaUtils.plan_transcode(probe)
+        except Exception as e:
+            print(f"⚠️ [Media Probe] 실패 (재인코딩으로 진행): {e}")
+            return None, None
+
+        print(f"🔎 [Media Probe] {plan.action}: {', '.join(plan.reasons) or '-'}")
+        try:
+            payload = MediaMetadataDBPayload(
+                answer_id=answer_id,
+                transcode_action=plan.action,
+                transcode_reasons=plan.reasons,
+                **probe.to_dict(),
+            )
+            m_data = payload.model_dump()
+            m_data["transcode_reasons"] = json.dumps(m_data["transcode_reasons"], ensure_ascii=False)
+            media_metadata_repo.upsert(conn, m_data)
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except:
+                pass
+            print(f"⚠️ [Media Probe] 메타데이터 저장 실패: {e}")
+        return probe, plan
+
+    def _prepare_playback(
+        self,
+        answer_id: int,
+        file_path: str,
+        probe: Optional[MediaProbe],
+        plan: Optional[TranscodePlan],
+    ) -> str:
+        t0 = time.perf_counter()
+        if plan is None:
+            action = TRANSCODE_REENCODE
+            build = lambda out: MediaUtils.compress_video(file_path, out, overwrite=True)
+        else:
+            action = plan.action
+            build = lambda out: MediaUtils.prepare_playback(file_path, out, probe=probe, plan=plan, overwrite=True)
+
+        # 원본 해시 + 변환 파라미터가 같으면 이전에 만든 파일을 그대로 사용 (ffmpeg 재실행 없음)
+        out_path, reused = media_store.get_or_create_derived(
+            file_path, "playback", dict(PLAYBACK_PARAMS, action=action), ".mp4", build
+        )
+        if reused:
+            print(f"♻️ [Media Store] 재생용 파일 재사용 ({action}): {out_path}")
+        else:
+            print(f"🎞️ [Playback] {action} 완료 ({time.perf_counter() - t0:.1f}s) -> {out_path}")
+
+        if plan is not None:
+            # side task(별도 스레드)에서도 호출되므로 자기 커넥션 사용
+            try:
+                with get_db_connection() as m_conn:
+                    media_metadata_repo.update_playback_path(m_conn, answer_id, out_path)
+            except Exception as e:
+                print(f"⚠️ [Playback] 경로 저장 실패: {e}")
+        return out_path
+
+    def _prepare_analysis_proxy(self, file_path: str) -> Optional[str]:
+        """
+        MediaPipe 입력 전용 proxy (실패하면 None -> 재생용 파일로 분석)
+        해상도 / fps 가 같은 원본이면 이전에 만든 proxy 재사용
+        """
+        params = dict(
+            ANALYSIS_PROXY_PARAMS,
+            max_width=settings.MEDIA_ANALYSIS_PROXY_MAX_WIDTH,
+            max_height=settings.MEDIA_ANALYSIS_PROXY_MAX_HEIGHT,
+            fps=settings.MEDIA_ANALYSIS_PROXY_FPS,
+        )
+        t0 = time.perf_counter()
+        try:
+            out_path, reused = media_store.get_or_create_derived(
+                file_path, "analysis-proxy", params, ".mp4",
+                lambda out: MediaUtils.make_analysis_proxy(
+                    file_path, out,
+                    max_width=params["max_width"], max_height=params["max_height"], fps=params["fps"],
+                    crf=params["crf"], preset=params["preset"], overwrite=True,
+                ),
+            )
+        except Exception as e:
+            print(f"⚠️ [Analysis Proxy] 생성 실패 (재생용 파일로 분석): {e}")
+            return None
+
+        if reused:
+            print(f"♻️ [Media Store] 분석용 proxy 재사용: {out_path}")
+        else:
+            print(f"🔬 [Analysis Proxy] 생성 완료 ({time.perf_counter() - t0:.1f}s) -> {out_path}")
+        return out_path
+
+    @staticmethod
+    def _start_side_task(fn, *args) -> threading.Thread:
+        """분석 결과에 영향을 주지 않는 부가 작업 (실패해도 로그만 남김)"""
+        def _run():
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"⚠️ [Media Side Task] {getattr(fn, '__name__', fn)} 실패: {e}")
+
+        t = threading.Thread(target=_run, daemon=True)
+        t.start()
+        return t
+
+    # -------------------------------------------------------------------------
+    # 동시 실행용 래퍼: 브랜치마다 풀에서 별도 커넥션 사용
+    # (psycopg2 커넥션은 스레드 간 트랜잭션 공유가 안전하지 않음)
+    # -------------------------------------------------------------------------
+    def _run_visual_branch_pooled(self, answer_id: int, media: "PreparedMedia") -> None:
+        with get_db_connection() as branch_conn:
+            self._run_visual_branch(branch_conn, answer_id, media)
+
+    def _run_audio_branch_pooled(self, answer: Dict[str, Any], answer_id: int, media: "PreparedMedia") -> None:
+        with get_db_connection() as branch_conn:
+            self._run_audio_branch(branch_conn, answer, answer_id, media)
+
+    def _visual_duration(self, media: "PreparedMedia") -> Optional[float]:
+        """구간 병렬 분석 여부 판단용 영상 길이 (단일 패스는 demux 결과, 파일 모드는 ffprobe)"""
+        if media.decoded is not None:
+            return media.decoded.duration_sec if media.decoded.has_video else None
+        try:
+            return MediaUtils.probe(media.visual_path).duration_sec
+        except Exception as e:
+            print(f"⚠️ [Visual] 길이 확인 실패 (순차 분석): {e}")
+            return None
+
+    def _run_visual_engine(self, media: "PreparedMedia", sampler: Optional[FrameSampler] = None) -> Dict[str, Any]:
+        """
+        영상에서 Visual 분석 실행 -> v0 결과
+        - 긴 영상 + 병렬 설정: 구간 병렬 / 단일 패스: 메모리의 비디오 패킷 디코드 / 파일 모드: proxy 파일
+        - sampler: 추론 프레임 선택 (기본: VISUAL_SAMPLE_FPS)
+        """
+        duration = self._visual_duration(media) if settings.VISUAL_PARALLEL_WORKERS > 1 and sampler is None else None
+
+        with engine_slot(ENGINE_VISUAL):
+            if should_run_parallel(duration):
+                # 긴 영상: 원본을 구간별로 seek 해서 여러 프로세스가 나눠 분석 (메모리의 비디오 패킷은 사용하지 않음)
+                print(f"🧩 [Visual] {duration:.0f}초 영상 구간 병렬 분석 (workers={inner_pool_workers(settings.VISUAL_PARALLEL_WORKERS)})")
+                visual_output = run_visual_parallel(media.visual_path, duration)
+                if media.decoded is not None:
+                    media.decoded.close()  # 보관해둔 비디오 패킷 해제 (PCM 은 유지)
+            elif media.decoded is not None and media.decoded.video_available:
+                # demux 때 보관한 비디오 패킷을 여기서 한 번만 디코드 (샘플러는 source_filter 규칙으로 한 스레드에서만 거름)
+                sampler = sampler or make_frame_sampler()
+                visual_output = run_visual_frames(
+                    media.decoded.iter_frames(want=source_filter(sampler)),
+                    media.decoded.duration_sec,
+                    sampler=sampler,
+                )
+            else:
+                visual_output = run_visual(media.visual_path, sampler=sampler)
+        return visual_output
+
+    def _load_live_visual(self, conn: connection, answer_id: int) -> Optional[Dict[str, Any]]:
+        """
+        녹화 중 실시간 분석 결과의 details (VISUAL_LIVE_MODE=off 이거나 없으면 None)
+        분석 프레임이 없거나 coverage 가 VISUAL_LIVE_MIN_COVERAGE 미만이면 None (저장 시 확인 전에 들어온 결과 포함)
+        """
+        if settings.VISUAL_LIVE_MODE not in ("skip", "verify"):
+            return None
+        try:
+            live = answer_repo.get_live_metrics(conn, answer_id)
+        except Exception as e:
+            try:
+                conn.rollback()
+            except:
+                pass
+            print(f"⚠️ [Live Visual] 조회 실패: {e}")
+            return None
+        if isinstance(live, str):
+            live = json.loads(live)
+        details = live_result_details(live, settings.VISUAL_LIVE_MIN_COVERAGE)
+        if live is not None and details is None:
+            print(f"⚠️ [Live Visual] 실시간 결과 사용 안 함 (실패 / 형식 불일치 / 분석 구간 부족)")
+        return details
+
+    def _verify_live_visual(self, media: "PreparedMedia", live_details: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        저fps 로 빠르게 다시 분석해 실시간 결과의 세부 점수(고개/미소/깜빡임/시선)를 모두 검증
+        - 모두 허용 범위 안이면 실시간 세부 점수(프레임이 더 많음)로 총점/피드백을 서버에서 다시 계산
+        - 하나라도 벗어나면 검증 분석 결과를 그대로 사용 (원본을 다시 디코드하지 않음)
+        클라이언트가 보낸 총점 / 피드백은 어느 경우에도 쓰지 않음
+        """
+        t0 = time.perf_counter()
+        check = self._run_visual_engine(media, FrameSampler(settings.VISUAL_LIVE_VERIFY_FPS))
+        if check.get("error"):
+            print(f"⚠️ [Live Visual] 검증 분석 실패 (실시간 결과 사용 안 함): {check['error']}")
+            return check
+
+        live_scores = clamp_sub_scores(live_details)
+        check_d = (check.get("metrics") or {}).get("details", {})
+        diffs = {k: abs(live_scores[k] - (check_d.get(k) or 0)) for k in SUB_SCORE_MAX}
+        passed = all(
+            diffs[k] <= top * settings.VISUAL_LIVE_VERIFY_TOLERANCE for k, top in SUB_SCORE_MAX.items()
+        )
+        verify = {"fps": settings.VISUAL_LIVE_VERIFY_FPS, "diffs": diffs, "passed": passed}
+        elapsed = time.perf_counter() - t0
+
+        if passed:
+            print(f"✅ [Live Visual] 검증 통과 {diffs} ({elapsed:.1f}s) -> 실시간 세부 점수로 재채점")
+            raw = compose_from_sub_scores(live_details)
+            live_info = raw["details"].get("live")
+            raw["details"]["live"] = dict(live_info if isinstance(live_info, dict) else {}, verify=verify)
+            return ok_result("visual", metrics=raw, events=[])
+
+        print(f"⚠️ [Live Visual] 검증 불일치 {diffs} ({elapsed:.1f}s) -> 검증 분석 결과 사용")
+        check_d["live"] = {"verify": verify}
+        return check
+
+    # -------------------------------------------------------------------------
+    # 1. 비주얼 브랜치 (V3 적용)
+    # -------------------------------------------------------------------------
+    def _run_visual_branch(self, conn: connection, answer_id: int, media: "PreparedMedia") -> None:
+        print(f"👁️ 비주얼 분석 시작...")
+
+        live = self._load_live_visual(conn, answer_id)
+        if live is not None and settings.VISUAL_LIVE_MODE == "skip":
+            # 녹화 중 이미 분석한 결과를 그대로 사용 (영상 디코드/추론 없음)
+            print(f"⚡ [Visual] 녹화 중 실시간 분석 결과 사용 (분석 생략, 총점은 세부 점수로 재계산)")
+            visual_output = ok_result("visual", metrics=compose_from_sub_scores(live), events=[])
+            if media.decoded is not None:
+                media.decoded.close()  # 보관해둔 비디오 패킷 해제 (PCM 은 유지)
+        elif live is not None and settings.VISUAL_LIVE_MODE == "verify":
+            visual_output = self._verify_live_visual(media, live)
+        else:
+            visual_output = self._run_visual_engine(media)
+
+        pool = landmarker_pool.stats()
+        print(
+            f"🧠 [Landmarker Pool] 사용 {pool['in_use']}/{pool['size']} | 사용률 {pool['utilization'] * 100:.0f}%"
+            f" | 대기 {pool['waits']}회 (평균 {pool['wait_avg_sec']}s, 최대 {pool['wait_max_sec']}s)"
+        )
+
+        if visual_output.get("error"):
+            print(f"❌ [Visual Engine Error] {visual_output['error']}")
+            return
+
+        try:
+            v_metrics = visual_output.get("metrics") or {}
+
+            v_score = v_metrics.get("score", 0)
+            v_feedback = v_metrics.get("feedback", "")
+            v_details = (visual_output.get("metrics") or {}).get("details", {})
+
+            details_str = json.dumps(v_details, default=str)
+
+            visual_payload = VisualDBPayload(
+                answer_id=answer_id,
+                score=v_score,
+                head_center_ratio=0.0,
+                feedback=v_feedback,
+                good_points_json=[details_str],
+                bad_points_json=[],
+            )
+
+            v_data = visual_payload.model_dump()
+            v_data["good_points_json"] = json.dumps(v_data["good_points_json"])
+            v_data["bad_points_json"] = json.dumps(v_data["bad_points_json"])
+
+            visual_repo.upsert_visual_result(conn, v_data)
+            conn.commit()
+            print(f"✅ 비주얼 분석 저장 완료")
+
+        except Exception as e:
+            try: conn.rollback()
+            except: pass
+            print(f"❌ [Visual Save Error] 결과 저장 실패: {e}")
+            traceback.print_exc()
+
+    def _load_live_voice(self, conn: connection, answer_id: int, media: "PreparedMedia") -> Optional[Dict[str, Any]]:
+        """
+        녹화 중 실시간 Voice 지표 -> run_voice(acoustic=...) 용
+        VOICE_LIVE_ANALYSIS 가 꺼져 있거나 VOICE_LIVE_MODE=off, 지표가 없거나 길이가 디코드한 PCM 과 다르면 None
+        """
+        if not settings.VOICE_LIVE_ANALYSIS or settings.VOICE_LIVE_MODE != "skip":
+            return None
+        try:
+            live = answer_repo.get_live_voice(conn, answer_id)
+        except Exception as e:
+            try:
+                conn.rollback()
+            except:
+                pass
+            print(f"⚠️ [Live Voice] 조회 실패: {e}")
+            return None
+        if isinstance(live, str):
+            live = json.loads(live)
+        acoustic = acoustic_from_result(live)
+        if acoustic is None:
+            return None
+        pcm = media.pcm
+        duration_sec = len(pcm) / float(ANALYSIS_SAMPLE_RATE) if pcm is not None else None
+        if not live_duration_matches(acoustic, duration_sec):
+            print(f"⚠️ [Live Voice] 길이 불일치 (실시간 {acoustic['duration_sec']}s / 오디오 {duration_sec}s) -> 전체 분석")
+            return None
+        return acoustic
+
+    # -------------------------------------------------------------------------
+    # 2~3. 오디오 브랜치 (STT -> 음성 분석 -> 내용 분석)
+    # -------------------------------------------------------------------------
+    def _run_audio_branch(self, conn: connection, answer: Dict[str, Any], answer_id: int, media: "PreparedMedia") -> None:
+        # -------------------------------------------------
+        # 2. STT & 음성 분석
+        # -------------------------------------------------
+
+        print(f"🗣️ STT & 음성 분석 시작...")
+        with engine_slot(ENGINE_STT):
+            stt_output = run_stt(media.audio_path, audio=media.pcm)
+        stt_text = ""
+        stt_segments = []
+
+        if stt_output.get("error"):
+            print(f"❌ [STT Error] {stt_output['error']}")
+        else:
+            stt_text = (stt_output.get("metrics") or {}).get("text", "")
+            stt_segments = (stt_output.get("metrics") or {}).get("segments", [])
+            try:
+                answer_repo.update_stt_result(conn, answer_id, stt_text)
+                conn.commit()
+                print("✅ STT 텍스트 저장 완료")
+            except Exception as e:
+                try: conn.rollback()
+                except: pass
+                print(f"⚠️ [STT Save Warning] 텍스트 저장 실패: {e}")
+
+        # 차트 데이터
+        speed_flow_data = calculate_cps_flow(stt_segments)
+
+        acoustic = self._load_live_voice(conn, answer_id, media)
+        if acoustic is not None:
+            # 녹화 중 이미 계산한 침묵/pitch 지표 사용 (STT 기반 속도 지표만 계산)
+            print(f"⚡ [Voice] 녹화 중 실시간 지표 사용 (침묵/pitch 분석 생략)")
+        voice_output = run_voice(
+            media.audio_path, stt_text=stt_text, stt_segments=stt_segments, audio=media.pcm, acoustic=acoustic,
+        )
+
+        if voice_output.get("error"):
+            print(f"❌ [Voice Engine Error] {voice_output['error']}")
+        else:
+            try:
+                metrics = voice_output.get("metrics", {})
+                
+                # 🟢 [데이터 추출] 엔진에서 넘어온 Raw Metrics
+                avg_cps = float(metrics.get("avg_cps") or 0.0)
+                high_speed_share = metrics.get("high_speed_share") # None 가능
+                voiced_ratio = float(metrics.get("voiced_ratio") or 0.0)
+                silence_count = int(metrics.get("silence_count") or 0)
+                duration_sec = float(metrics.get("duration_sec") or 1.0)
+
+                # 🟢 [점수 계산] 새로운 로직 적용
+                final_score = compute_final_voice_score(
+                    avg_cps=avg_cps,
+                    high_speed_share=high_speed_share,
+                    voiced_ratio=voiced_ratio,
+                    silence_count=silence_count
+                )
+
+                # 🟢 [피드백 생성] 점수 기반 피드백
+                feedbacks = []
+                
+                # (1) 속도 피드백
+                if avg_cps < 2.5: feedbacks.append("말하기 속도가 너무 느립니다.")
+                elif 2.5 <= avg_cps < 4.8: feedbacks.append("말하기 속도가 다소 느린 편입니다.")
+                elif 4.8 <= avg_cps <= 6.2: pass # 적정
+                elif 6.2 < avg_cps <= 8.0: feedbacks.append("말하기 속도가 다소 빠릅니다.")
+                else: feedbacks.append("말하기 속도가 너무 빠릅니다.")
+
+                # (2) 급발진 피드백
+                h_share = float(high_speed_share or 0.0)
+                if h_share >= 0.05:
+                    feedbacks.append("중간중간 말이 급격히 빨라지는 구간이 있습니다.")
+
+                # (3) 흐름(Flow) 피드백
+                vr_score = score_voiced(voiced_ratio)
+                sc_score = score_silence_30s(silence_count)
+                
+                if vr_score < 60: feedbacks.append("발화 사이의 공백이 길어 불안정해 보입니다.")
+                if sc_score < 80: feedbacks.append("말 끊김이 잦아 전달력이 떨어질 수 있습니다.")
+
+                feedback_text = " ".join(feedbacks) if feedbacks else "음성 전달력과 속도가 매우 훌륭합니다."
+
+                # DB 저장
+                voice_payload = VoiceDBPayload(
+                    answer_id=answer_id,
+                    score=final_score,
+                    feedback=feedback_text,
+                    
+                    # Raw Data 저장
+                    avg_wpm=int(metrics.get("avg_wpm") or 0),
+                    max_wpm=int(metrics.get("max_wpm") or 0),
+                    silence_count=silence_count,
+                    avg_silence_length=0.0,
+                    silence_timeline_json=[],
+                    duration_sec=duration_sec,
+                    avg_cps=avg_cps,
+                    avg_cpm=float(metrics.get("avg_cpm") or 0.0),
+                    avg_pitch=float(metrics.get("avg_pitch") or 0.0),
+                    max_pitch=float(metrics.get("max_pitch") or 0.0),
+                    pitch_std=float(metrics.get("pitch_std") or 0.0),
+                    voiced_ratio=voiced_ratio,
+                    burst_ratio=float(metrics.get("burst_ratio") or 0.0),
+                    high_speed_share=float(metrics.get("high_speed_share") or 0.0),
+                    cv_cps=float(metrics.get("cv_cps") or 0.0),
+                    
+                    good_points_json=[],
+                    bad_points_json=feedbacks,
+                    charts_json={"speed_flow": speed_flow_data}
+                )
+                
+                a_data = voice_payload.model_dump()
+                a_data["charts_json"] = {'speed_flow': speed_flow_data}
+                a_data["silence_timeline_json"] = json.dumps(a_data["silence_timeline_json"])
+                a_data["good_points_json"] = json.dumps(a_data["good_points_json"])
+                a_data["bad_points_json"] = json.dumps(a_data["bad_points_json"])
+
+                voice_repo.upsert_voice_result(conn, a_data)
+                conn.commit()
+                print(f"✅ 음성 분석 저장 완료 (점수: {final_score})")
+
+            except Exception as e:
+                try: conn.rollback()
+                except: pass
+                print(f"❌ [Voice Save Error] 결과 저장 실패: {e}")
+                traceback.print_exc()
+        # -------------------------------------------------
+        # 3. 내용 분석
+        # -------------------------------------------------
+        print(f"📝 내용 분석 시작...")
+        question_text = answer.get("question_content", "")
+        duration_sec = stt_segments[-1]["end"] if stt_segments else 0.0
+
+        content_output = run_content(
+            answer_text=stt_text,
+            question_text=question_text,
+            duration_sec=duration_sec,
+        )
+
+        if content_output.get("error"):
+            print(f"❌ [Content Engine Error] {content_output['error']}")
+        else:
+            try:
+                c_metrics = content_output.get("metrics", {})
+                l_score = c_metrics.get("logic_score", 0)
+                j_score = c_metrics.get("job_fit_score", 0)
+                t_score = c_metrics.get("time_management_score", 0)
+                final_c_score = int((l_score + j_score + t_score) / 3)
+
+                filler_count = stt_text.count("음") + stt_text.count("어")
+
+                content_payload = ContentDBPayload(
+                    answer_id=answer_id,
+                    score=final_c_score,
+                    logic_score=l_score,
+                    job_fit_score=j_score,
+                    time_management_score=t_score,
+                    filler_count=filler_count,
+                    keywords_json=c_metrics.get("keywords", []),
+                    feedback=c_metrics.get("feedback", ""),
+                    model_answer=c_metrics.get("model_answer"),
+                    summarized_text=None,
+                )
+                c_data = content_payload.model_dump()
+                c_data["keywords_json"] = json.dumps(c_data["keywords_json"])
+
+                content_repo.upsert_content_result(conn, c_data)
+                conn.commit()  # ✅ commit
+                print(f"✅ 내용 분석 저장 완료")
+
+            except Exception as e:
+                try:
+                    conn.rollback()
+                except:
+                    pass
+                print(f"❌ [Content Save Error] 결과 저장 실패: {e}")
+                traceback.print_exc()
+
     # =========================================================================
     # 기능 2: 세션 종합 리포트 생성 (모든 답변 완료 후 호출 권장)
     # =========================================================================
@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import xxhash
+from psycopg2.extensions import connection
+
+from app.core.config import settings
+from app.repositories.answer_repo import answer_repo
+from app.repositories.answer_upload_repo import answer_upload_repo
+from app.engines.common.result import ok_result
+from app.engines.visual.scoring import live_result_details
+from app.engines.voice.streaming import acoustic_from_result, live_duration_matches
+from app.utils.media_store import media_store, hash_file
+from app.utils.media_utils import MediaUtils
+
+
+class UploadError(ValueError):
+    """업로드 요청 오류 (API 에서 status_code 로 변환)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _clean_live_visual(live: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    저장할 v0 Visual 결과 (실패 결과 / 다른 형식이면 None -> 저장하지 않음)
+    분석 때는 세부 점수만 쓰고 총점은 서버에서 다시 계산하므로 세부 점수가 모두 숫자여야 함
+    분석 프레임이 없거나 coverage 가 VISUAL_LIVE_MIN_COVERAGE 미만인 결과도 저장하지 않음
+    details 는 형식을 확인한 키만 남기고 (timeline 길이 / 증가 여부 등) 클라이언트의 score / feedback 은 버림
+    """
+    details = live_result_details(live, settings.VISUAL_LIVE_MIN_COVERAGE)
+    if details is None:
+        return None
+    return ok_result("visual", metrics={"details": details}, events=[])
+
+
+def _valid_live_voice(live: Optional[Dict[str, Any]], duration_sec: Optional[float]) -> bool:
+    """
+    v0 Voice 결과 형식 확인 (분석 때 쓰는 오디오 지표 키가 모두 있어야 저장)
+    VOICE_LIVE_ANALYSIS 가 꺼져 있거나, duration_sec 가 업로드 파일 probe 길이와 다르면 (probe 실패 포함) 저장하지 않음
+    """
+    if not settings.VOICE_LIVE_ANALYSIS:
+        return False
+    acoustic = acoustic_from_result(live)
+    return acoustic is not None and live_duration_matches(acoustic, duration_sec)
+
+
+class AnswerUploadService:
+    """
+    이어받기 가능한 답변 영상 업로드
+    - init: answer_uploads 행 + 빈 임시 파일 생성
+    - write_chunk: offset == received_bytes 인 청크만 받아 이어 쓰기 (아니면 409 -> 클라이언트가 상태 조회 후 재개)
+    - complete: 원본 저장소로 옮기고 answers 행 생성
+
+    해시는 청크를 쓰면서 프로세스 메모리에서 이어서 계산하고,
+    API 프로세스가 여러 개이거나 재시작되어 상태가 끊긴 경우에만 complete 때 파일을 다시 읽어 계산합니다.
+    """
+
+    def __init__(self):
+        # upload_id -> (해시에 반영된 바이트 수, hasher)
+        self._hashers: Dict[str, Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # 업로드 시작 / 조회
+    # =========================================================================
+    def init_upload(
+        self,
+        conn: connection,
+        user_id: int,
+        question_id: int,
+        *,
+        filename: Optional[str] = None,
+        total_bytes: Optional[int] = None,
+        duration_sec: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        # 크기/길이를 미리 알려준 경우 바이트를 받기 전에 거절
+        if total_bytes is not None and total_bytes > settings.UPLOAD_MAX_BYTES:
+            raise UploadError(f"파일이 너무 큽니다. (최대 {settings.UPLOAD_MAX_BYTES} bytes)", 413)
+        if duration_sec is not None and duration_sec > settings.UPLOAD_MAX_DURATION_SEC:
+            raise UploadError(f"영상이 너무 깁니다. (최대 {settings.UPLOAD_MAX_DURATION_SEC:.0f}초)", 413)
+
+        ext = os.path.splitext(filename or "")[1].lower() or ".mp4"
+        upload_id = uuid.uuid4().hex
+        tmp_path = media_store.new_tmp_path(".upload")
+        tmp_path.touch()
+
+        try:
+            row = answer_upload_repo.create(
+                conn, upload_id, user_id, question_id, str(tmp_path),
+                filename=filename, ext=ext, total_bytes=total_bytes, duration_sec=duration_sec,
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self._hashers[upload_id] = (0, xxhash.xxh3_128())
+        return row
+
+    def get_owned(self, conn: connection, upload_id: str, user_id: int, *, for_update: bool = False) -> Dict[str, Any]:
+        row = answer_upload_repo.get_by_id(conn, upload_id, for_update=for_update)
+        if not row or row["user_id"] != user_id:
+            raise UploadError("업로드를 찾을 수 없습니다.", 404)
+        return row
+
+    # =========================================================================
+    # 청크 쓰기
+    # =========================================================================
+    def write_chunk(
+        self,
+        conn: connection,
+        user_id: int,
+        upload_id: str,
+        offset: int,
+        data: bytes,
+    ) -> Dict[str, Any]:
+        row = self.get_owned(conn, upload_id, user_id, for_update=True)
+        if row["status"] != "UPLOADING":
+            raise UploadError(f"이미 종료된 업로드입니다. ({row['status']})", 409)
+        if offset != row["received_bytes"]:
+            raise UploadError(f"offset 불일치: 서버는 {row['received_bytes']} bytes 까지 받았습니다.", 409)
+
+        new_size = offset + len(data)
+        if new_size > settings.UPLOAD_MAX_BYTES:
+            self._abort(conn, row)
+            raise UploadError(f"파일이 너무 큽니다. (최대 {settings.UPLOAD_MAX_BYTES} bytes)", 413)
+        if row["total_bytes"] is not None and new_size > row["total_bytes"]:
+            raise UploadError(f"선언한 크기({row['total_bytes']} bytes)를 넘었습니다.", 400)
+
+        # 이전 요청이 파일에는 썼지만 DB 갱신 전에 끊긴 경우를 대비해 offset 에서 다시 쓰고 뒤를 잘라냄
+        with open(row["tmp_path"], "r+b") as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+
+        self._update_hasher(upload_id, offset, data)
+
+        answer_upload_repo.advance(conn, upload_id, offset, new_size)
+        conn.commit()
+        return dict(row, received_bytes=new_size)
+
+    def _update_hasher(self, upload_id: str, offset: int, data: bytes) -> None:
+        with self._lock:
+            state = self._hashers.get(upload_id)
+            if state is None and offset == 0:
+                state = (0, xxhash.xxh3_128())
+            if state is None or state[0] != offset:
+                # 다른 프로세스가 받은 청크가 섞임 -> complete 때 파일 전체를 다시 해시
+                self._hashers.pop(upload_id, None)
+                return
+            hasher = state[1]
+            hasher.update(data)
+            self._hashers[upload_id] = (offset + len(data), hasher)
+
+    # =========================================================================
+    # 완료 / 중단
+    # =========================================================================
+    def complete(
+        self,
+        conn: connection,
+        user_id: int,
+        upload_id: str,
+        *,
+        live_visual: Optional[Dict[str, Any]] = None,
+        live_voice: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        업로드 완료 처리 -> (answer, 이번 요청에서 새로 만들었는지)
+        이미 완료된 업로드면 기존 answer 를 그대로 반환 (재시도 안전)
+        - live_visual: 녹화 중 실시간 Visual 분석 결과 (형식이 맞을 때만 세부 점수 + 확인한 details 를 answers.live_metrics_json 에 저장)
+        - live_voice: 녹화 중 실시간 Voice 지표
+          (VOICE_LIVE_ANALYSIS 가 켜져 있고 형식 / 길이가 맞을 때만 answers.live_voice_json 에 저장)
+        """
+        row = self.get_owned(conn, upload_id, user_id, for_update=True)
+        if row["status"] == "COMPLETED" and row["answer_id"]:
+            conn.rollback()
+            return answer_repo.get_by_id(conn, row["answer_id"]), False
+        if row["status"] != "UPLOADING":
+            raise UploadError(f"이미 종료된 업로드입니다. ({row['status']})", 409)
+
+        received = row["received_bytes"]
+        if received <= 0:
+            raise UploadError("받은 데이터가 없습니다.", 400)
+        if row["total_bytes"] is not None and received != row["total_bytes"]:
+            raise UploadError(f"아직 업로드 중입니다. ({received}/{row['total_bytes']} bytes)", 409)
+
+        tmp_path = Path(row["tmp_path"])
+        if not tmp_path.exists() or tmp_path.stat().st_size != received:
+            raise UploadError("임시 파일이 손상되었습니다. 처음부터 다시 업로드해주세요.", 409)
+
+        # 실제 길이 확인 (ffprobe 실패는 업로드를 막지 않음)
+        try:
+            duration = MediaUtils.probe(str(tmp_path)).duration_sec
+        except Exception as e:
+            print(f"⚠️ [Upload] {upload_id} probe 실패 (길이 검사 생략): {e}")
+            duration = None
+        if duration is not None and duration > settings.UPLOAD_MAX_DURATION_SEC:
+            self._abort(conn, row)
+            raise UploadError(f"영상이 너무 깁니다. (최대 {settings.UPLOAD_MAX_DURATION_SEC:.0f}초)", 413)
+
+        digest = self._pop_digest(upload_id, received) or hash_file(str(tmp_path))
+        stored = media_store.commit_file(tmp_path, digest, received, row["ext"])
+
+        try:
+            answer = answer_repo.create(conn, question_id=row["question_id"], video_path=stored.path)
+            clean_visual = _clean_live_visual(live_visual)
+            if clean_visual is not None:
+                answer_repo.update_live_metrics(conn, answer["answer_id"], json.dumps(clean_visual, ensure_ascii=False))
+            if _valid_live_voice(live_voice, duration):
+                answer_repo.update_live_voice(conn, answer["answer_id"], json.dumps(live_voice, ensure_ascii=False))
+            elif live_voice is not None:
+                print(f"⚠️ [Upload] {upload_id} 실시간 Voice 지표 저장 안 함 (기능 꺼짐 / 형식 또는 길이 불일치)")
+            answer_upload_repo.mark_completed(conn, upload_id, digest, answer["answer_id"])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # 이번에 새로 만든 원본만 삭제 (DB 실패 시 고아 파일 방지)
+            if not stored.deduplicated and os.path.exists(stored.path):
+                os.remove(stored.path)
+            raise
+
+        print(f"📦 [Upload] {upload_id} 완료 -> Answer ID {answer['answer_id']} ({received} bytes)")
+        return answer, True
+
+    def _pop_digest(self, upload_id: str, received: int) -> Optional[str]:
+        with self._lock:
+            state = self._hashers.pop(upload_id, None)
+        if state and state[0] == received:
+            return state[1].hexdigest()
+        return None
+
+    def abort(self, conn: connection, user_id: int, upload_id: str) -> Dict[str, Any]:
+        row = self.get_owned(conn, upload_id, user_id, for_update=True)
+        if row["status"] == "UPLOADING":
+            self._abort(conn, row)
+        return answer_upload_repo.get_by_id(conn, upload_id)
+
+    def _abort(self, conn: connection, row: Dict[str, Any]) -> None:
+        answer_upload_repo.mark_aborted(conn, row["upload_id"])
+        conn.commit()
+        with self._lock:
+            self._hashers.pop(row["upload_id"], None)
+        Path(row["tmp_path"]).unlink(missing_ok=True)
+
+
+answer_upload_service = AnswerUploadService()
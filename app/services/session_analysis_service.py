@@ -0,0 +1,209 @@
+import multiprocessing
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from psycopg2.extensions import connection
+
+from app.core.config import settings
+from app.core.concurrency import (
+    ENGINE_STT,
+    ENGINE_VISUAL,
+    cpu_budget,
+    disable_inner_pools,
+    install_engine_slots,
+)
+from app.core.db import get_db_connection
+from app.repositories.answer_repo import answer_repo
+from app.services.analysis_service import analysis_service, CLAIMABLE_STATUSES
+
+TERMINAL_STATUSES = ("DONE", "FAILED")
+
+
+# =========================================================
+# 워커 프로세스 쪽 함수 (spawn 된 프로세스에서 실행)
+# - 모듈 최상위 함수여야 pickle 가능
+# - spawn 된 프로세스가 이 모듈을 import 하면서 app.core.db 풀도 프로세스별로 새로 만들어짐
+# =========================================================
+def _init_worker(engine_slots: Dict[str, Any]) -> None:
+    install_engine_slots(engine_slots)
+    # 답변 단위로 이미 프로세스를 나눴으므로 엔진 내부 프로세스 풀(Visual/Voice 병렬)은 사용하지 않음
+    disable_inner_pools()
+
+
+def run_answer_analysis_task(
+    answer_id: int,
+    video_path: str,
+    claim_from: Optional[Tuple[str, ...]] = CLAIMABLE_STATUSES,
+) -> Optional[Dict[str, float]]:
+    """풀에서 받은 자기 커넥션으로 답변 1개 분석 (워커 프로세스 / 업로드 직후 백그라운드 작업용)"""
+    with get_db_connection() as conn:
+        return analysis_service.run_answer_analysis(conn, answer_id, video_path, claim_from=claim_from)
+
+
+# =========================================================
+# 이 프로세스에 예약된 eager 분석 (background 모드)
+# - BackgroundTasks 는 응답 후에 실행되므로 예약 ~ 시작 사이에는 답변이 아직 PENDING
+# - 세션 파이프라인은 PROCESSING 답변과 여기 등록된 답변만 기다림
+# =========================================================
+_eager_answers: Set[int] = set()
+_eager_lock = threading.Lock()
+
+
+def register_eager_analysis(answer_id: int) -> None:
+    with _eager_lock:
+        _eager_answers.add(answer_id)
+
+
+def eager_registered(answer_id: int) -> bool:
+    with _eager_lock:
+        return answer_id in _eager_answers
+
+
+def run_eager_answer_analysis(answer_id: int, video_path: str) -> Optional[Dict[str, float]]:
+    """업로드 직후 예약된 분석 (PENDING 일 때만 가져감, 끝나면 등록 해제)"""
+    try:
+        return run_answer_analysis_task(answer_id, video_path, claim_from=("PENDING",))
+    finally:
+        with _eager_lock:
+            _eager_answers.discard(answer_id)
+
+
+class SessionAnalysisService:
+    """
+    세션 내 답변들을 워커 프로세스 풀에 나눠 분석합니다.
+    - 워커 수: settings.ANALYSIS_SESSION_WORKERS
+    - MediaPipe / Whisper 동시 실행 수는 프로세스 간 공유 세마포어로 제한
+    """
+
+    def analyze_answers(
+        self,
+        conn: connection,
+        answers: List[Dict[str, Any]],
+        *,
+        workers: Optional[int] = None,
+        claim_from: Optional[Tuple[str, ...]] = CLAIMABLE_STATUSES,
+    ) -> Dict[int, Optional[Dict[str, float]]]:
+        """
+        answers(video_path가 있는 것만)를 분석하고 answer_id -> 구간별 소요 시간을 반환합니다.
+        워커가 1개 이하이면 전달받은 conn으로 순차 실행합니다.
+        - claim_from: 이 상태인 답변만 가져가서 분석 (다른 곳에서 분석 중인 답변은 건너뜀, 결과 None)
+        끝나면 직접 가져간 답변은 모두 종료 상태(DONE/FAILED)가 됩니다.
+        """
+        if workers is None:
+            workers = settings.ANALYSIS_SESSION_WORKERS
+
+        targets = [a for a in answers if a.get("video_path")]
+        results: Dict[int, Optional[Dict[str, float]]] = {}
+        crashed: List[int] = []
+        if not targets:
+            return results
+
+        if min(workers, cpu_budget()) <= 1 or len(targets) == 1:
+            for ans in targets:
+                results[ans["answer_id"]] = analysis_service.run_answer_analysis(
+                    conn, ans["answer_id"], ans["video_path"], claim_from=claim_from
+                )
+                # 하나 끝날 때마다 커밋 (중간에 실패해도 앞부분은 저장되도록)
+                conn.commit()
+        else:
+            results.update(self._analyze_in_pool(targets, workers, claim_from, crashed))
+
+        # 건너뛴 답변(결과 None, 다른 곳에서 분석 중)은 상태를 건드리지 않음 / 워커가 죽은 답변은 FAILED 로 정리
+        self.finalize_statuses(conn, [aid for aid, timing in results.items() if timing is not None] + crashed)
+        return results
+
+    def _analyze_in_pool(
+        self,
+        targets: List[Dict[str, Any]],
+        workers: int,
+        claim_from: Optional[Tuple[str, ...]],
+        crashed: List[int],
+    ) -> Dict[int, Optional[Dict[str, float]]]:
+        results: Dict[int, Optional[Dict[str, float]]] = {}
+
+        # fork는 psycopg2 커넥션/풀, MediaPipe 스레드를 그대로 복제하므로 spawn 사용
+        ctx = multiprocessing.get_context("spawn")
+        engine_slots = {
+            ENGINE_VISUAL: ctx.BoundedSemaphore(max(1, settings.ANALYSIS_MAX_VISUAL_JOBS)),
+            ENGINE_STT: ctx.BoundedSemaphore(max(1, settings.ANALYSIS_MAX_STT_JOBS)),
+        }
+
+        max_workers = min(workers, len(targets), cpu_budget())
+        print(f"🧵 [Session Workers] {len(targets)}개 답변을 {max_workers}개 프로세스로 분석")
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(engine_slots,),
+        ) as pool:
+            futures = {
+                pool.submit(run_answer_analysis_task, ans["answer_id"], ans["video_path"], claim_from): ans["answer_id"]
+                for ans in targets
+            }
+            for future in as_completed(futures):
+                answer_id = futures[future]
+                try:
+                    results[answer_id] = future.result()
+                except Exception as e:
+                    # 워커 프로세스 자체가 죽은 경우 (BrokenProcessPool 등)
+                    print(f"💥 [Worker Error] Answer ID {answer_id}: {e}")
+                    print(traceback.format_exc())
+                    results[answer_id] = None
+                    crashed.append(answer_id)
+
+        return results
+
+    def finalize_statuses(self, conn: connection, answer_ids: List[int]) -> None:
+        """
+        워커가 비정상 종료해 PENDING/PROCESSING에 머문 답변을 FAILED로 정리합니다.
+        이후 모든 대상 답변은 종료 상태(DONE/FAILED)가 됩니다.
+        """
+        for answer_id in answer_ids:
+            row = answer_repo.get_by_id(conn, answer_id)
+            if row and row.get("analysis_status") not in TERMINAL_STATUSES:
+                answer_repo.update_analysis_status(conn, answer_id, "FAILED")
+                print(f"⚠️ [Session Workers] Answer ID {answer_id} 종료 상태 아님 -> FAILED")
+        conn.commit()
+
+    def wait_for_terminal(
+        self,
+        conn: connection,
+        session_id: int,
+        *,
+        timeout_sec: float,
+        poll_sec: float = 2.0,
+    ) -> List[Dict[str, Any]]:
+        """
+        업로드 직후 시작된(eager) 분석이 끝나기를 기다립니다.
+        - 기다리는 대상: PROCESSING 답변 + 이 프로세스에 eager 분석이 예약된 답변
+          (예약 실패 / 서버 재시작 / eager 꺼진 상태의 업로드로 PENDING 에 머문 답변은 기다리지 않음)
+        timeout 안에 끝나지 않은 답변 목록을 반환합니다. (모두 끝났으면 빈 리스트)
+        """
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            # 다른 커넥션이 커밋한 상태 변화를 보기 위해 트랜잭션을 새로 시작
+            conn.rollback()
+            running = [
+                r for r in answer_repo.get_all_by_session_id(conn, session_id)
+                if r.get("video_path") and r.get("analysis_status") not in TERMINAL_STATUSES
+                and (r.get("analysis_status") == "PROCESSING" or eager_registered(r["answer_id"]))
+            ]
+            if not running or time.monotonic() >= deadline:
+                return running
+            time.sleep(poll_sec)
+
+    def all_terminal(self, conn: connection, session_id: int) -> bool:
+        """세션 내 영상이 있는 모든 답변이 DONE/FAILED 인지 확인"""
+        rows = answer_repo.get_all_by_session_id(conn, session_id)
+        return all(
+            r.get("analysis_status") in TERMINAL_STATUSES
+            for r in rows
+            if r.get("video_path")
+        )
+
+
+session_analysis_service = SessionAnalysisService()
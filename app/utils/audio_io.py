@@ -0,0 +1,86 @@
+# app/utils/audio_io.py
+"""
+분석용 16kHz mono float32 PCM 로드 (STT / Voice 엔진 공용)
+
+- 전처리가 만든 WAV(pcm_s16le, 16kHz, mono)는 soundfile 로 바로 읽음 (ffmpeg / 리샘플 없음)
+  길이가 AUDIO_MMAP_MIN_SEC 이상이면 data 청크를 메모리 매핑해서 블록 단위로 float32 변환 (int16 전체 복사본을 만들지 않음)
+- 다른 샘플레이트 / 채널이면 soundfile 로 읽은 뒤 mono 평균 + soxr 리샘플 (librosa.load 와 같은 방식)
+- soundfile 이 못 읽는 형식(mp4/m4a 등)은 librosa.load 로 대체
+
+값은 whisper.load_audio (s16le / 32768) / librosa.load(sr=16000) 와 같은 스케일이므로
+엔진에 경로 대신 넘겨도 결과가 바뀌지 않음
+"""
+from __future__ import annotations
+
+import os
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from app.utils.media_decode import ANALYSIS_SAMPLE_RATE
+
+# 이 길이 이상인 16kHz mono PCM_16 WAV 는 메모리 매핑으로 읽음
+AUDIO_MMAP_MIN_SEC = 60.0
+_MMAP_BLOCK_SAMPLES = 1 << 20
+
+
+def load_pcm(path: str, sr: int = ANALYSIS_SAMPLE_RATE) -> np.ndarray:
+    """오디오 파일 -> sr Hz mono float32 [-1, 1]"""
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"audio file not found: {path}")
+
+    try:
+        info = sf.info(path)
+    except Exception:
+        # 컨테이너 형식 (soundfile 미지원) -> librosa (audioread / ffmpeg) 로 대체
+        import librosa
+        y, _ = librosa.load(path, sr=sr, mono=True)
+        return np.ascontiguousarray(y, dtype=np.float32)
+
+    if info.samplerate == sr and info.channels == 1 and info.subtype == "PCM_16":
+        if info.frames / float(sr) >= AUDIO_MMAP_MIN_SEC:
+            data = _wav_data_chunk(path)
+            if data is not None:
+                return _pcm16_mmap_to_float(path, *data)
+        y, _ = sf.read(path, dtype="float32", always_2d=False)
+        return np.ascontiguousarray(y, dtype=np.float32)
+
+    y, file_sr = sf.read(path, dtype="float32", always_2d=True)
+    y = y.mean(axis=1) if y.shape[1] > 1 else y[:, 0]
+    if file_sr != sr:
+        import soxr
+        y = soxr.resample(y, file_sr, sr, quality="soxr_hq")
+    return np.ascontiguousarray(y, dtype=np.float32)
+
+
+def _wav_data_chunk(path: str) -> Optional[Tuple[int, int]]:
+    """RIFF/WAVE 의 data 청크 (offset, 샘플 수). 해석할 수 없으면 None"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+        pos = 12
+        while pos + 8 <= size:
+            f.seek(pos)
+            chunk_id, chunk_size = struct.unpack("<4sI", f.read(8))
+            if chunk_id == b"data":
+                # ffmpeg 가 스트리밍으로 쓴 경우 크기가 0 / 0xFFFFFFFF 일 수 있음 -> 파일 끝까지
+                end = size if chunk_size in (0, 0xFFFFFFFF) else min(size, pos + 8 + chunk_size)
+                return pos + 8, (end - pos - 8) // 2
+            pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _pcm16_mmap_to_float(path: str, offset: int, n_samples: int) -> np.ndarray:
+    pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(n_samples,))
+    out = np.empty(n_samples, dtype=np.float32)
+    try:
+        for start in range(0, n_samples, _MMAP_BLOCK_SAMPLES):
+            block = pcm[start:start + _MMAP_BLOCK_SAMPLES]
+            np.multiply(block, np.float32(1.0 / 32768.0), out=out[start:start + len(block)], casting="unsafe")
+    finally:
+        del pcm
+    return out
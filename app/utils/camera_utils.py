@@ -1,33 +1,181 @@
+import time
 import cv2
 import numpy as np
 import av
-from streamlit_webrtc import VideoProcessorBase
+from streamlit_webrtc import AudioProcessorBase, VideoProcessorBase
+
+from app.core.config import settings
 
 # OpenCV 얼굴 탐지 모델 로드
 face_cascade = cv2.CascadeClassifier(
     cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
 )
 
+# 마지막 탐지/추적 성공 후 박스를 유지하는 시간 (넘으면 얼굴 없음으로 표시)
+BOX_TTL_SEC = 1.0
+# 템플릿 매칭 최소 유사도 (미만이면 추적 실패 -> 다음 탐지까지 마지막 박스 유지)
+TRACK_MIN_SCORE = 0.6
+
+
+class FaceGuideDetector:
+    """
+    가이드 오버레이용 얼굴 박스 (세션당 1개, recv 스레드 전용)
+    - 축소 프레임(FACE_GUIDE_DETECT_WIDTH)에서 N 프레임마다 Haar 탐지, 사이 프레임은 마지막 박스 재사용
+    - FACE_GUIDE_TRACKING 이면 사이 프레임에서 마지막 박스 주변만 템플릿 매칭으로 추적
+    - 탐지/추적에 쓴 시간이 CPU 예산(FACE_GUIDE_CPU_BUDGET)을 넘지 않도록 다음 실행 시각을 미룸
+    """
+
+    def __init__(self, *, detect_width=None, detect_every=None, tracking=None, cpu_budget=None):
+        self.detect_width = max(64, int(detect_width or settings.FACE_GUIDE_DETECT_WIDTH))
+        self.detect_every = max(1, int(detect_every or settings.FACE_GUIDE_DETECT_EVERY))
+        self.tracking = settings.FACE_GUIDE_TRACKING if tracking is None else tracking
+        self.cpu_budget = settings.FACE_GUIDE_CPU_BUDGET if cpu_budget is None else cpu_budget
+
+        self.frame_idx = 0
+        self.frames = 0
+        self.box = None            # 원본 해상도 (x, y, w, h)
+        self._box_at = 0.0
+        self._template = None      # 축소 gray 에서 자른 얼굴 (추적용)
+        self._small_box = None     # 축소 해상도 (x, y, w, h)
+        self._next_allowed = 0.0   # CPU 예산 기준 다음 탐지/추적 가능 시각
+
+        # 확인용 누적 값
+        self.detections = 0
+        self.tracks = 0
+        self.throttled = 0
+        self.busy_sec = 0.0
+        self._started = time.monotonic()
+
+    def update(self, img: np.ndarray):
+        """BGR 프레임 1개 -> 표시할 얼굴 박스 (없으면 None)"""
+        now = time.monotonic()
+        due = self.frame_idx % self.detect_every == 0
+        self.frame_idx += 1
+        self.frames += 1
+
+        if due or (self.tracking and self._template is not None):
+            if now < self._next_allowed:
+                # 예산 초과: 이번 프레임은 마지막 박스 재사용
+                if due:
+                    self.frame_idx = 0  # 예산이 풀리면 바로 탐지
+                self.throttled += 1
+            else:
+                t0 = time.perf_counter()
+                if due:
+                    self._detect(img, now)
+                else:
+                    self._track(img, now)
+                cost = time.perf_counter() - t0
+                self.busy_sec += cost
+                if self.cpu_budget > 0:
+                    self._next_allowed = now + cost / self.cpu_budget
+
+        if self.box is not None and now - self._box_at > BOX_TTL_SEC:
+            self.box = None
+            self._template = None
+        return self.box
+
+    def _small_gray(self, img: np.ndarray):
+        h, w = img.shape[:2]
+        scale = min(1.0, self.detect_width / float(w))
+        if scale < 1.0:
+            img = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), scale
+
+    def _set_box(self, small_box, scale: float, now: float) -> None:
+        x, y, fw, fh = small_box
+        self._small_box = small_box
+        self.box = (int(x / scale), int(y / scale), int(fw / scale), int(fh / scale))
+        self._box_at = now
+
+    def _detect(self, img: np.ndarray, now: float) -> None:
+        gray, scale = self._small_gray(img)
+        # 축소 프레임 기준 최소 얼굴 크기 (너무 작은 오탐 제외)
+        min_side = max(24, gray.shape[1] // 10)
+        faces = face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(min_side, min_side))
+        self.detections += 1
+        if len(faces) == 0:
+            return
+        # 가장 큰 얼굴 선택
+        x, y, fw, fh = (int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+        self._set_box((x, y, fw, fh), scale, now)
+        if self.tracking:
+            self._template = gray[y:y + fh, x:x + fw].copy()
+
+    def _track(self, img: np.ndarray, now: float) -> None:
+        gray, scale = self._small_gray(img)
+        x, y, fw, fh = self._small_box
+        # 마지막 박스 주변 (박스 크기의 절반만큼 여유) 에서만 매칭
+        gh, gw = gray.shape
+        x0, y0 = max(0, x - fw // 2), max(0, y - fh // 2)
+        x1, y1 = min(gw, x + fw + fw // 2), min(gh, y + fh + fh // 2)
+        region = gray[y0:y1, x0:x1]
+        if region.shape[0] < fh or region.shape[1] < fw:
+            return
+        self.tracks += 1
+        result = cv2.matchTemplate(region, self._template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(result)
+        if score >= TRACK_MIN_SCORE:
+            self._set_box((x0 + loc[0], y0 + loc[1], fw, fh), scale, now)
+
+    def stats(self) -> dict:
+        elapsed = max(1e-6, time.monotonic() - self._started)
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "tracks": self.tracks,
+            "throttled": self.throttled,
+            "cpu_ratio": round(self.busy_sec / elapsed, 4),
+        }
+
+
 class FaceGuideTransformer(VideoProcessorBase):
-    def __init__(self):
+    def __init__(self, live_visual: bool = False):
             # 이제 프레임 리스트를 만들지 않습니다. (메모리 절약)
-            pass
+            # live_visual: 녹화 중 샘플링한 프레임으로 V3 Visual 분석을 미리 누적 (업로드 후 분석 생략/검증용)
+            self.live = None
+            self.guide = FaceGuideDetector()
+            if live_visual:
+                try:
+                    # MediaPipe 는 실시간 분석을 켤 때만 로드
+                    from app.engines.visual.live import LiveVisualAccumulator
+                    self.live = LiveVisualAccumulator()
+                except Exception as e:
+                    print(f"⚠️ [Live Visual] 시작 실패 (업로드 후 분석으로 진행): {e}")
+
+    def finish_live(self):
+        """녹화 종료 시 호출 -> v0 Visual 결과 (실시간 분석을 안 켰거나 실패 / 분석 구간 부족이면 None)"""
+        if self.live is None:
+            return None
+        try:
+            result = self.live.finish()
+        except Exception as e:
+            print(f"⚠️ [Live Visual] 채점 실패: {e}")
+            return None
+        if result.get("error"):
+            print(f"⚠️ [Live Visual] 실시간 결과 사용 안 함: {result['error']}")
+            return None
+        return result
 
     def recv(self, frame: av.VideoFrame) -> av.VideoFrame:
         img = frame.to_ndarray(format="bgr24")
+
+        if self.live is not None:
+            # 가이드 오버레이를 그리기 전 원본 프레임으로 분석
+            ts_ms = int(frame.time * 1000) if frame.time is not None else int(time.monotonic() * 1000)
+            self.live.offer(ts_ms, img)
         
         try:
             h, w, _ = img.shape
             center_x, center_y = w // 2, int(h * 0.45)
             radius = int(w * 0.18)
 
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(gray, 1.1, 5)
+            # 축소 프레임에서 N 프레임마다 탐지 (사이 프레임은 마지막 박스 재사용)
+            box = self.guide.update(img)
             
             is_inside = False
-            if len(faces) > 0:
-                # 가장 큰 얼굴 선택
-                x, y, fw, fh = max(faces, key=lambda f: f[2]*f[3])
+            if box is not None:
+                x, y, fw, fh = box
                 face_x = x + fw // 2
                 face_y = y + fh // 2
                 # 얼굴 중심이 가이드 원 안에 있는지 확인
@@ -46,5 +194,41 @@ class FaceGuideTransformer(VideoProcessorBase):
         # 처리된 이미지를 다시 프레임으로 변환하여 반환
         return av.VideoFrame.from_ndarray(img, format="bgr24")
 
+class LiveVoiceProcessor(AudioProcessorBase):
+    """
+    녹화 중 오디오를 16kHz mono 로 바꿔 VoiceAccumulator 에 누적 (VOICE_LIVE_ANALYSIS 일 때만 연결)
+    - 녹화 파일(MediaRecorder)은 입력 트랙을 그대로 저장하므로 영향 없음
+    """
+
+    def __init__(self):
+        self.live = None
+        self._resampler = av.AudioResampler(format="flt", layout="mono", rate=16000)
+        try:
+            # librosa 는 실시간 분석을 켤 때만 로드
+            from app.engines.voice.streaming import VoiceAccumulator
+            self.live = VoiceAccumulator()
+        except Exception as e:
+            print(f"⚠️ [Live Voice] 시작 실패 (업로드 후 분석으로 진행): {e}")
+
+    def finish_live(self):
+        """녹화 종료 시 호출 -> v0 Voice 결과 (STT 기반 속도 지표는 비어 있음, 실패 시 None)"""
+        if self.live is None:
+            return None
+        result = self.live.finalize()
+        if result.get("error"):
+            print(f"⚠️ [Live Voice] 집계 실패: {result['error']}")
+            return None
+        return result
+
+    def recv(self, frame: av.AudioFrame) -> av.AudioFrame:
+        if self.live is not None:
+            try:
+                for out in self._resampler.resample(frame):
+                    self.live.push(out.to_ndarray().reshape(-1))
+            except Exception as e:
+                print(f"⚠️ [Live Voice] 누적 중단: {e}")
+                self.live = None
+        return frame
+
 # [중요] AudioRecorder 클래스는 더 이상 필요 없습니다. 
 # MediaRecorder가 내부적으로 오디오 스트림을 가로채서 바로 저장하기 때문입니다.
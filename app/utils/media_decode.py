@@ -0,0 +1,301 @@
+# app/utils/media_decode.py
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+
+import av
+import numpy as np
+
+from app.core.config import settings
+from app.utils.media_utils import MediaToolError
+
+ANALYSIS_SAMPLE_RATE = 16000
+# 프레임 timestamp 는 ms 정수로 반올림/버림되어 있으므로 격자 경계 판단에 1ms 여유 (30fps 의 3번째 프레임 = 99.99ms -> 100ms 칸)
+GRID_TOLERANCE_MS = 1
+
+
+def analysis_frame_limits() -> Tuple[int, int]:
+    """Visual 분석용 프레임 최대 크기 (proxy 사용 시 proxy 해상도, 아니면 재생용과 같은 720p)"""
+    if settings.MEDIA_ANALYSIS_PROXY:
+        return settings.MEDIA_ANALYSIS_PROXY_MAX_WIDTH, settings.MEDIA_ANALYSIS_PROXY_MAX_HEIGHT
+    return 1280, 720
+
+
+def analysis_frame_rate() -> float:
+    """
+    Visual 분석용 최대 fps (proxy 사용 시 MEDIA_ANALYSIS_PROXY_FPS, 아니면 0 = 원본 fps)
+    파일 모드 proxy(ffmpeg fps 필터)와 디코드 경로(단일 패스 / 구간 병렬)가 같은 상한을 쓰도록 함
+    """
+    if settings.MEDIA_ANALYSIS_PROXY:
+        return float(settings.MEDIA_ANALYSIS_PROXY_FPS)
+    return 0.0
+
+
+def grid_slot(ts_ms: int, interval_ms: float) -> int:
+    """영상 시간 0 기준 interval_ms 격자에서 ts_ms 가 속한 칸 번호"""
+    return int((ts_ms + GRID_TOLERANCE_MS) // interval_ms)
+
+
+class FrameRateCap:
+    """
+    디코드한 프레임을 max_fps 이하로 솎아냄 (RGB 변환 전에 호출)
+    - 영상 시간 0 기준 1000/max_fps ms 격자 칸마다 첫 프레임만 통과 (원본 fps 가 더 낮으면 모두 통과)
+      격자 칸 계산은 FrameSampler 와 같음 (grid_slot)
+    - 샘플러의 깜빡임 burst 도 이 fps 를 넘지 않음 (파일 모드 proxy 와 같은 입력)
+    """
+
+    def __init__(self, max_fps: float):
+        self.interval_ms = 1000.0 / max_fps if max_fps and max_fps > 0 else 0.0
+        self._slot: Optional[int] = None
+
+    def accept(self, ts_ms: int) -> bool:
+        if self.interval_ms <= 0:
+            return True
+        slot = grid_slot(ts_ms, self.interval_ms)
+        if slot == self._slot:
+            return False
+        self._slot = slot
+        return True
+
+
+def fit_size(w: int, h: int, max_width: int, max_height: int) -> Tuple[int, int]:
+    """compress_video 와 같은 규칙: 비율 유지하며 max_width x max_height 안으로, 짝수 보정"""
+    if w <= 0 or h <= 0:
+        return w, h
+    scale = min(1.0, max_width / w, max_height / h)
+    tw = max(2, int(w * scale) // 2 * 2)
+    th = max(2, int(h * scale) // 2 * 2)
+    return tw, th
+
+
+def _to_rgb(frame: "av.VideoFrame", tw: int, th: int) -> np.ndarray:
+    if (frame.width, frame.height) != (tw, th):
+        return frame.reformat(width=tw, height=th, format="rgb24").to_ndarray()
+    return frame.to_ndarray(format="rgb24")
+
+
+class SinglePassMedia:
+    """
+    업로드 영상을 한 번만 demux 해서 엔진 입력을 만든다. (ffmpeg 재인코딩 / WAV 파일 없음)
+
+    - demux(): 파일을 처음부터 끝까지 한 번 읽으면서
+        * 오디오 패킷은 바로 디코드 -> 16kHz mono float32 PCM (self.pcm)
+        * 비디오 패킷은 디코드하지 않고 압축된 상태로만 보관 (메모리 ≈ 원본 영상 크기)
+      => demux가 끝나는 즉시 STT/Voice 가 PCM으로 시작할 수 있고,
+         비주얼 엔진 속도에 오디오 쪽이 묶이지 않음
+    - iter_frames(): 보관한 비디오 패킷을 순서대로 한 번 디코드해서 (timestamp_ms, RGB ndarray)를 흘려보냄
+      (소비한 패킷은 바로 버림)
+
+    사용 예)
+        media = SinglePassMedia(path)
+        media.demux()
+        run_stt(None, audio=media.pcm)
+        run_visual_frames(media.iter_frames(), media.duration_sec)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        sample_rate: int = ANALYSIS_SAMPLE_RATE,
+        max_width: int = 1280,
+        max_height: int = 720,
+        max_fps: float = 0.0,
+    ):
+        if not Path(path).exists():
+            raise FileNotFoundError(f"video not found: {path}")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_width = max_width
+        self.max_height = max_height
+        self.max_fps = max_fps
+
+        self.pcm: Optional[np.ndarray] = None
+        self.fps: float = 0.0
+        self.duration_sec: float = 0.0
+        self.width: int = 0
+        self.height: int = 0
+
+        self._container = None
+        self._vstream = None
+        self._video_packets: Deque[av.Packet] = deque()
+        self._demuxed = False
+
+    # ---------------------------------------------------------
+    # 1) 단일 demux 패스
+    # ---------------------------------------------------------
+    def demux(self) -> "SinglePassMedia":
+        if self._demuxed:
+            return self
+
+        try:
+            container = av.open(self.path)
+        except Exception as e:
+            raise MediaToolError(f"영상 열기 실패: {e}") from e
+        self._container = container
+
+        vstream = container.streams.video[0] if container.streams.video else None
+        astream = container.streams.audio[0] if container.streams.audio else None
+        if vstream is None and astream is None:
+            container.close()
+            raise MediaToolError("영상/오디오 스트림이 없습니다.")
+
+        streams = []
+        if vstream is not None:
+            vstream.thread_type = "AUTO"  # 프레임/슬라이스 멀티스레드 디코드
+            self._vstream = vstream
+            self.width = int(vstream.codec_context.width or 0)
+            self.height = int(vstream.codec_context.height or 0)
+            rate = vstream.average_rate or vstream.guessed_rate
+            self.fps = float(rate) if rate else 0.0
+            streams.append(vstream)
+        if astream is not None:
+            streams.append(astream)
+
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=self.sample_rate) if astream else None
+        chunks: List[np.ndarray] = []
+
+        try:
+            for packet in container.demux(*streams):
+                if packet.stream is vstream:
+                    # 마지막 빈 패킷(flush)도 그대로 보관 -> iter_frames 에서 디코더 flush
+                    self._video_packets.append(packet)
+                    continue
+
+                for frame in packet.decode():
+                    for rf in resampler.resample(frame):
+                        chunks.append(rf.to_ndarray().reshape(-1))
+
+            if resampler is not None:
+                for rf in resampler.resample(None):
+                    chunks.append(rf.to_ndarray().reshape(-1))
+        except Exception as e:
+            self.close()
+            raise MediaToolError(f"demux/오디오 디코드 실패: {e}") from e
+
+        self.pcm = (
+            np.ascontiguousarray(np.concatenate(chunks), dtype=np.float32)
+            if chunks else np.zeros(0, dtype=np.float32)
+        )
+
+        # 길이: 컨테이너 메타데이터 -> 오디오 길이 순으로 사용
+        if container.duration:
+            self.duration_sec = float(container.duration / av.time_base)
+        elif vstream is not None and vstream.duration and vstream.time_base:
+            self.duration_sec = float(vstream.duration * vstream.time_base)
+        else:
+            self.duration_sec = float(len(self.pcm) / self.sample_rate)
+
+        self._demuxed = True
+        return self
+
+    @property
+    def has_video(self) -> bool:
+        return self._vstream is not None
+
+    @property
+    def video_available(self) -> bool:
+        """보관한 비디오 패킷을 아직 디코드할 수 있는지 (iter_frames / close 이후에는 False)"""
+        return self._vstream is not None and self._container is not None
+
+    def _target_size(self) -> Tuple[int, int]:
+        return fit_size(self.width, self.height, self.max_width, self.max_height)
+
+    # ---------------------------------------------------------
+    # 2) 비디오 프레임 스트림 (한 번만 소비 가능)
+    # ---------------------------------------------------------
+    def iter_frames(self, want: Optional[Callable[[int], bool]] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        want(ts_ms) 가 False 인 프레임은 디코드만 하고 RGB 변환 없이 건너뜀
+        max_fps 를 넘는 프레임도 같은 방식으로 건너뜀 (FrameRateCap)
+        (inter-frame 코덱이라 디코드 자체는 생략할 수 없음)
+        """
+        if not self._demuxed:
+            self.demux()
+        if self._vstream is None:
+            return
+
+        tw, th = self._target_size()
+        fps = self.fps or 30.0
+        cap = FrameRateCap(self.max_fps)
+        index = 0
+        try:
+            while self._video_packets:
+                packet = self._video_packets.popleft()
+                for frame in packet.decode():
+                    if frame.time is not None:
+                        ts_ms = int(round(frame.time * 1000.0))
+                    else:
+                        ts_ms = int(round(index * 1000.0 / fps))
+                    index += 1
+                    if not cap.accept(ts_ms):
+                        continue
+                    if want is not None and not want(ts_ms):
+                        continue
+
+                    yield ts_ms, _to_rgb(frame, tw, th)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._video_packets.clear()
+        if self._container is not None:
+            try:
+                self._container.close()
+            except Exception:
+                pass
+            self._container = None
+
+
+def iter_window_frames(
+    path: str,
+    start_ms: int,
+    end_ms: int,
+    *,
+    want: Optional[Callable[[int], bool]] = None,
+    max_width: int = 1280,
+    max_height: int = 720,
+    max_fps: float = 0.0,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    [start_ms, end_ms) 구간의 비디오 프레임만 (timestamp_ms, RGB) 로 흘려보냄 (병렬 구간 분석용)
+    - start_ms 직전 키프레임으로 seek 후 디코드, start_ms 이전 프레임은 RGB 변환 없이 버림
+    - timestamp 는 SinglePassMedia.iter_frames 와 같은 기준 (frame.time)
+    - max_fps: SinglePassMedia 와 같은 fps 상한 (격자가 영상 시간 기준이라 구간마다 같은 프레임 선택)
+    """
+    try:
+        container = av.open(path)
+    except Exception as e:
+        raise MediaToolError(f"영상 열기 실패: {e}") from e
+
+    try:
+        if not container.streams.video:
+            return
+        vstream = container.streams.video[0]
+        vstream.thread_type = "AUTO"
+        tw, th = fit_size(
+            int(vstream.codec_context.width or 0), int(vstream.codec_context.height or 0),
+            max_width, max_height,
+        )
+        cap = FrameRateCap(max_fps)
+
+        if start_ms > 0 and vstream.time_base:
+            container.seek(int(start_ms / 1000.0 / vstream.time_base), stream=vstream, backward=True, any_frame=False)
+
+        for frame in container.decode(vstream):
+            if frame.time is None:
+                continue
+            ts_ms = int(round(frame.time * 1000.0))
+            if ts_ms >= end_ms:
+                break
+            if ts_ms < start_ms:
+                continue
+            if not cap.accept(ts_ms):
+                continue
+            if want is not None and not want(ts_ms):
+                continue
+            yield ts_ms, _to_rgb(frame, tw, th)
+    finally:
+        container.close()
@@ -0,0 +1,245 @@
+# app/utils/media_store.py
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
+
+import xxhash
+
+from app.core.config import settings
+
+HASH_NAME = "xxh3_128"
+COPY_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class MediaStoreLimitError(ValueError):
+    """업로드 크기 제한 초과"""
+    pass
+
+
+@dataclass
+class StoredObject:
+    digest: str          # 원본 내용 해시 (xxh3_128 hex)
+    path: str            # 저장 경로 (objects/ab/cd/<digest><ext>)
+    size_bytes: int
+    deduplicated: bool   # 같은 내용이 이미 있어서 새로 쓰지 않았는지
+
+
+class HashingWriter:
+    """
+    임시 파일에 쓰면서 동시에 해시 계산 (파일을 다시 읽지 않음)
+    - 청크 업로드처럼 여러 번에 나눠 쓰는 경우에도 사용
+    """
+
+    def __init__(self, tmp_path: Path, *, max_bytes: Optional[int] = None):
+        self.tmp_path = tmp_path
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._hasher = xxhash.xxh3_128()
+        self._fp = open(tmp_path, "wb")
+
+    def write(self, data: bytes) -> None:
+        if self.max_bytes is not None and self.size_bytes + len(data) > self.max_bytes:
+            raise MediaStoreLimitError(f"파일 크기 제한 초과 (최대 {self.max_bytes} bytes)")
+        self._fp.write(data)
+        self._hasher.update(data)
+        self.size_bytes += len(data)
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+    def close(self) -> None:
+        if not self._fp.closed:
+            self._fp.close()
+
+    def abort(self) -> None:
+        self.close()
+        try:
+            self.tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class MediaStore:
+    """
+    업로드 영상 content-addressed 저장소
+
+    <root>/objects/ab/cd/<digest><ext>               원본 (내용이 같으면 한 벌만 저장)
+    <root>/derived/ab/cd/<digest>/<transform>-<key><ext>
+                                                    파생 파일 (압축본, WAV, 프록시 등)
+    <root>/tmp/                                     쓰는 중인 파일 (완료 시 os.replace 로 이동)
+
+    - 파생 파일 key = 변환 파라미터(JSON) 해시
+      => 같은 원본 + 같은 파라미터면 재분석/재시도/중복 업로드 시 ffmpeg 를 다시 돌리지 않음
+    - 파생 파일 이름에 원본 해시가 들어가므로 원본 내용이 바뀌면 자연히 새로 만들어짐
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.derived_dir = self.root / "derived"
+        self.tmp_dir = self.root / "tmp"
+
+        # 같은 파생 파일을 여러 스레드가 동시에 만들지 않도록 key 별 락
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # 저장소 밖(레거시 경로) 파일의 해시 캐시: path -> (mtime_ns, size, digest)
+        self._digest_cache: Dict[str, Tuple[int, int, str]] = {}
+
+    # ---------------------------------------------------------
+    # 원본 저장
+    # ---------------------------------------------------------
+    def _shard(self, base: Path, digest: str) -> Path:
+        return base / digest[:2] / digest[2:4]
+
+    def object_path(self, digest: str, ext: str = "") -> Path:
+        return self._shard(self.objects_dir, digest) / f"{digest}{ext.lower()}"
+
+    def new_tmp_path(self, suffix: str = "") -> Path:
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        return self.tmp_dir / f"{uuid.uuid4().hex}{suffix}"
+
+    def open_writer(self, *, max_bytes: Optional[int] = None) -> HashingWriter:
+        return HashingWriter(self.new_tmp_path(".part"), max_bytes=max_bytes)
+
+    def commit_writer(self, writer: HashingWriter, ext: str = "") -> StoredObject:
+        """다 쓴 임시 파일을 objects/ 로 옮김 (이미 같은 내용이 있으면 임시 파일만 삭제)"""
+        writer.close()
+        return self.commit_file(writer.tmp_path, writer.hexdigest(), writer.size_bytes, ext)
+
+    def commit_file(self, tmp_path: Path, digest: str, size_bytes: int, ext: str = "") -> StoredObject:
+        final = self.object_path(digest, ext)
+        if final.exists():
+            tmp_path.unlink(missing_ok=True)
+            return StoredObject(digest, str(final), size_bytes, deduplicated=True)
+
+        final.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, final)
+        return StoredObject(digest, str(final), size_bytes, deduplicated=False)
+
+    def put_stream(
+        self,
+        stream: BinaryIO,
+        ext: str = "",
+        *,
+        max_bytes: Optional[int] = None,
+        chunk_size: int = COPY_CHUNK_SIZE,
+    ) -> StoredObject:
+        """파일 객체를 청크 단위로 쓰면서 해시 -> objects/ 에 저장"""
+        writer = self.open_writer(max_bytes=max_bytes)
+        try:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return self.commit_writer(writer, ext)
+
+    # ---------------------------------------------------------
+    # 원본 해시
+    # ---------------------------------------------------------
+    def digest_of(self, path: str) -> str:
+        """
+        원본 파일 해시
+        - objects/ 안의 파일이면 파일명에서 바로 읽음
+        - 그 외(이전 uploads/videos 경로)는 한 번 읽어서 계산 후 캐시
+        """
+        p = Path(path)
+        stem = p.name.split(".", 1)[0]
+        if _DIGEST_RE.match(stem) and self._is_under(p, self.objects_dir):
+            return stem
+
+        st = p.stat()
+        key = str(p.resolve())
+        cached = self._digest_cache.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+
+        digest = hash_file(str(p))
+        self._digest_cache[key] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    @staticmethod
+    def _is_under(path: Path, base: Path) -> bool:
+        try:
+            path.resolve().relative_to(base.resolve())
+            return True
+        except ValueError:
+            return False
+
+    # ---------------------------------------------------------
+    # 파생 파일
+    # ---------------------------------------------------------
+    @staticmethod
+    def params_key(params: Dict[str, Any]) -> str:
+        canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        return xxhash.xxh3_64_hexdigest(canonical.encode("utf-8"))
+
+    def derived_path(self, digest: str, transform: str, params: Dict[str, Any], ext: str) -> Path:
+        return self._shard(self.derived_dir, digest) / digest / f"{transform}-{self.params_key(params)}{ext}"
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def get_or_create_derived(
+        self,
+        source_path: str,
+        transform: str,
+        params: Dict[str, Any],
+        ext: str,
+        build: Callable[[str], Any],
+    ) -> Tuple[str, bool]:
+        """
+        (source 해시, transform, params) 에 해당하는 파생 파일을 반환
+        - 이미 있으면 그대로 재사용 -> (경로, True)
+        - 없으면 build(임시 출력 경로) 로 만든 뒤 원자적으로 이동 -> (경로, False)
+        다른 프로세스가 동시에 만들어도 os.replace 라 결과 파일이 깨지지 않음
+        """
+        digest = self.digest_of(source_path)
+        final = self.derived_path(digest, transform, params, ext)
+        if final.exists():
+            return str(final.resolve()), True
+
+        with self._lock_for(str(final)):
+            if final.exists():
+                return str(final.resolve()), True
+
+            final.parent.mkdir(parents=True, exist_ok=True)
+            # 확장자를 유지해야 ffmpeg 가 출력 포맷을 알 수 있음
+            tmp = final.with_name(f".{uuid.uuid4().hex}.tmp{ext}")
+            try:
+                build(str(tmp))
+                os.replace(tmp, final)
+            finally:
+                tmp.unlink(missing_ok=True)
+
+        return str(final.resolve()), False
+
+
+def hash_file(path: str, chunk_size: int = COPY_CHUNK_SIZE) -> str:
+    hasher = xxhash.xxh3_128()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+media_store = MediaStore(settings.MEDIA_STORE_ROOT)
@@ -1,23 +1,270 @@
 # app/utils/media_utils.py
 from __future__ import annotations
 
+import json
 import os
 import shutil
 import subprocess
+from dataclasses import dataclass, field, asdict
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class MediaToolError(RuntimeError):
     pass
 
 
+# 재생용 파일을 그대로 쓸 수 있는 기준 (compress_video 기본값과 맞춤)
+PLAYBACK_VIDEO_CODECS = ("h264",)
+PLAYBACK_AUDIO_CODECS = ("aac",)
+PLAYBACK_PIX_FMTS = ("yuv420p", "yuvj420p")  # 브라우저 재생 호환
+PLAYBACK_MAX_WIDTH = 1280
+PLAYBACK_MAX_HEIGHT = 720
+PLAYBACK_MAX_FPS = 30.5
+PLAYBACK_MAX_VIDEO_BITRATE = 2_500_000  # bps, 720p CRF 28 결과보다 넉넉한 상한
+
+# 분석용 proxy (MediaPipe 입력 전용, 재생에는 쓰지 않음)
+ANALYSIS_PROXY_MAX_WIDTH = 640
+ANALYSIS_PROXY_MAX_HEIGHT = 360
+ANALYSIS_PROXY_FPS = 15
+ANALYSIS_PROXY_CRF = 23
+
+TRANSCODE_REMUX = "remux"                      # 스트림 복사 + mp4 faststart
+TRANSCODE_AUDIO_ONLY = "audio_transcode"       # 비디오 복사 + 오디오만 AAC 인코딩
+TRANSCODE_REENCODE = "reencode"                # 기존 compress_video (libx264)
+
+
+@dataclass
+class MediaProbe:
+    """ffprobe 결과 요약 (answer_media_metadata 테이블과 1:1)"""
+    duration_sec: Optional[float] = None
+    container: Optional[str] = None
+    size_bytes: Optional[int] = None
+    bitrate: Optional[int] = None
+    video_codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    pix_fmt: Optional[str] = None
+    video_bitrate: Optional[int] = None
+    audio_codec: Optional[str] = None
+    audio_sample_rate: Optional[int] = None
+    audio_channels: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class TranscodePlan:
+    """재생용 파일을 만드는 방법 + 그렇게 결정한 이유"""
+    action: str
+    reasons: List[str] = field(default_factory=list)
+
+
+def _to_int(x: Any) -> Optional[int]:
+    try:
+        return None if x in (None, "", "N/A") else int(float(x))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(x: Any) -> Optional[float]:
+    try:
+        return None if x in (None, "", "N/A") else float(x)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    """ffprobe의 "30000/1001" 형태 frame rate -> float"""
+    if not rate or rate in ("0/0", "N/A"):
+        return None
+    try:
+        num, _, den = rate.partition("/")
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
 class MediaUtils:
     @staticmethod
     def _ensure_ffmpeg() -> None:
         if shutil.which("ffmpeg") is None:
             raise MediaToolError("ffmpeg가 설치되어 있지 않습니다. (PATH에 ffmpeg 필요)")
 
+    @staticmethod
+    def _ensure_ffprobe() -> None:
+        if shutil.which("ffprobe") is None:
+            raise MediaToolError("ffprobe가 설치되어 있지 않습니다. (PATH에 ffprobe 필요)")
+
+    @staticmethod
+    def probe(video_path: str) -> MediaProbe:
+        """
+        ffprobe로 길이/코덱/해상도/fps/비트레이트 조회
+        """
+        MediaUtils._ensure_ffprobe()
+
+        in_path = Path(video_path)
+        if not in_path.exists():
+            raise FileNotFoundError(f"video not found: {video_path}")
+
+        cmd = [
+            "ffprobe",
+            "-v", "error",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            str(in_path),
+        ]
+        try:
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            raise MediaToolError(f"ffprobe 실패\nSTDERR:\n{e.stderr[-2000:]}") from e
+
+        data = json.loads(out.stdout or "{}")
+        fmt = data.get("format") or {}
+        streams = data.get("streams") or []
+        v = next((st for st in streams if st.get("codec_type") == "video"), None)
+        a = next((st for st in streams if st.get("codec_type") == "audio"), None)
+
+        probe = MediaProbe(
+            duration_sec=_to_float(fmt.get("duration")),
+            container=fmt.get("format_name"),
+            size_bytes=_to_int(fmt.get("size")),
+            bitrate=_to_int(fmt.get("bit_rate")),
+        )
+        if v:
+            probe.video_codec = v.get("codec_name")
+            probe.width = _to_int(v.get("width"))
+            probe.height = _to_int(v.get("height"))
+            probe.fps = _parse_rate(v.get("avg_frame_rate")) or _parse_rate(v.get("r_frame_rate"))
+            probe.pix_fmt = v.get("pix_fmt")
+            probe.video_bitrate = _to_int(v.get("bit_rate"))
+            if probe.duration_sec is None:
+                probe.duration_sec = _to_float(v.get("duration"))
+        if a:
+            probe.audio_codec = a.get("codec_name")
+            probe.audio_sample_rate = _to_int(a.get("sample_rate"))
+            probe.audio_channels = _to_int(a.get("channels"))
+        return probe
+
+    @staticmethod
+    def plan_transcode(
+        probe: MediaProbe,
+        *,
+        max_width: int = PLAYBACK_MAX_WIDTH,
+        max_height: int = PLAYBACK_MAX_HEIGHT,
+        max_fps: float = PLAYBACK_MAX_FPS,
+        max_video_bitrate: int = PLAYBACK_MAX_VIDEO_BITRATE,
+    ) -> TranscodePlan:
+        """
+        재생용 파일을 만드는 가장 싼 방법을 고릅니다.
+        - 비디오가 이미 H.264 / 해상도·fps·비트레이트 기준 이내 -> 재인코딩 불필요
+            * 오디오가 AAC(또는 없음) -> remux (스트림 복사)
+            * 그 외 오디오(opus 등)   -> audio_transcode (비디오 복사 + 오디오만 AAC)
+        - 하나라도 벗어나면 reencode (compress_video)
+        """
+        reasons: List[str] = []
+        video_ok = True
+
+        if probe.video_codec is None:
+            return TranscodePlan(TRANSCODE_REENCODE, ["비디오 스트림 정보 없음"])
+
+        if probe.video_codec not in PLAYBACK_VIDEO_CODECS:
+            video_ok = False
+            reasons.append(f"video codec {probe.video_codec} (h264 아님)")
+        if probe.pix_fmt and probe.pix_fmt not in PLAYBACK_PIX_FMTS:
+            video_ok = False
+            reasons.append(f"pix_fmt {probe.pix_fmt} (yuv420p 아님)")
+        if (probe.width or 0) > max_width or (probe.height or 0) > max_height:
+            video_ok = False
+            reasons.append(f"해상도 {probe.width}x{probe.height} > {max_width}x{max_height}")
+        if probe.fps is not None and probe.fps > max_fps:
+            video_ok = False
+            reasons.append(f"fps {probe.fps:.2f} > {max_fps}")
+
+        # 스트림 비트레이트가 없으면(webm/mkv 등) 전체 비트레이트로 판단
+        v_bitrate = probe.video_bitrate or probe.bitrate
+        if v_bitrate is None:
+            video_ok = False
+            reasons.append("비트레이트 정보 없음")
+        elif v_bitrate > max_video_bitrate:
+            video_ok = False
+            reasons.append(f"video bitrate {v_bitrate // 1000}kbps > {max_video_bitrate // 1000}kbps")
+
+        if not video_ok:
+            return TranscodePlan(TRANSCODE_REENCODE, reasons)
+
+        reasons.append(
+            f"h264 {probe.width}x{probe.height}"
+            + (f" {probe.fps:.1f}fps" if probe.fps else "")
+            + f" {v_bitrate // 1000}kbps -> 비디오 재인코딩 불필요"
+        )
+        if probe.audio_codec is None or probe.audio_codec in PLAYBACK_AUDIO_CODECS:
+            reasons.append(f"audio {probe.audio_codec or '없음'} -> 스트림 복사")
+            return TranscodePlan(TRANSCODE_REMUX, reasons)
+
+        reasons.append(f"audio codec {probe.audio_codec} -> AAC 인코딩만 수행")
+        return TranscodePlan(TRANSCODE_AUDIO_ONLY, reasons)
+
+    @staticmethod
+    def prepare_playback(
+        video_path: str,
+        output_path: Optional[str] = None,
+        *,
+        probe: Optional[MediaProbe] = None,
+        plan: Optional[TranscodePlan] = None,
+        audio_bitrate: str = "96k",
+        overwrite: bool = False,
+    ) -> Tuple[str, TranscodePlan]:
+        """
+        plan_transcode 결과에 따라 재생용 mp4 생성 (remux / audio_transcode / reencode)
+        - 반환: (출력 경로, 적용한 plan)
+        """
+        if plan is None:
+            plan = MediaUtils.plan_transcode(probe or MediaUtils.probe(video_path))
+
+        if plan.action == TRANSCODE_REENCODE:
+            out = MediaUtils.compress_video(
+                video_path, output_path, audio_bitrate=audio_bitrate, overwrite=overwrite
+            )
+            return out, plan
+
+        MediaUtils._ensure_ffmpeg()
+
+        in_path = Path(video_path)
+        if not in_path.exists():
+            raise FileNotFoundError(f"video not found: {video_path}")
+
+        if output_path is None:
+            output_path = str(in_path.with_suffix(".compressed.mp4"))
+        out_path = Path(output_path)
+
+        if out_path.exists() and not overwrite:
+            return str(out_path.resolve()), plan
+
+        cmd = [
+            "ffmpeg",
+            "-y" if overwrite else "-n",
+            "-i", str(in_path),
+            "-map", "0:v:0",
+            "-map", "0:a:0?",
+            "-c:v", "copy",
+        ]
+        if plan.action == TRANSCODE_REMUX:
+            cmd += ["-c:a", "copy"]
+        else:
+            cmd += ["-c:a", "aac", "-b:a", audio_bitrate]
+        cmd += ["-movflags", "+faststart", str(out_path)]
+
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            raise MediaToolError(f"ffmpeg {plan.action} 실패\nSTDERR:\n{e.stderr[-2000:]}") from e
+
+        return str(out_path.resolve()), plan
+
     @staticmethod
     def compress_video(
         video_path: str,
@@ -80,6 +327,65 @@ class MediaUtils:
         return str(out_path.resolve())
 
 
+    @staticmethod
+    def make_analysis_proxy(
+        video_path: str,
+        output_path: Optional[str] = None,
+        *,
+        max_width: int = ANALYSIS_PROXY_MAX_WIDTH,
+        max_height: int = ANALYSIS_PROXY_MAX_HEIGHT,
+        fps: float = ANALYSIS_PROXY_FPS,
+        crf: int = ANALYSIS_PROXY_CRF,
+        preset: str = "ultrafast",
+        overwrite: bool = False,
+    ) -> str:
+        """
+        랜드마크 분석 전용 저해상도 / 저fps 영상 (오디오 없음)
+        - 재생용 압축본과 별개 (사용자에게 보여주지 않으므로 화질보다 디코드 속도 우선)
+        - 1초마다 키프레임 -> 구간 병렬 분석의 seek 가 가까운 위치에서 시작
+        """
+        MediaUtils._ensure_ffmpeg()
+
+        in_path = Path(video_path)
+        if not in_path.exists():
+            raise FileNotFoundError(f"video not found: {video_path}")
+
+        if output_path is None:
+            output_path = str(in_path.with_suffix(".proxy.mp4"))
+        out_path = Path(output_path)
+
+        if out_path.exists() and not overwrite:
+            return str(out_path.resolve())
+
+        vf = (
+            f"fps={fps},"
+            f"scale=w={max_width}:h={max_height}:force_original_aspect_ratio=decrease,"
+            f"pad=ceil(iw/2)*2:ceil(ih/2)*2,"
+            f"setsar=1"
+        )
+
+        cmd = [
+            "ffmpeg",
+            "-y" if overwrite else "-n",
+            "-i", str(in_path),
+            "-an",
+            "-vf", vf,
+            "-c:v", "libx264",
+            "-preset", preset,
+            "-tune", "fastdecode",
+            "-crf", str(crf),
+            "-g", str(max(1, int(round(fps)))),
+            "-pix_fmt", "yuv420p",
+            str(out_path),
+        ]
+
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            raise MediaToolError(f"ffmpeg analysis proxy 실패\nSTDERR:\n{e.stderr[-2000:]}") from e
+
+        return str(out_path.resolve())
+
     @staticmethod
     def extract_audio(video_path: str, output_path: Optional[str] = None, *, overwrite: bool = False) -> str:
         """
@@ -0,0 +1,163 @@
+"""
+분석 워커 (API 서버와 분리된 프로세스)
+
+    python -m app.workers.analysis [--worker-id ID] [--lease-sec 120] [--poll-sec 2]
+
+- 시작 시 Whisper / MediaPipe 엔진을 미리 로드
+- analysis_jobs 에서 SELECT ... FOR UPDATE SKIP LOCKED 로 작업을 1개씩 가져와 처리
+- 처리 중에는 별도 스레드가 lease를 주기적으로 연장(heartbeat)
+- 워커가 죽으면 lease 만료 후 다른 워커가 같은 작업을 다시 가져감
+- lease 를 잃으면(heartbeat 실패가 길어져 다른 워커가 가져감) 다음 단계 경계에서 작업을 중단하고 결과를 버림
+- 여러 호스트에서 띄울 때는 uploads/ 볼륨과 작업 디렉토리 구조를 동일하게 맞춰야 함
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.db import get_db_connection
+from app.core.exceptions import AnalysisCancelled
+from app.repositories.analysis_job_repo import analysis_job_repo
+from app.services.analysis_job_service import analysis_job_service
+
+
+def _preload_engines() -> None:
+    """첫 작업에서 모델 로드 비용을 내지 않도록 미리 로드"""
+    t0 = time.perf_counter()
+    from app.engines.stt.engine import _get_model
+    from app.engines.visual.engine import landmarker_pool
+
+    _get_model()
+    landmarker_pool.warm()
+    print(f"🔥 [Worker] 엔진 preload 완료 ({time.perf_counter() - t0:.1f}s)")
+
+
+class _Heartbeat(threading.Thread):
+    """작업 처리 중 lease를 주기적으로 연장하는 스레드 (자기 커넥션 사용)"""
+
+    def __init__(self, job_id: int, worker_id: str, lease_sec: int):
+        super().__init__(name=f"heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_sec = lease_sec
+        self.interval = max(1.0, lease_sec / 3.0)
+        self.lost = False
+        # lease 상실 신호 (작업 쪽에서 단계 사이에 확인하고 중단)
+        self.cancelled = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                with get_db_connection() as conn:
+                    owned = analysis_job_repo.heartbeat(conn, self.job_id, self.worker_id, self.lease_sec)
+                if not owned:
+                    self.lost = True
+                    self.cancelled.set()
+                    print(f"⚠️ [Worker] job {self.job_id} lease 상실 (다른 워커가 가져감) -> 작업 중단")
+                    return
+            except Exception as e:
+                print(f"⚠️ [Worker] job {self.job_id} heartbeat 실패: {e}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join(timeout=5)
+
+
+class AnalysisWorker:
+    def __init__(self, worker_id: str, lease_sec: int, poll_sec: float):
+        self.worker_id = worker_id
+        self.lease_sec = lease_sec
+        self.poll_sec = poll_sec
+        self._stopping = False
+
+    def request_stop(self, *_: Any) -> None:
+        print(f"🛑 [Worker] {self.worker_id} 종료 요청 - 현재 작업까지만 처리합니다.")
+        self._stopping = True
+
+    def run_forever(self) -> None:
+        print(f"👷 [Worker] {self.worker_id} 시작 (lease={self.lease_sec}s, poll={self.poll_sec}s)")
+        while not self._stopping:
+            try:
+                self._reap_exhausted()
+                job = self._claim()
+            except Exception as e:
+                print(f"💥 [Worker] 작업 조회 실패: {e}")
+                time.sleep(self.poll_sec)
+                continue
+
+            if job is None:
+                time.sleep(self.poll_sec)
+                continue
+
+            self.run_job(job)
+        print(f"👋 [Worker] {self.worker_id} 종료")
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        with get_db_connection() as conn:
+            return analysis_job_repo.claim(conn, self.worker_id, self.lease_sec)
+
+    def _reap_exhausted(self) -> None:
+        with get_db_connection() as conn:
+            for job in analysis_job_repo.fail_exhausted_leases(conn):
+                print(f"⚠️ [Worker] job {job['job_id']} 재시도 소진 (lease 만료) -> FAILED")
+                analysis_job_service.handle_exhausted_job(conn, job)
+
+    def run_job(self, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        print(f"📥 [Worker] job {job_id} ({job['kind']}) 시작 - attempt {job['attempts']}/{job['max_attempts']}")
+        t0 = time.perf_counter()
+
+        heartbeat = _Heartbeat(job_id, self.worker_id, self.lease_sec)
+        heartbeat.start()
+        try:
+            with get_db_connection() as conn:
+                analysis_job_service.process_job(conn, job, cancel=heartbeat.cancelled)
+        except AnalysisCancelled:
+            heartbeat.stop()
+            print(f"🛑 [Worker] job {job_id} 중단 - lease 를 잃어 결과를 버립니다. (완료/실패 기록 안 함)")
+            return
+        except Exception as e:
+            heartbeat.stop()
+            print(f"💥 [Worker] job {job_id} 실패: {e}")
+            print(traceback.format_exc())
+            with get_db_connection() as conn:
+                analysis_job_repo.fail(conn, job_id, self.worker_id, str(e)[:2000])
+                updated = analysis_job_repo.get_by_id(conn, job_id)
+                if updated and updated["status"] == "FAILED":
+                    analysis_job_service.handle_exhausted_job(conn, updated)
+            return
+
+        heartbeat.stop()
+        with get_db_connection() as conn:
+            if not analysis_job_repo.complete(conn, job_id, self.worker_id):
+                # 마지막 heartbeat 이후 lease 가 넘어간 경우: 새 소유 워커의 결과를 덮어쓰지 않음
+                print(f"⚠️ [Worker] job {job_id} 완료 기록 실패 - 이미 다른 워커 소유")
+                return
+        print(f"✅ [Worker] job {job_id} 완료 ({time.perf_counter() - t0:.1f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Triple Synergy analysis worker")
+    parser.add_argument("--worker-id", type=str, default=f"{socket.gethostname()}:{os.getpid()}")
+    parser.add_argument("--lease-sec", type=int, default=settings.ANALYSIS_JOB_LEASE_SEC)
+    parser.add_argument("--poll-sec", type=float, default=settings.ANALYSIS_WORKER_POLL_SEC)
+    parser.add_argument("--no-preload", action="store_true", help="엔진 preload 생략")
+    args = parser.parse_args()
+
+    if not args.no_preload:
+        _preload_engines()
+
+    worker = AnalysisWorker(args.worker_id, args.lease_sec, args.poll_sec)
+    signal.signal(signal.SIGTERM, worker.request_stop)
+    signal.signal(signal.SIGINT, worker.request_stop)
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+-- =========================================================
+-- 분석 작업 큐 (analysis_jobs)
+-- - API 서버는 작업만 등록하고, 별도 워커 프로세스(python -m app.workers.analysis)가
+--   SELECT ... FOR UPDATE SKIP LOCKED 로 작업을 가져가 처리합니다.
+-- - 워커는 lease_expires_at 을 주기적으로 연장(heartbeat)하며,
+--   만료된 RUNNING 작업은 다른 워커가 다시 가져갈 수 있습니다.
+-- =========================================================
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    job_id            BIGSERIAL PRIMARY KEY,
+    kind              VARCHAR(32)  NOT NULL,              -- ANSWER | SESSION_REPORT
+    session_id        INTEGER      NOT NULL REFERENCES interview_sessions(session_id) ON DELETE CASCADE,
+    answer_id         INTEGER      REFERENCES answers(answer_id) ON DELETE CASCADE,
+    status            VARCHAR(16)  NOT NULL DEFAULT 'QUEUED', -- QUEUED | RUNNING | DONE | FAILED
+    attempts          INTEGER      NOT NULL DEFAULT 0,
+    max_attempts      INTEGER      NOT NULL DEFAULT 3,
+    locked_by         VARCHAR(128),
+    lease_expires_at  TIMESTAMPTZ,
+    heartbeat_at      TIMESTAMPTZ,
+    last_error        TEXT,
+    run_after         TIMESTAMPTZ  NOT NULL DEFAULT now(),
+    created_at        TIMESTAMPTZ  NOT NULL DEFAULT now(),
+    started_at        TIMESTAMPTZ,
+    finished_at       TIMESTAMPTZ,
+    updated_at        TIMESTAMPTZ  NOT NULL DEFAULT now()
+);
+
+-- 작업 가져가기(claim)용 인덱스
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_queued
+    ON analysis_jobs (run_after, job_id)
+    WHERE status = 'QUEUED';
+
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_lease
+    ON analysis_jobs (lease_expires_at)
+    WHERE status = 'RUNNING';
+
+-- 같은 답변/세션에 대해 진행 중인 작업은 1개만 (중복 등록 방지)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_analysis_jobs_active_answer
+    ON analysis_jobs (answer_id)
+    WHERE kind = 'ANSWER' AND status IN ('QUEUED', 'RUNNING');
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_analysis_jobs_active_session_report
+    ON analysis_jobs (session_id)
+    WHERE kind = 'SESSION_REPORT' AND status IN ('QUEUED', 'RUNNING');
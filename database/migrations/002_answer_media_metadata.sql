@@ -0,0 +1,25 @@
+-- =========================================================
+-- 업로드 영상 메타데이터 (answer_media_metadata)
+-- - 전처리 단계에서 ffprobe 결과와 재생용 파일 생성 방식(transcode_action)을 기록
+-- - transcode_reasons: 그렇게 결정한 이유 목록 (재인코딩 비용 추적용)
+-- =========================================================
+CREATE TABLE IF NOT EXISTS answer_media_metadata (
+    answer_id          INTEGER PRIMARY KEY REFERENCES answers(answer_id) ON DELETE CASCADE,
+    duration_sec       DOUBLE PRECISION,
+    container          VARCHAR(64),
+    size_bytes         BIGINT,
+    bitrate            BIGINT,
+    video_codec        VARCHAR(32),
+    width              INTEGER,
+    height             INTEGER,
+    fps                DOUBLE PRECISION,
+    pix_fmt            VARCHAR(32),
+    video_bitrate      BIGINT,
+    audio_codec        VARCHAR(32),
+    audio_sample_rate  INTEGER,
+    audio_channels     INTEGER,
+    transcode_action   VARCHAR(32),               -- remux | audio_transcode | reencode
+    transcode_reasons  JSONB NOT NULL DEFAULT '[]',
+    playback_path      TEXT,
+    probed_at          TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,30 @@
+-- =========================================================
+-- 이어받기 가능한 답변 영상 업로드 (answer_uploads)
+-- - init -> PUT 청크(offset) -> complete 순서로 업로드
+-- - received_bytes 까지 임시 파일(tmp_path)에 저장되어 있음 (끊기면 그 지점부터 다시 전송)
+-- - complete 시 원본 저장소(uploads/objects)로 옮기고 answers 행을 만든 뒤 answer_id 기록
+-- =========================================================
+CREATE TABLE IF NOT EXISTS answer_uploads (
+    upload_id         VARCHAR(32)  PRIMARY KEY,
+    user_id           INTEGER      NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    question_id       INTEGER      NOT NULL REFERENCES questions(question_id) ON DELETE CASCADE,
+    filename          TEXT,
+    ext               VARCHAR(16)  NOT NULL DEFAULT '.mp4',
+    total_bytes       BIGINT,                               -- 클라이언트가 알려준 전체 크기 (모르면 NULL)
+    duration_sec      DOUBLE PRECISION,                     -- 클라이언트가 알려준 길이 (모르면 NULL)
+    received_bytes    BIGINT       NOT NULL DEFAULT 0,
+    tmp_path          TEXT         NOT NULL,
+    status            VARCHAR(16)  NOT NULL DEFAULT 'UPLOADING', -- UPLOADING | COMPLETED | ABORTED
+    digest            VARCHAR(64),                          -- xxh3_128 (complete 후)
+    answer_id         INTEGER      REFERENCES answers(answer_id) ON DELETE SET NULL,
+    created_at        TIMESTAMPTZ  NOT NULL DEFAULT now(),
+    updated_at        TIMESTAMPTZ  NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_answer_uploads_user
+    ON answer_uploads (user_id, created_at DESC);
+
+-- 오래된 미완료 업로드 정리용
+CREATE INDEX IF NOT EXISTS idx_answer_uploads_stale
+    ON answer_uploads (updated_at)
+    WHERE status = 'UPLOADING';
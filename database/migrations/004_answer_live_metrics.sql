@@ -0,0 +1,8 @@
+-- =========================================================
+-- 녹화 중 실시간 Visual 분석 결과 (answers.live_metrics_json)
+-- - Streamlit WebRTC 프로세서가 녹화하면서 누적한 V3 결과 (v0 형식: {"module":"visual","metrics":{...}})
+-- - 업로드 완료(complete) 요청에 함께 전달되어 저장
+-- - 분석 시 VISUAL_LIVE_MODE 에 따라 Visual 분석을 생략(skip)하거나 저fps 검증(verify)만 수행
+-- =========================================================
+ALTER TABLE answers
+    ADD COLUMN IF NOT EXISTS live_metrics_json JSONB;
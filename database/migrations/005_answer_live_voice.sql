@@ -0,0 +1,8 @@
+-- =========================================================
+-- 녹화 중 실시간 Voice 분석 결과 (answers.live_voice_json)
+-- - Streamlit WebRTC 오디오 프로세서가 녹화하면서 누적한 침묵/pitch 지표 (v0 형식: {"module":"voice","metrics":{...}})
+-- - 업로드 완료(complete) 요청에 함께 전달되어 저장
+-- - 분석 시 VOICE_LIVE_MODE=skip 이면 오디오 지표는 이 값을 쓰고 STT 기반 속도 지표만 계산
+-- =========================================================
+ALTER TABLE answers
+    ADD COLUMN IF NOT EXISTS live_voice_json JSONB;
@@ -0,0 +1,11 @@
+-- =========================================================
+-- 세션 리포트 작업 중복 등록 방지 (DONE 포함)
+-- - 기존 인덱스는 QUEUED/RUNNING 만 막아서, 리포트 작업이 끝난(DONE) 뒤
+--   늦게 끝난 답변 작업이 maybe_enqueue_session_report 를 다시 부르면 리포트가 한 번 더 생성됨
+-- - FAILED 작업만 새로 등록 가능 (재시도 소진 후 재요청)
+-- =========================================================
+DROP INDEX IF EXISTS uq_analysis_jobs_active_session_report;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_analysis_jobs_session_report
+    ON analysis_jobs (session_id)
+    WHERE kind = 'SESSION_REPORT' AND status IN ('QUEUED', 'RUNNING', 'DONE');
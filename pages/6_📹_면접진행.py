@@ -6,7 +6,10 @@ import aiortc
 import requests
 from pathlib import Path
 import time
-from app.utils.camera_utils import FaceGuideTransformer
+from functools import partial
+from app.core.config import settings
+from app.utils.camera_utils import FaceGuideTransformer, LiveVoiceProcessor
+from utils.api_client import AnswerAPI
 from twilio.rest import Client
 
 def get_ice_servers():
@@ -62,6 +65,7 @@ def display_analysis_failure(answer_id, error_msg="네트워크 연결이 불안
 # -----------------------------
 API_BASE = "http://triple_synergy_backend:8000"
 headers = {"Authorization": f"Bearer {st.session_state.get('token')}"}
+answer_api = AnswerAPI(base_url=API_BASE)
 
 st.title("📹 AI 실시간 모의면접")
 
@@ -390,7 +394,17 @@ if st.session_state.questions:
             key=f"user_record_{idx}_{st.session_state.recording_active}", # 상태 변화 시 재렌더링
             rtc_configuration=RTC_CONFIG,
             mode=WebRtcMode.SENDRECV,
-            video_processor_factory=FaceGuideTransformer,
+            # 녹화 중에는 (설정 시) 프레임을 바로 Visual 분석에 누적
+            video_processor_factory=partial(
+                FaceGuideTransformer,
+                live_visual=settings.VISUAL_LIVE_ANALYSIS and st.session_state.recording_active,
+            ),
+            # 녹화 중에는 (설정 시) 오디오로 침묵/pitch 지표를 바로 누적
+            audio_processor_factory=(
+                LiveVoiceProcessor
+                if settings.VOICE_LIVE_ANALYSIS and st.session_state.recording_active
+                else None
+            ),
 
             video_html_attrs=VideoHTMLAttributes(
                 autoPlay=True,
@@ -426,6 +440,13 @@ if st.session_state.questions:
             if st.button("⏹️ 녹화 종료", type="primary", use_container_width=True):
                 # 파일 인코더가 헤더를 안전하게 쓸 시간을 줌 (에러 방지 핵심)
                 with st.spinner("녹화를 안전하게 마치는 중..."):
+                    # 실시간 Visual 분석 결과 (켜져 있을 때만, 업로드 시 함께 전송)
+                    processor = webrtc_ctx.video_processor
+                    if processor is not None:
+                        st.session_state[f"live_visual_{idx}"] = processor.finish_live()
+                    audio_processor = webrtc_ctx.audio_processor
+                    if audio_processor is not None:
+                        st.session_state[f"live_voice_{idx}"] = audio_processor.finish_live()
                     time.sleep(2.0) 
                     st.session_state.recording_active = False
                     st.session_state.recording_done = True
@@ -434,6 +455,8 @@ if st.session_state.questions:
         else:
             if webrtc_ctx.state.playing:
                 if st.button("🎥 녹화 시작", type="primary", use_container_width=True):
+                    # 다시 녹화하면 이전 파일의 업로드는 이어받지 않음
+                    st.session_state.pop(f"upload_id_{idx}", None)
                     st.session_state.recording_active = True
                     st.rerun()
             else:
@@ -455,30 +478,31 @@ if st.session_state.questions:
                         st.session_state.recording_done = False
                         st.stop()
 
-                    with open(target_path, "rb") as f:
-                        files = {"file": (os.path.basename(target_path), f, "video/mp4")}
-                        data = {
-                            "question_id": str(q_id),
-                            "session_id": str(st.session_state.interview_session_id),
-                            "has_audio": "true"
-                        }
-                        res = requests.post(f"{API_BASE}/api/v1/answer/upload", headers=headers, files=files, data=data)
+                    # 청크 업로드: 연결이 끊겨도 처음부터 다시 보내지 않음
+                    # upload_id 를 질문별로 저장해 두면 실패 후 다시 눌러도 서버가 받은 지점부터 이어서 전송
+                    upload_key = f"upload_id_{idx}"
+                    answer_api.upload_video_resumable(
+                        st.session_state.get('token'), q_id, target_path,
+                        live_visual=st.session_state.get(f"live_visual_{idx}"),
+                        live_voice=st.session_state.get(f"live_voice_{idx}"),
+                        upload_id=st.session_state.get(upload_key),
+                        on_upload_id=lambda upload_id: st.session_state.__setitem__(upload_key, upload_id),
+                    )
 
-                    if res.status_code in (200, 201):
-                        st.toast("업로드 성공!", icon="✅")
-                        # 상태 초기화
-                        st.session_state.recording_done = False
-                        st.session_state.recording_active = False
-                        st.session_state.current_question_idx += 1
-                        
-                        if is_last_question:
-                            # 분석 요청
-                            requests.post(f"{API_BASE}/api/v1/analysis/session/{st.session_state.interview_session_id}", headers=headers)
-                            st.switch_page("pages/7_📊_리포트.py")
-                        else:
-                            st.rerun()
+                    st.toast("업로드 성공!", icon="✅")
+                    # 상태 초기화
+                    for key in (upload_key, f"live_visual_{idx}", f"live_voice_{idx}"):
+                        st.session_state.pop(key, None)
+                    st.session_state.recording_done = False
+                    st.session_state.recording_active = False
+                    st.session_state.current_question_idx += 1
+
+                    if is_last_question:
+                        # 분석 요청
+                        requests.post(f"{API_BASE}/api/v1/analysis/session/{st.session_state.interview_session_id}", headers=headers)
+                        st.switch_page("pages/7_📊_리포트.py")
                     else:
-                        st.error(f"업로드 실패 ({res.status_code}): {res.text}")
+                        st.rerun()
                 except Exception as e:
                     st.error(f"서버 통신 오류: {e}")
 
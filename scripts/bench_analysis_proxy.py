@@ -0,0 +1,133 @@
+"""
+재생용 압축본 vs 분석용 proxy 비교 (V3 세부 점수 차이 + 속도)
+- playback: MediaUtils.compress_video (1280x720, CRF 28) - 기존에 Visual 엔진이 읽던 파일
+- proxy:    MediaUtils.make_analysis_proxy (기본 640x360, 15fps, 오디오 없음) - 파일 모드
+- single_pass: 원본을 SinglePassMedia 로 디코드하면서 같은 해상도 / fps 상한 적용 - 단일 패스 모드 (기본)
+세 입력을 같은 샘플러 설정(VISUAL_SAMPLE_FPS)으로 분석합니다. 결과 기록 방법은 scripts/ANALYSIS_PROXY_BENCHMARK.md 참고
+
+사용법 (프로젝트 루트에서):
+    python -m scripts.bench_analysis_proxy uploads/objects/ab/cd/<hash>.mp4 [다른 영상 ...] [--width 640 --height 360 --fps 15]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from app.engines.visual.engine import _visual_engine
+from app.engines.visual.sampling import make_frame_sampler, source_filter
+from app.utils.media_decode import SinglePassMedia
+from app.utils.media_utils import (
+    MediaUtils,
+    ANALYSIS_PROXY_MAX_WIDTH,
+    ANALYSIS_PROXY_MAX_HEIGHT,
+    ANALYSIS_PROXY_FPS,
+)
+
+SUB_SCORES = ("head_score", "smile_score", "blink_score", "gaze_score")
+
+
+def run(path: str, single_pass: dict = None) -> dict:
+    """single_pass 가 있으면 파일 대신 원본 디코드 경로로 분석 (max_width / max_height / max_fps)"""
+    t0 = time.perf_counter()
+    sampler = make_frame_sampler()
+    if single_pass is None:
+        raw = _visual_engine.analyze(path, sampler)
+    else:
+        media = SinglePassMedia(path, **single_pass).demux()
+        raw = _visual_engine.analyze_frames(media.iter_frames(want=source_filter(sampler)), media.duration_sec, sampler)
+    elapsed = time.perf_counter() - t0
+    if raw.get("error"):
+        return {"error": raw["error"]}
+    details = raw.get("details", {})
+    out = {k: details.get(k) for k in SUB_SCORES}
+    out.update({
+        "score": raw.get("score", 0),
+        "rpm": details.get("rpm"),
+        "frames_analyzed": details.get("frames_analyzed"),
+        "elapsed_sec": round(elapsed, 3),
+        "size_bytes": os.path.getsize(path),
+    })
+    return out
+
+
+def compare(video: str, tmp_dir: str, width: int, height: int, fps: float) -> dict:
+    base = os.path.splitext(os.path.basename(video))[0]
+    t0 = time.perf_counter()
+    playback = MediaUtils.compress_video(video, os.path.join(tmp_dir, f"{base}.playback.mp4"), overwrite=True)
+    playback_sec = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    proxy = MediaUtils.make_analysis_proxy(
+        video, os.path.join(tmp_dir, f"{base}.proxy.mp4"),
+        max_width=width, max_height=height, fps=fps, overwrite=True,
+    )
+    proxy_sec = time.perf_counter() - t0
+
+    runs = {
+        "playback": run(playback),
+        "proxy": run(proxy),
+        "single_pass": run(video, {"max_width": width, "max_height": height, "max_fps": fps}),
+    }
+    for name, r in runs.items():
+        if r.get("error"):
+            return {"error": f"{name}: {r['error']}"}
+
+    pb, px, sp = runs["playback"], runs["proxy"], runs["single_pass"]
+    return {
+        "proxy": {"width": width, "height": height, "fps": fps},
+        "encode_sec": {"playback": round(playback_sec, 2), "proxy": round(proxy_sec, 2)},
+        "playback": pb,
+        "proxy_result": px,
+        "single_pass_result": sp,
+        "score_delta": px["score"] - pb["score"],
+        "subscore_delta": {k: (px[k] or 0) - (pb[k] or 0) for k in SUB_SCORES},
+        "rpm_delta": round((px["rpm"] or 0) - (pb["rpm"] or 0), 1),
+        # 단일 패스 - 파일 모드 proxy (같은 해상도 / fps 상한이므로 0 에 가까워야 함, 인코딩 손실만 차이)
+        "single_pass_score_delta": sp["score"] - px["score"],
+        "single_pass_rpm_delta": round((sp["rpm"] or 0) - (px["rpm"] or 0), 1),
+        "single_pass_frames_delta": (sp["frames_analyzed"] or 0) - (px["frames_analyzed"] or 0),
+        "speedup": round(pb["elapsed_sec"] / px["elapsed_sec"], 2) if px["elapsed_sec"] > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재생용 압축본 vs 분석용 proxy Visual 점수 비교")
+    parser.add_argument("videos", nargs="+", help="비교할 원본 영상 경로")
+    parser.add_argument("--width", type=int, default=ANALYSIS_PROXY_MAX_WIDTH)
+    parser.add_argument("--height", type=int, default=ANALYSIS_PROXY_MAX_HEIGHT)
+    parser.add_argument("--fps", type=float, default=ANALYSIS_PROXY_FPS)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="proxy_bench_") as tmp_dir:
+        for path in args.videos:
+            print(f"🎬 {path}")
+            out = compare(path, tmp_dir, args.width, args.height, args.fps)
+            print(json.dumps(out, ensure_ascii=False, indent=2))
+            if not out.get("error"):
+                rows.append(out)
+
+    if not rows:
+        return
+
+    # 문서에 붙여넣을 수 있는 요약 표
+    n = len(rows)
+    print(f"\n📊 영상 {n}개 | proxy {args.width}x{args.height}@{args.fps:g}fps")
+    print("| 항목 | 평균 |차이| | 최대 |차이| |")
+    print("|---|---|---|")
+    for key in ("score",) + SUB_SCORES:
+        deltas = [abs(r["score_delta"] if key == "score" else r["subscore_delta"][key]) for r in rows]
+        print(f"| {key} | {sum(deltas) / n:.2f} | {max(deltas)} |")
+    rpm = [abs(r["rpm_delta"]) for r in rows]
+    print(f"| rpm | {sum(rpm) / n:.2f} | {max(rpm)} |")
+    sp = [abs(r["single_pass_score_delta"]) for r in rows]
+    sp_rpm = [abs(r["single_pass_rpm_delta"]) for r in rows]
+    print(f"| single_pass - proxy score | {sum(sp) / n:.2f} | {max(sp)} |")
+    print(f"| single_pass - proxy rpm | {sum(sp_rpm) / n:.2f} | {max(sp_rpm)} |")
+    speedups = [r["speedup"] for r in rows if r["speedup"]]
+    if speedups:
+        print(f"\n⏱️ 분석 속도 평균 x{sum(speedups) / len(speedups):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Visual 엔진 프레임별 추출 단계 벤치마크
+- MediaPipe 추론 결과를 한 번 모아둔 뒤, 추출 단계만 따로 비교
+  * legacy: 프레임마다 _calculate_head_angle / _get_iris_shift / blendshape dict / 리스트 append
+  * buffer: LandmarkBuffer.append (필요한 인덱스만 복사) + to_history() 벡터 계산
+- 추론 포함 전체 analyze() fps 도 함께 출력
+
+여러 영상을 주면 영상별 결과 뒤에 문서(scripts/VISUAL_EXTRACTION_BENCHMARK.md)에 붙여넣을 요약 표를 출력
+
+사용법 (프로젝트 루트에서):
+    python -m scripts.bench_visual_extraction <영상 경로> [다른 영상 ...] [--frames 1800] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks import python
+from mediapipe.tasks.python import vision
+
+from app.engines.visual.engine import MODEL_PATH, _visual_engine
+from app.engines.visual.landmarks import LandmarkBuffer
+from app.engines.visual.sampling import FrameSampler
+
+
+def collect_results(video_path: str, max_frames: int):
+    """MediaPipe 결과 (result, w, h, ts_ms) 목록 + 추론 fps"""
+    options = vision.FaceLandmarkerOptions(
+        base_options=python.BaseOptions(model_asset_path=MODEL_PATH),
+        running_mode=vision.RunningMode.VIDEO,
+        num_faces=1,
+        output_face_blendshapes=True,
+    )
+    landmarker = vision.FaceLandmarker.create_from_options(options)
+    cap = cv2.VideoCapture(video_path)
+    results = []
+    last_ts = -1
+    infer_sec = 0.0
+    try:
+        while len(results) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            ts = max(int(cap.get(cv2.CAP_PROP_POS_MSEC)), last_ts + 1)
+            last_ts = ts
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            h, w, _ = rgb.shape
+            t0 = time.perf_counter()
+            res = landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), ts)
+            infer_sec += time.perf_counter() - t0
+            results.append((res, w, h, ts))
+    finally:
+        cap.release()
+        landmarker.close()
+    return results, infer_sec
+
+
+def extract_legacy(results):
+    engine = _visual_engine
+    hist = {k: [] for k in ("timestamps", "head_angles", "gaze_shifts", "blink_scores", "smile_scores")}
+    for res, w, h, ts in results:
+        angle = gaze = blink = smile = 0.0
+        if res.face_landmarks:
+            lms = res.face_landmarks[0]
+            angle = engine._calculate_head_angle(lms[1], lms[10])
+            gaze = engine._get_iris_shift(lms, w, h)
+            bs = {b.category_name: b.score for b in res.face_blendshapes[0]}
+            blink = (bs.get("eyeBlinkLeft", 0) + bs.get("eyeBlinkRight", 0)) / 2.0
+            smile = (bs.get("mouthSmileLeft", 0) + bs.get("mouthSmileRight", 0)) / 2.0
+        hist["timestamps"].append(ts / 1000.0)
+        hist["head_angles"].append(angle)
+        hist["gaze_shifts"].append(gaze)
+        hist["blink_scores"].append(blink)
+        hist["smile_scores"].append(smile)
+    return hist
+
+
+def extract_buffer(results):
+    buf = LandmarkBuffer(capacity=len(results))
+    for res, w, h, ts in results:
+        buf.append(ts / 1000.0, w, h, res)
+    return buf.to_history()
+
+
+def bench(fn, results, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(results)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_video(path: str, max_frames: int, repeat: int, e2e: bool) -> dict:
+    results, infer_sec = collect_results(path, max_frames)
+    n = len(results)
+    if n == 0:
+        return {"error": "프레임을 읽지 못했습니다."}
+    faces = sum(1 for res, *_ in results if res.face_landmarks)
+
+    # 두 방식이 같은 값을 내는지 먼저 확인 (속도만 비교하면 의미 없음)
+    legacy_hist, buffer_hist = extract_legacy(results), extract_buffer(results)
+    max_diff = max(
+        float(np.max(np.abs(np.asarray(legacy_hist[k], dtype=float) - getattr(buffer_hist, k))))
+        for k in legacy_hist
+    )
+
+    legacy = bench(extract_legacy, results, repeat)
+    buffer = bench(extract_buffer, results, repeat)
+    out = {
+        "frames": n,
+        "face_frames": faces,
+        "infer_fps": round(n / infer_sec, 1),
+        "legacy_ms": round(legacy * 1000, 2),
+        "buffer_ms": round(buffer * 1000, 2),
+        "extract_speedup": round(legacy / buffer, 2),
+        "extract_share_before": round(legacy / (infer_sec + legacy), 4),
+        "extract_share_after": round(buffer / (infer_sec + buffer), 4),
+        "max_abs_diff": max_diff,
+    }
+    if e2e:
+        t0 = time.perf_counter()
+        raw = _visual_engine.analyze(path, FrameSampler(0))
+        elapsed = time.perf_counter() - t0
+        frames = raw.get("details", {}).get("frames_analyzed", 0)
+        out["e2e_fps"] = round(frames / elapsed, 1) if elapsed > 0 else None
+        out["score"] = raw.get("score")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visual 엔진 추출 단계 벤치마크")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--frames", type=int, default=1800, help="추출 비교에 쓸 최대 프레임 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-e2e", action="store_true", help="전체 analyze() 측정 생략")
+    args = parser.parse_args()
+
+    rows = []
+    for path in args.videos:
+        print(f"🎬 {path}")
+        out = bench_video(path, args.frames, args.repeat, not args.skip_e2e)
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+        if not out.get("error"):
+            rows.append((os.path.basename(path), out))
+
+    if not rows:
+        return
+
+    # 문서에 붙여넣을 수 있는 요약 표
+    print(f"\n📊 영상 {len(rows)}개 | 최대 {args.frames} 프레임 | repeat {args.repeat}")
+    print("| 영상 | 프레임 (얼굴) | 추론 fps | legacy ms | buffer ms | 추출 x | 추출 비중 전→후 | e2e fps | 최대 차이 |")
+    print("|---|---|---|---|---|---|---|---|---|")
+    for name, r in rows:
+        print(
+            f"| {name} | {r['frames']} ({r['face_frames']}) | {r['infer_fps']} | {r['legacy_ms']} | {r['buffer_ms']} "
+            f"| x{r['extract_speedup']} | {r['extract_share_before']:.1%} → {r['extract_share_after']:.1%} "
+            f"| {r.get('e2e_fps', '-')} | {r['max_abs_diff']:.2e} |"
+        )
+    speedups = [r["extract_speedup"] for _, r in rows]
+    print(f"\n⏱️ 추출 단계 평균 x{sum(speedups) / len(speedups):.2f}")
+
+
+if __name__ == "__main__":
+    main()
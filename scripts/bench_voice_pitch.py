@@ -0,0 +1,180 @@
+"""
+Voice 엔진 pitch 백엔드 비교 (pyin vs 벡터화 yin)
+- 같은 16kHz PCM 으로 두 백엔드를 실행하고 avg_pitch / pitch_std / max_pitch / voiced_ratio 차이와 속도를 비교
+- 기본값(VOICE_PITCH_BACKEND) 변경 판단 기준과 결과 기록 양식은 scripts/VOICE_PITCH_BENCHMARK.md 참고
+
+사용법 (프로젝트 루트에서):
+    python -m scripts.bench_voice_pitch uploads/derived/*/*/*/audio-*.wav
+    python -m scripts.bench_voice_pitch <wav...> --yin-fmax 400
+    python -m scripts.bench_voice_pitch <wav...> --compare-skip pyin   # 전체 vs 침묵 건너뛰기 (같은 백엔드)
+    python -m scripts.bench_voice_pitch <wav...> --check-parallel 4    # 순차 vs 청크 병렬 결과 동일성 (4청크)
+"""
+import argparse
+import json
+import math
+import sys
+import time
+
+import librosa
+
+from app.engines.voice.features import VoiceFeatureFrame
+from app.engines.voice.parallel import parallel_pitch_stats
+from app.engines.voice.pitch import (
+    SPEECH_FMAX_HZ,
+    SPEECH_FMIN_HZ,
+    estimate_f0,
+    estimate_f0_spans,
+    frame_spans,
+    pitch_stats,
+)
+
+KEYS = ("avg_pitch", "pitch_std", "max_pitch", "voiced_ratio")
+# --compare-skip 허용 오차 (녹음별 |건너뛰기 - 전체|). 넘는 백엔드는 VOICE_PITCH_SKIP_SILENCE 기본값에서 끔
+SKIP_TOLERANCE = {"voiced_ratio": 0.01, "avg_pitch": 1.0}
+# --check-parallel 허용 오차 (순차 대비 상대 오차, PitchMoments 병합의 부동소수 반올림만 허용)
+PARALLEL_TOLERANCE = 1e-12
+# 병렬로 실행되는 설정 (pyin 은 침묵 건너뛰기가 켜진 경우만, should_run_parallel 과 같은 조건)
+PARALLEL_CONFIGS = (("yin", None), ("yin", 35), ("pyin", 35))
+
+
+def run(y, sr: int, backend: str, *, skip_silence: bool = False, **kwargs) -> dict:
+    spans = None
+    if skip_silence:
+        # run_voice 기본값과 같은 침묵 기준 (silence_top_db=35). 침묵 카운트에서 어차피 계산하므로 시간에서 제외
+        spans = frame_spans(VoiceFeatureFrame(y, sr).non_silent(35), len(y))
+    t0 = time.perf_counter()
+    if spans is not None:
+        f0 = estimate_f0_spans(y, sr, spans, backend=backend, **kwargs)
+    else:
+        f0 = estimate_f0(y, sr, backend=backend, **kwargs)
+    elapsed = time.perf_counter() - t0
+    out = pitch_stats(f0)
+    out["elapsed_sec"] = round(elapsed, 3)
+    return out
+
+
+def compare(path: str, yin_fmin: float, yin_fmax: float, compare_skip: str = "") -> dict:
+    y, sr = librosa.load(path, sr=16000, mono=True)
+    if len(y) == 0:
+        return {"error": "empty audio"}
+    if compare_skip:
+        # 기준(pyin 키) = 전체 신호, 비교(yin 키) = 침묵 건너뛰기
+        pyin = run(y, sr, compare_skip)
+        yin = run(y, sr, compare_skip, skip_silence=True)
+    else:
+        pyin = run(y, sr, "pyin")
+        yin = run(y, sr, "yin", fmin_hz=yin_fmin, fmax_hz=yin_fmax)
+
+    delta = {}
+    for k in KEYS:
+        a, b = pyin[k], yin[k]
+        delta[k] = None if a is None or b is None else round(b - a, 4)
+    return {
+        "duration_sec": round(len(y) / sr, 2),
+        "pyin": pyin,
+        "yin": yin,
+        "delta": delta,
+        "speedup": round(pyin["elapsed_sec"] / yin["elapsed_sec"], 1) if yin["elapsed_sec"] > 0 else None,
+    }
+
+
+def check_parallel(path: str, chunks: int) -> dict:
+    """같은 신호를 순차 / chunks 개 청크 병렬로 계산해 통계별 상대 오차 (설정별)"""
+    y, sr = librosa.load(path, sr=16000, mono=True)
+    if len(y) == 0:
+        return {"error": "empty audio"}
+    out = {"duration_sec": round(len(y) / sr, 2), "configs": {}}
+    for backend, skip_db in PARALLEL_CONFIGS:
+        features = VoiceFeatureFrame(y, sr)
+        seq = features.pitch_stats(backend=backend, skip_silence_db=skip_db)
+        par = parallel_pitch_stats(features, backend=backend, skip_silence_db=skip_db, workers=chunks, chunks=chunks)
+        errors = {}
+        for k in KEYS:
+            a, b = seq[k], par[k]
+            if a is None or b is None:
+                errors[k] = 0.0 if a is None and b is None else math.inf
+            else:
+                errors[k] = abs(a - b) / max(1.0, abs(a))
+        name = f"{backend}{'+skip' if skip_db is not None else ''}"
+        out["configs"][name] = {"chunks": par["parallel"]["chunks"], "max_rel_error": max(errors.values())}
+    return out
+
+
+def main_check_parallel(audios, chunks: int) -> None:
+    worst = {}
+    for path in audios:
+        out = check_parallel(path, chunks)
+        print(f"🎙️ {path} {json.dumps(out, ensure_ascii=False)}")
+        for name, r in out.get("configs", {}).items():
+            worst[name] = max(worst.get(name, 0.0), r["max_rel_error"])
+
+    print(f"\n📊 답변 {len(audios)}개 | 순차 vs {chunks}청크 병렬 (최대 상대 오차)")
+    print("| 설정 | 최대 상대 오차 |")
+    print("|---|---|")
+    for name, err in worst.items():
+        print(f"| {name} | {err:.2e} |")
+    failed = [name for name, err in worst.items() if err > PARALLEL_TOLERANCE]
+    if failed:
+        print(f"❌ 허용 오차({PARALLEL_TOLERANCE:g}) 초과: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"✅ 모든 설정이 허용 오차({PARALLEL_TOLERANCE:g}) 안")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pyin vs yin pitch 통계 비교")
+    parser.add_argument("audios", nargs="+", help="비교할 16kHz WAV (또는 librosa 가 읽을 수 있는 오디오)")
+    parser.add_argument("--yin-fmin", type=float, default=SPEECH_FMIN_HZ)
+    parser.add_argument("--yin-fmax", type=float, default=SPEECH_FMAX_HZ)
+    parser.add_argument("--compare-skip", choices=("pyin", "yin"), default="",
+                        help="백엔드 비교 대신 같은 백엔드의 전체 vs 침묵 건너뛰기 비교")
+    parser.add_argument("--check-parallel", type=int, default=0, metavar="CHUNKS",
+                        help="백엔드 비교 대신 순차 vs CHUNKS 개 청크 병렬 결과 동일성 확인 (허용 오차 넘으면 exit 1)")
+    args = parser.parse_args()
+
+    if args.check_parallel:
+        main_check_parallel(args.audios, max(2, args.check_parallel))
+        return
+
+    rows = []
+    for path in args.audios:
+        print(f"🎙️ {path}")
+        out = compare(path, args.yin_fmin, args.yin_fmax, args.compare_skip)
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+        if not out.get("error"):
+            rows.append(out)
+
+    if not rows:
+        return
+
+    # 문서에 붙여넣을 수 있는 요약 표 (차이 = yin - pyin, --compare-skip 이면 건너뛰기 - 전체)
+    n = len(rows)
+    if args.compare_skip:
+        print(f"\n📊 답변 {n}개 | {args.compare_skip} 전체 vs 침묵 건너뛰기")
+    else:
+        print(f"\n📊 답변 {n}개 | yin {args.yin_fmin:g}~{args.yin_fmax:g}Hz")
+    print("| 항목 | 평균 차이 | 평균 |차이| | 최대 |차이| |")
+    print("|---|---|---|---|")
+    for k in KEYS:
+        deltas = [r["delta"][k] for r in rows if r["delta"][k] is not None]
+        if not deltas:
+            continue
+        absd = [abs(d) for d in deltas]
+        print(f"| {k} | {sum(deltas) / len(deltas):.3f} | {sum(absd) / len(absd):.3f} | {max(absd):.3f} |")
+    speedups = [r["speedup"] for r in rows if r["speedup"]]
+    if speedups:
+        print(f"\n⏱️ pitch 계산 속도 평균 x{sum(speedups) / len(speedups):.1f}")
+
+    if args.compare_skip:
+        over = [
+            k for k, tol in SKIP_TOLERANCE.items()
+            if any(r["delta"][k] is not None and abs(r["delta"][k]) > tol for r in rows)
+        ]
+        limits = ", ".join(f"{k} ±{tol:g}" for k, tol in SKIP_TOLERANCE.items())
+        if over:
+            print(f"❌ 허용 오차({limits}) 초과: {', '.join(over)} -> {args.compare_skip} 는 침묵 건너뛰기 기본값 끔")
+        else:
+            print(f"✅ 모든 녹음이 허용 오차({limits}) 안")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Visual 엔진 순차 vs 구간 병렬 비교
+- 같은 영상을 구간 1개(순차) / N개 구간으로 분석해 추론 프레임 수와 점수 차이 출력
+- 허용 차이: 세부 점수 / 총점 각각 PARALLEL_SCORE_TOLERANCE 점 이내 (넘는 영상이 있으면 exit code 1)
+
+사용법 (프로젝트 루트에서, MediaPipe 모델 필요):
+    python -m scripts.compare_visual_parallel uploads/objects/ab/cd/<hash>.mp4 [다른 영상 ...] --windows 4
+"""
+import argparse
+import json
+import sys
+
+from app.engines.visual.parallel import PARALLEL_SCORE_TOLERANCE, compare_parallel
+from app.utils.media_utils import MediaUtils
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visual 엔진 순차 vs 구간 병렬 비교")
+    parser.add_argument("videos", nargs="+", help="비교할 영상 경로")
+    parser.add_argument("--windows", type=int, default=4, help="병렬 분석 구간 수")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: VISUAL_PARALLEL_WORKERS)")
+    parser.add_argument("--fps", type=float, default=None, help="샘플링 기준 fps (기본: VISUAL_SAMPLE_FPS)")
+    args = parser.parse_args()
+
+    failed = []
+    for path in args.videos:
+        print(f"🎬 {path}")
+        duration = MediaUtils.probe(path).duration_sec or 0.0
+        out = compare_parallel(path, duration, windows=args.windows, workers=args.workers, base_fps=args.fps)
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+        if out.get("error") or not out["within_tolerance"]:
+            failed.append(path)
+
+    print(f"\n📊 영상 {len(args.videos)}개 | 허용 차이 ±{PARALLEL_SCORE_TOLERANCE}점 초과 {len(failed)}개")
+    for path in failed:
+        print(f"  ❌ {path}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Visual 엔진 프레임 샘플링 비교
+- 같은 영상을 모든 프레임 / 샘플링(기본 10fps + 깜빡임 burst)으로 분석해 점수 차이와 속도 향상 출력
+
+사용법 (프로젝트 루트에서):
+    python -m scripts.compare_visual_sampling uploads/objects/ab/cd/<hash>.mp4 [다른 영상 ...] --fps 10
+"""
+import argparse
+import json
+
+from app.engines.visual.engine import compare_sampling
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visual 엔진 full-rate vs 샘플링 비교")
+    parser.add_argument("videos", nargs="+", help="비교할 영상 경로")
+    parser.add_argument("--fps", type=float, default=None, help="샘플링 기준 fps (기본: VISUAL_SAMPLE_FPS, 0 이면 10)")
+    args = parser.parse_args()
+
+    deltas, speedups = [], []
+    for path in args.videos:
+        print(f"🎬 {path}")
+        out = compare_sampling(path, args.fps)
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+        if out.get("error"):
+            continue
+        deltas.append(abs(out["score_delta"]))
+        if out["speedup"]:
+            speedups.append(out["speedup"])
+
+    if deltas:
+        print(f"\n📊 영상 {len(deltas)}개 | 평균 |점수 차이| {sum(deltas) / len(deltas):.2f}점"
+              f" | 최대 {max(deltas)}점 | 평균 속도 향상 x{sum(speedups) / max(1, len(speedups)):.2f}")
+
+
+if __name__ == "__main__":
+    main()
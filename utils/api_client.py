@@ -90,6 +90,122 @@ class ReportAPI(APIClient):
             return None # 리포트 없음
         raise Exception(f"리포트 조회 실패: {res.text}")
 
+class AnswerAPI(APIClient):
+    def upload_video_resumable(
+        self, token, question_id, file_path, *,
+        analyze=True, live_visual=None, live_voice=None, max_retries=5, upload_id=None, on_upload_id=None,
+    ):
+        """
+        답변 영상 청크 업로드 (끊기면 서버가 받은 지점부터 이어서 전송)
+        init -> PUT 청크 -> complete
+        live_visual: 녹화 중 실시간 Visual 분석 결과 (있으면 complete 때 함께 전송)
+        live_voice: 녹화 중 실시간 Voice 지표 (있으면 complete 때 함께 전송)
+        upload_id: 이전 시도에서 받은 upload_id (있으면 상태 조회 후 이어서 전송, 이어갈 수 없으면 새로 init)
+        on_upload_id: upload_id 가 정해지면 호출 (페이지 재실행 후 이어받기용으로 저장)
+        네트워크 오류 / 5xx 는 상태 조회 · complete 포함 max_retries 번까지 재시도
+        """
+        import os
+        import time
+
+        headers = {"Authorization": f"Bearer {token}"}
+        base = f"{self.base_url}/api/v1/answer/uploads"
+        total = os.path.getsize(file_path)
+
+        def backoff(retries):
+            if retries > max_retries:
+                raise Exception("업로드 재시도 횟수 초과")
+            time.sleep(min(2 ** retries, 10))
+
+        upload = None
+        if upload_id:
+            try:
+                res = requests.get(f"{base}/{upload_id}", headers=headers, timeout=30)
+            except requests.RequestException:
+                res = None
+            if res is not None and res.status_code == 200:
+                prev = res.json()
+                # 같은 질문 / 같은 파일 크기인 진행 중(또는 완료된) 업로드만 이어서 사용
+                if (
+                    prev["status"] in ("UPLOADING", "COMPLETED")
+                    and prev["question_id"] == question_id
+                    and prev.get("total_bytes") == total
+                ):
+                    upload = prev
+
+        if upload is None:
+            res = requests.post(
+                base,
+                json={"question_id": question_id, "filename": os.path.basename(file_path), "total_bytes": total},
+                headers=headers,
+                timeout=30,
+            )
+            if res.status_code != 200:
+                raise Exception(f"업로드 시작 실패 ({res.status_code}): {res.text}")
+            upload = res.json()
+        upload_id = upload["upload_id"]
+        if on_upload_id is not None:
+            on_upload_id(upload_id)
+        chunk_bytes = upload["chunk_bytes"]
+        offset = total if upload["status"] == "COMPLETED" else upload["received_bytes"]
+
+        retries = 0
+        with open(file_path, "rb") as f:
+            while offset < total:
+                f.seek(offset)
+                chunk = f.read(chunk_bytes)
+                try:
+                    res = requests.put(
+                        f"{base}/{upload_id}",
+                        params={"offset": offset},
+                        data=chunk,
+                        headers={**headers, "Content-Type": "application/octet-stream"},
+                        timeout=60,
+                    )
+                except requests.RequestException:
+                    res = None
+
+                if res is not None and res.status_code == 200:
+                    offset = res.json()["received_bytes"]
+                    retries = 0
+                    continue
+                if res is not None and res.status_code not in (409,) and res.status_code < 500:
+                    raise Exception(f"업로드 실패 ({res.status_code}): {res.text}")
+
+                # 네트워크 오류 / 409 / 5xx -> 서버가 받은 위치 확인 후 이어서
+                retries += 1
+                backoff(retries)
+                try:
+                    status = requests.get(f"{base}/{upload_id}", headers=headers, timeout=30)
+                except requests.RequestException:
+                    # 상태 조회도 실패하면 재시도 1회로 세고 같은 위치부터 다시 시도 (409 면 다음 조회로 맞춰짐)
+                    continue
+                if status.status_code >= 500:
+                    continue
+                if status.status_code != 200:
+                    raise Exception(f"업로드 상태 조회 실패 ({status.status_code}): {status.text}")
+                offset = status.json()["received_bytes"]
+
+        body = {"analyze": analyze}
+        if live_visual is not None:
+            body["live_visual"] = live_visual
+        if live_voice is not None:
+            body["live_voice"] = live_voice
+
+        # complete 는 서버에서 재시도 안전 (이미 완료된 업로드면 같은 답변 반환)
+        retries = 0
+        while True:
+            try:
+                res = requests.post(f"{base}/{upload_id}/complete", json=body, headers=headers, timeout=120)
+            except requests.RequestException:
+                res = None
+            if res is not None and res.status_code in (200, 201):
+                return res.json()
+            if res is not None and res.status_code < 500:
+                raise Exception(f"업로드 완료 실패 ({res.status_code}): {res.text}")
+            retries += 1
+            backoff(retries)
+
+
 auth_api = APIClient()
 resume_api = ResumeAPI()
 session_api = SessionAPI()